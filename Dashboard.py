@@ -4,16 +4,33 @@ import numpy as np
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-import requests
-import time
 import pytz
-import json
 import os
-import hashlib
+import sys
+from pathlib import Path
 from typing import Optional, Dict, Any
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).parent / "moex"))
+
+from src.api.endpoints import Endpoints
+from src.api.exceptions import MOEXAPIError
+from src.api.iss_decoder import bars_from_columns
+from src.api.pagination import fetch_all_columns
+from src.api.transport import get_transport
+from src.data.bar_buffer import BarBuffer
+from src.data.columnar_cache import index_to_timestamps
+from src.data.history_store import HistoryStore, HistoryTimezoneError, market_timestamps
+from src.data.simulator import simulate_panel
+from src.data.source_race import RaceResult, race_sources
+from src.indicators import compute_indicators
+from src.utils.cache_maintenance import CacheDirectory, get_cache_janitor
+from src.utils.constants import CACHE_DISK_LIMITS
+from src.utils.formatters import format_age
+from src.utils.revalidation import get_revalidator
+from src.utils.time_utils import get_cache_ttl, get_moscow_time
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -66,43 +83,55 @@ st.markdown("""
 # ============================================================================
 
 class MOEXData:
-    """Structure de données unifiée pour MOEX"""
+    """Structure de données unifiée pour MOEX (barres dans un BarBuffer)"""
     
-    def __init__(self):
+    __slots__ = ('symbol', 'company_name', 'source', 'last_update', 'bars',
+                 'current_price', 'change_percent', 'quality_score', 'revalidating')
+    
+    def __init__(self, capacity: int = 256):
         self.symbol = ""
         self.company_name = ""
         self.source = ""
         self.last_update = None
-        self.dates = []
-        self.open = []
-        self.high = []
-        self.low = []
-        self.close = []
-        self.volume = []
+        self.bars = BarBuffer(capacity)
         self.current_price = 0.0
         self.change_percent = 0.0
         self.quality_score = 0  # 0-100
+        self.revalidating = False  # Données périmées en cours de rafraîchissement
+    
+    # Vues en lecture des colonnes du tampon
+    dates = property(lambda self: self.bars.index)
+    open = property(lambda self: self.bars.column('open'))
+    high = property(lambda self: self.bars.column('high'))
+    low = property(lambda self: self.bars.column('low'))
+    close = property(lambda self: self.bars.column('close'))
+    volume = property(lambda self: self.bars.column('volume'))
+    
+    def update_quote(self):
+        """Dérive le dernier prix et la variation des clôtures (valeurs manquantes ignorées)"""
+        close = self.close[np.isfinite(self.close)]
+        if len(close):
+            self.current_price = float(close[-1])
+        if len(close) > 1:
+            self.change_percent = float((close[-1] / close[-2] - 1) * 100)
     
     def to_dataframe(self) -> pd.DataFrame:
-        """Convertit en DataFrame pandas"""
-        if not self.dates:
+        """Convertit en DataFrame pandas modifiable (copie des colonnes du tampon)"""
+        if len(self.bars) == 0:
             return pd.DataFrame()
         
-        df = pd.DataFrame({
-            'open': self.open,
-            'high': self.high,
-            'low': self.low,
-            'close': self.close,
-            'volume': self.volume
-        }, index=pd.to_datetime(self.dates))
-        
-        return df
+        return self.bars.to_dataframe()
+    
+    @property
+    def data_age(self) -> float:
+        """Âge des données en secondes (inf si inconnu)"""
+        if self.last_update is None:
+            return float('inf')
+        return max(0.0, (datetime.now() - self.last_update).total_seconds())
     
     def is_valid(self) -> bool:
         """Vérifie si les données sont valides"""
-        return (len(self.dates) > 0 and 
-                len(self.open) > 0 and 
-                len(self.close) > 0)
+        return len(self.bars) > 0 and bool(np.isfinite(self.close).any())
     
     def get_quality_score(self) -> int:
         """Calcule un score de qualité des données"""
@@ -117,16 +146,20 @@ class MOEXData:
         score -= source_penalties.get(self.source, 30)
         
         # Vérifier la complétude
-        if len(self.dates) < 20:
+        if len(self.bars) < 20:
             score -= 30
+        elif np.isnan(self.close).mean() > 0.05:
+            score -= 15
         
         # Vérifier la fraîcheur
         if self.last_update:
-            age_hours = (datetime.now() - self.last_update).total_seconds() / 3600
+            age_hours = self.data_age / 3600
             if age_hours > 24:
                 score -= 20
             elif age_hours > 6:
                 score -= 10
+            elif age_hours > 1:
+                score -= 5
         
         return max(0, min(100, score))
 
@@ -183,104 +216,125 @@ class MOEXDataCollector:
         }
     }
     
+    # Fenêtre d'historique affichée et âge maximal avant resynchronisation en séance
+    # (hors séance, l'historique reste valable jusqu'à la prochaine ouverture)
+    HISTORY_DAYS = 90
+    CACHE_MAX_AGE = 3600
+    # Âge maximal d'un historique servi immédiatement pendant son rafraîchissement
+    STALE_MAX_AGE = 7 * 24 * 3600
+    
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json'
-        })
+        self.transport = get_transport()
         self.cache_dir = ".moex_cache"
         os.makedirs(self.cache_dir, exist_ok=True)
-    
-    def _get_cache_key(self, symbol: str) -> str:
-        """Génère une clé de cache"""
-        date_str = datetime.now().strftime('%Y%m%d_%H')
-        key = f"{symbol}_{date_str}"
-        return hashlib.md5(key.encode()).hexdigest()
+        self.history = HistoryStore(os.path.join(self.cache_dir, "history"))
+        self.last_race: Optional[RaceResult] = None
+        
+        # Budget disque de l'historique ; anciens fichiers horaires à la racine purgés après 24h
+        janitor = get_cache_janitor()
+        self.history_cache = janitor.register(
+            CacheDirectory(self.history.root, CACHE_DISK_LIMITS['history'], name="history")
+        )
+        janitor.register(
+            CacheDirectory(self.cache_dir, CACHE_DISK_LIMITS['legacy'], max_age=86400, recursive=False, name="legacy")
+        )
+        janitor.start()
     
     def _save_to_cache(self, symbol: str, data: MOEXData):
-        """Sauvegarde les données dans le cache"""
-        cache_file = os.path.join(self.cache_dir, f"{self._get_cache_key(symbol)}.json")
-        
-        cache_data = {
+        """Fusionne les barres dans l'historique persistant du symbole"""
+        columns = {name: data.bars.column(name) for name in ('open', 'high', 'low', 'close', 'volume')}
+        # Toutes les sources au même format : dates de séance, heure de Moscou sans fuseau
+        columns['timestamp'] = market_timestamps(data.bars.timestamps, data.bars.tz)
+        meta = {
             'symbol': data.symbol,
             'company_name': data.company_name,
             'source': data.source,
             'last_update': data.last_update.isoformat() if data.last_update else None,
-            'dates': [d.isoformat() if hasattr(d, 'isoformat') else d for d in data.dates],
-            'open': data.open,
-            'high': data.high,
-            'low': data.low,
-            'close': data.close,
-            'volume': data.volume,
-            'current_price': data.current_price,
-            'change_percent': data.change_percent
+            'tz': None
         }
         
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            try:
+                self.history.merge(symbol, columns, meta)
+            except HistoryTimezoneError:
+                # Historique écrit avant la normalisation des fuseaux : converti puis complété
+                self.history.normalize(symbol)
+                self.history.merge(symbol, columns, meta)
         except Exception as e:
             print(f"Erreur cache: {e}")
     
-    def _load_from_cache(self, symbol: str) -> Optional[MOEXData]:
-        """Charge les données du cache si disponibles"""
-        cache_file = os.path.join(self.cache_dir, f"{self._get_cache_key(symbol)}.json")
-        
-        if not os.path.exists(cache_file):
-            return None
-        
-        # Vérifier l'âge du cache
-        file_age = time.time() - os.path.getmtime(cache_file)
-        if file_age > 3600:  # Plus d'une heure
+    def _history_max_age(self, age: float) -> float:
+        """Âge maximal d'un historique synchronisé il y a `age` secondes, selon la phase du marché d'alors"""
+        if age == float('inf'):
+            return 0.0
+        synced_at = get_moscow_time() - timedelta(seconds=age)
+        return get_cache_ttl(self.CACHE_MAX_AGE, synced_at)
+    
+    def _load_from_cache(self, symbol: str, max_age: Optional[float] = None) -> Optional[MOEXData]:
+        """
+        Charge la fenêtre d'historique si elle a été synchronisée depuis moins de max_age secondes
+        
+        Sans max_age, l'historique reste valable CACHE_MAX_AGE en séance et
+        jusqu'à l'ouverture suivante s'il a été synchronisé marché fermé.
+        """
+        age = self.history.age(symbol)
+        if max_age is None:
+            max_age = self._history_max_age(age)
+        if age > max_age:
+            self.history_cache.record_miss()
             return None
         
         try:
-            with open(cache_file, 'r') as f:
-                cache_data = json.load(f)
+            stored = self.history.window(symbol, datetime.now() - timedelta(days=self.HISTORY_DAYS))
+            if stored is None:
+                self.history_cache.record_miss()
+                return None
+            columns, meta = stored
+            self.history_cache.record_hit()
             
             data = MOEXData()
-            data.symbol = cache_data.get('symbol', symbol)
-            data.company_name = cache_data.get('company_name', '')
-            data.source = cache_data.get('source', 'Cache')
-            data.last_update = datetime.fromisoformat(cache_data['last_update']) if cache_data.get('last_update') else None
-            data.dates = [datetime.fromisoformat(d) for d in cache_data.get('dates', [])]
-            data.open = cache_data.get('open', [])
-            data.high = cache_data.get('high', [])
-            data.low = cache_data.get('low', [])
-            data.close = cache_data.get('close', [])
-            data.volume = cache_data.get('volume', [])
-            data.current_price = cache_data.get('current_price', 0)
-            data.change_percent = cache_data.get('change_percent', 0)
+            data.symbol = meta.get('symbol', symbol)
+            data.company_name = meta.get('company_name', '')
+            data.source = meta.get('source', 'Cache')
+            data.last_update = datetime.fromisoformat(meta['last_update']) if meta.get('last_update') else None
+            data.bars = BarBuffer.from_arrays(
+                columns['timestamp'], meta.get('tz'),
+                **{name: columns[name] for name in ('open', 'high', 'low', 'close', 'volume')}
+            )
+            data.update_quote()
             
             return data
         except Exception:
             return None
     
-    def collect_from_moex(self, symbol: str) -> Optional[MOEXData]:
+    def collect_from_moex(self, symbol: str, deadline: float = 10) -> Optional[MOEXData]:
         """Collecte les données depuis l'API MOEX"""
         try:
             # Utiliser l'API ISS MOEX
             moex_id = self.SYMBOLS.get(symbol, {}).get('moex_id', symbol)
             
-            # Récupérer les données historiques
-            url = f"https://iss.moex.com/iss/history/engines/stock/markets/shares/boards/tqbr/securities/{moex_id}.json"
+            # Ne demander que les séances depuis la dernière barre stockée (incluse,
+            # car elle peut encore être en formation)
+            last_stored = self.history.last_timestamp(symbol)
+            since = last_stored if last_stored is not None else datetime.now() - timedelta(days=self.HISTORY_DAYS)
             params = {
-                'from': (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d'),
-                'till': datetime.now().strftime('%Y-%m-%d'),
-                'start': 0,
-                'limit': 100
+                'from': since.strftime('%Y-%m-%d'),
+                'till': datetime.now().strftime('%Y-%m-%d')
             }
             
-            response = self.session.get(url, params=params, timeout=10)
-            
-            if response.status_code != 200:
+            try:
+                history = fetch_all_columns(
+                    Endpoints.HISTORY.format(board='tqbr', ticker=moex_id),
+                    'history',
+                    params,
+                    transport=self.transport,
+                    deadline=deadline
+                )
+            except MOEXAPIError:
                 return None
             
-            data = response.json()
-            
             # Vérifier la structure des données
-            if 'history' not in data or 'data' not in data['history']:
+            if not history:
                 return None
             
             # Créer l'objet de données
@@ -290,34 +344,18 @@ class MOEXDataCollector:
             moex_data.source = 'MOEX Officiel'
             moex_data.last_update = datetime.now()
             
-            # Parcourir les données
-            columns = data['history']['columns']
-            date_idx = columns.index('TRADEDATE')
-            open_idx = columns.index('OPEN') if 'OPEN' in columns else None
-            high_idx = columns.index('HIGH') if 'HIGH' in columns else None
-            low_idx = columns.index('LOW') if 'LOW' in columns else None
-            close_idx = columns.index('CLOSE') if 'CLOSE' in columns else None
-            volume_idx = columns.index('VOLUME') if 'VOLUME' in columns else None
-            
-            for row in data['history']['data']:
-                try:
-                    date = datetime.strptime(row[date_idx], '%Y-%m-%d')
-                    
-                    moex_data.dates.append(date)
-                    moex_data.open.append(float(row[open_idx]) if open_idx is not None and row[open_idx] else 0)
-                    moex_data.high.append(float(row[high_idx]) if high_idx is not None and row[high_idx] else 0)
-                    moex_data.low.append(float(row[low_idx]) if low_idx is not None and row[low_idx] else 0)
-                    moex_data.close.append(float(row[close_idx]) if close_idx is not None and row[close_idx] else 0)
-                    moex_data.volume.append(float(row[volume_idx]) if volume_idx is not None and row[volume_idx] else 0)
-                except (ValueError, IndexError):
-                    continue
+            # Colonnes typées décodées en flux (NaN pour les valeurs manquantes)
+            timestamps, bars = bars_from_columns(history)
+            moex_data.bars.extend(timestamps, **bars)
             
-            if moex_data.close:
-                moex_data.current_price = moex_data.close[-1]
-                if len(moex_data.close) > 1:
-                    moex_data.change_percent = ((moex_data.close[-1] / moex_data.close[-2]) - 1) * 100
+            if len(moex_data.bars) == 0 and last_stored is None:
+                return None
             
-            return moex_data
+            self._save_to_cache(symbol, moex_data)
+            merged = self._load_from_cache(symbol, max_age=float('inf'))
+            if merged is not None:
+                merged.source = 'MOEX Officiel'
+            return merged
             
         except Exception as e:
             print(f"Erreur MOEX: {e}")
@@ -328,33 +366,26 @@ class MOEXDataCollector:
         try:
             import yfinance as yf
             
-            # Attendre pour éviter rate limiting
-            time.sleep(2)
-            
             ticker = yf.Ticker(f"{symbol}.ME")
             hist = ticker.history(period="3mo", interval="1d")
             
             if hist.empty:
                 return None
             
-            moex_data = MOEXData()
+            moex_data = MOEXData(len(hist))
             moex_data.symbol = symbol
             moex_data.company_name = self.SYMBOLS.get(symbol, {}).get('name', symbol)
             moex_data.source = 'Yahoo Finance'
             moex_data.last_update = datetime.now()
             
-            # Convertir les données
-            for date, row in hist.iterrows():
-                moex_data.dates.append(date)
-                moex_data.open.append(float(row['Open']))
-                moex_data.high.append(float(row['High']))
-                moex_data.low.append(float(row['Low']))
-                moex_data.close.append(float(row['Close']))
-                moex_data.volume.append(int(row['Volume']))
+            # Convertir les données colonne par colonne (dates de séance de Moscou, comme l'ISS)
+            moex_data.bars.extend(
+                market_timestamps(*index_to_timestamps(hist.index)),
+                **{name: hist[name.capitalize()].to_numpy(dtype=np.float64)
+                   for name in ('open', 'high', 'low', 'close', 'volume')}
+            )
             
-            moex_data.current_price = moex_data.close[-1] if moex_data.close else 0
-            if len(moex_data.close) > 1:
-                moex_data.change_percent = ((moex_data.close[-1] / moex_data.close[-2]) - 1) * 100
+            moex_data.update_quote()
             
             return moex_data
             
@@ -383,39 +414,30 @@ class MOEXDataCollector:
         moex_data.source = 'Simulé'
         moex_data.last_update = datetime.now()
         
-        # Générer 90 jours de données
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=90)
-        
-        current_date = start_date
-        price = base_price
-        volatility = 0.02
-        
-        while current_date <= end_date:
-            if current_date.weekday() < 5:  # Jours de semaine
-                # Mouvement de prix réaliste
-                drift = 0.0002  # Légère tendance haussière
-                shock = np.random.normal(0, volatility)
-                price = price * np.exp(drift + shock)
-                
-                # Générer OHLC
-                high_mult = 1 + abs(np.random.normal(0, 0.005))
-                low_mult = 1 - abs(np.random.normal(0, 0.005))
-                
-                moex_data.dates.append(current_date)
-                moex_data.open.append(float(price * 0.998))
-                moex_data.high.append(float(price * high_mult))
-                moex_data.low.append(float(price * low_mult))
-                moex_data.close.append(float(price))
-                moex_data.volume.append(int(np.random.uniform(100000, 5000000)))
-            
-            current_date += timedelta(days=1)
-        
-        moex_data.current_price = moex_data.close[-1] if moex_data.close else base_price
-        moex_data.change_percent = np.random.uniform(-2, 2)
+        # Séances des 90 derniers jours (≈ 2 % de volatilité quotidienne, légère tendance haussière)
+        panel = simulate_panel(
+            [symbol],
+            periods=self.HISTORY_DAYS * 5 // 7,
+            start_prices=base_price,
+            drift=0.05,
+            volatility=0.32,
+            correlation=0.0,
+            volume=2_500_000
+        )
+        moex_data.bars = panel.bars(symbol)
+        moex_data.update_quote()
         
         return moex_data
     
+    def revalidate(self, symbol: str) -> Optional[MOEXData]:
+        """Resynchronise l'historique stocké d'un symbole (exécuté en arrière-plan)"""
+        data = self.collect_from_moex(symbol)
+        if data is None or not data.is_valid():
+            data = self.collect_from_yahoo(symbol)
+            if data is not None and data.is_valid():
+                self._save_to_cache(symbol, data)
+        return data
+    
     def get_best_data(self, symbol: str, use_cache: bool = True) -> MOEXData:
         """Récupère les meilleures données disponibles"""
         
@@ -425,20 +447,34 @@ class MOEXDataCollector:
             if cached and cached.is_valid():
                 cached.source = "Cache"
                 return cached
-        
-        # Essayer MOEX officiel
-        st.info("🔄 Tentative: MOEX Officiel...")
-        data = self.collect_from_moex(symbol)
-        if data and data.is_valid():
-            self._save_to_cache(symbol, data)
+            
+            # Historique périmé servi sans attendre, rafraîchi en arrière-plan
+            stale = self._load_from_cache(symbol, max_age=self.STALE_MAX_AGE)
+            if stale and stale.is_valid():
+                stale.source = "Cache"
+                stale.revalidating = True
+                get_revalidator().submit(('history', symbol), self.revalidate, symbol)
+                return stale
+        
+        # MOEX officiel en priorité, Yahoo lancé en parallèle si MOEX tarde
+        self.last_race = race_sources(
+            [
+                ('MOEX Officiel', lambda budget: self.collect_from_moex(symbol, deadline=budget)),
+                ('Yahoo Finance', lambda budget: self.collect_from_yahoo(symbol))
+            ],
+            is_valid=lambda data: data is not None and data.is_valid()
+        )
+        if self.last_race.won:
+            data = self.last_race.value
+            if self.last_race.source == 'Yahoo Finance':
+                self._save_to_cache(symbol, data)
             return data
         
-        # Essayer Yahoo
-        st.info("🔄 Tentative: Yahoo Finance...")
-        data = self.collect_from_yahoo(symbol)
-        if data and data.is_valid():
-            self._save_to_cache(symbol, data)
-            return data
+        # Historique stocké, même ancien, plutôt que des données simulées
+        cached = self._load_from_cache(symbol, max_age=float('inf'))
+        if cached and cached.is_valid():
+            cached.source = "Cache"
+            return cached
         
         # Fallback aux données simulées
         st.warning("⚠️ Utilisation de données simulées (aucune source disponible)")
@@ -450,43 +486,36 @@ class MOEXDataCollector:
 # ============================================================================
 
 class TechnicalAnalyzer:
-    """Analyse technique"""
+    """Analyse technique (calculs délégués au moteur d'indicateurs)"""
+    
+    FIELDS = {name: name for name in ('open', 'high', 'low', 'close', 'volume')}
     
-    @staticmethod
-    def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
+    @classmethod
+    def calculate(cls, df: pd.DataFrame, requests) -> pd.DataFrame:
+        """Calcule plusieurs indicateurs en une passe (intermédiaires partagés)"""
+        return compute_indicators(df, requests, fields=cls.FIELDS)
+    
+    @classmethod
+    def calculate_rsi(cls, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calcule le RSI"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-    
-    @staticmethod
-    def calculate_macd(prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9):
+        return cls.calculate(prices.to_frame('close'), [('rsi', {'period': period})])['RSI']
+    
+    @classmethod
+    def calculate_macd(cls, prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9):
         """Calcule le MACD"""
-        exp1 = prices.ewm(span=fast, adjust=False).mean()
-        exp2 = prices.ewm(span=slow, adjust=False).mean()
-        macd = exp1 - exp2
-        signal_line = macd.ewm(span=signal, adjust=False).mean()
-        histogram = macd - signal_line
-        return macd, signal_line, histogram
-    
-    @staticmethod
-    def calculate_bollinger(prices: pd.Series, period: int = 20, std_dev: int = 2):
+        result = cls.calculate(prices.to_frame('close'), [('macd', {'fast': fast, 'slow': slow, 'signal': signal})])
+        return result['MACD'], result['MACD_Signal'], result['MACD_Histogram']
+    
+    @classmethod
+    def calculate_bollinger(cls, prices: pd.Series, period: int = 20, std_dev: int = 2):
         """Calcule les bandes de Bollinger"""
-        sma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
-        upper = sma + (std * std_dev)
-        lower = sma - (std * std_dev)
-        return upper, sma, lower
-    
-    @staticmethod
-    def calculate_vwap(df: pd.DataFrame) -> pd.Series:
+        result = cls.calculate(prices.to_frame('close'), [('bollinger', {'period': period, 'std': std_dev})])
+        return result['BB_Upper'], result['BB_Middle'], result['BB_Lower']
+    
+    @classmethod
+    def calculate_vwap(cls, df: pd.DataFrame) -> pd.Series:
         """Calcule le VWAP"""
-        typical_price = (df['high'] + df['low'] + df['close']) / 3
-        vwap = (typical_price * df['volume']).cumsum() / df['volume'].cumsum()
-        return vwap
+        return cls.calculate(df, ['vwap'])['VWAP']
 
 # ============================================================================
 # INTERFACE PRINCIPALE
@@ -553,6 +582,14 @@ def main():
     with col_source2:
         st.markdown(f"<div class='data-quality {quality_class}'>Qualité: {quality_score}/100</div>", 
                    unsafe_allow_html=True)
+        age_caption = f"Âge des données: {format_age(data.data_age)}"
+        if data.revalidating:
+            age_caption += " · 🔄 actualisation en arrière-plan"
+        st.caption(age_caption)
+    
+    race = collector.last_race
+    if race is not None and race.won:
+        st.caption(f"⏱️ {race.source} en {race.latency:.2f}s")
     
     # Convertir en DataFrame pour l'analyse
     df = data.to_dataframe()
@@ -602,8 +639,9 @@ def main():
         decreasing_line_color='#ef553b'
     ), row=1, col=1)
     
-    # Bollinger Bands
-    upper, middle, lower = analyzer.calculate_bollinger(df['close'])
+    # Indicateurs du graphique, en une seule passe
+    indicators = analyzer.calculate(df, ['bollinger', 'rsi'])
+    upper, middle, lower = indicators['BB_Upper'], indicators['BB_Middle'], indicators['BB_Lower']
     
     fig.add_trace(go.Scatter(
         x=df.index,
@@ -642,7 +680,7 @@ def main():
     ), row=2, col=1)
     
     # RSI
-    rsi = analyzer.calculate_rsi(df['close'])
+    rsi = indicators['RSI']
     
     fig.add_trace(go.Scatter(
         x=df.index,
@@ -21,6 +21,7 @@ try:
         page_alertes,
         page_indices,
         page_predictions,
+        page_screener,
         page_configuration
     )
     PAGES_OK = True
@@ -38,6 +39,7 @@ def main():
              "🔔 Alertes",
              "📊 Indices",
              "🤖 Prédictions",
+             "🔎 Screener",
              "⚙️ Configuration"]
         )
     
@@ -56,6 +58,8 @@ def main():
             page_indices.show()
         elif page == "🤖 Prédictions":
             page_predictions.show()
+        elif page == "🔎 Screener":
+            page_screener.show()
         elif page == "⚙️ Configuration":
             page_configuration.show()
     except Exception as e:
@@ -0,0 +1,37 @@
+"""
+Fixtures partagées des tests unitaires
+"""
+import pandas as pd
+import pytest
+
+# Board simulé par défaut : (SECID, SHORTNAME, PREVPRICE, LAST, VOLTODAY)
+BOARD_ROWS = (
+    ('SBER', 'Сбербанк', 280.0, 281.5, 1000),
+    ('GAZP', 'ГАЗПРОМ ао', 160.0, None, 2000),
+    ('LKOH', 'ЛУКОЙЛ', 7000.0, 7100.0, 300),
+)
+
+
+class FakeBoardClient:
+    """Client simulé retournant un board fixe (blocs securities et marketdata)"""
+
+    def __init__(self, rows=BOARD_ROWS, fail=False, release=None):
+        self.rows = rows
+        self.calls = 0
+        self.fail = fail
+        self.release = release
+
+    def get_board(self, board, deadline=None):
+        self.calls += 1
+        if self.release is not None and self.calls > 1:
+            self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("ISS indisponible")
+        rows = pd.DataFrame(list(self.rows), columns=['SECID', 'SHORTNAME', 'PREVPRICE', 'LAST', 'VOLTODAY'])
+        return rows[['SECID', 'SHORTNAME', 'PREVPRICE']], rows[['SECID', 'LAST', 'VOLTODAY']]
+
+
+@pytest.fixture
+def board_client():
+    """Fabrique de clients simulés : board_client(rows=..., fail=..., release=...)"""
+    return FakeBoardClient
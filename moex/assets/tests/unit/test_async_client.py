@@ -0,0 +1,166 @@
+"""
+Tests unitaires pour le client API MOEX asynchrone
+"""
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.api.async_client import AsyncMOEXClient, run_sync
+from src.api.exceptions import MOEXAPIError
+from src.api.rate_limiter import RateLimiter
+
+
+def build_app(state):
+    """Application ISS simulée : marketdata et bougies paginées"""
+
+    async def marketdata(request):
+        ticker = request.match_info['ticker']
+        state['hits'] = state.get('hits', 0) + 1
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        await asyncio.sleep(0.02)
+        state['active'] -= 1
+        if ticker == 'FAIL':
+            return web.json_response({}, status=404)
+        return web.json_response({
+            'marketdata': {'columns': ['SECID', 'LAST'], 'data': [[ticker, 100.0]]}
+        })
+
+    async def candles(request):
+        ticker = request.match_info['ticker']
+        if ticker == 'FAIL':
+            return web.json_response({}, status=404)
+        start = int(request.query.get('start', 0))
+        total = 0 if ticker == 'IDLE' else 620
+        rows = [[float(i), f"2024-01-01 10:{i % 60:02d}:00"] for i in range(start, min(start + 500, total))]
+        return web.json_response({'candles': {'columns': ['close', 'begin'], 'data': rows}})
+
+    app = web.Application()
+    app.router.add_get('/engines/stock/markets/shares/boards/TQBR/securities/{ticker}.json', marketdata)
+    app.router.add_get('/engines/stock/markets/shares/securities/{ticker}/candles.json', candles)
+    return app
+
+
+async def run_with_server(state, scenario):
+    """Démarre le serveur simulé et exécute le scénario"""
+    server = TestServer(build_app(state))
+    await server.start_server()
+    try:
+        return await scenario(str(server.make_url('')).rstrip('/'))
+    finally:
+        await server.close()
+
+
+class TestAsyncMOEXClient:
+    """Tests pour AsyncMOEXClient"""
+
+    @pytest.fixture
+    def state(self):
+        """Compteurs de concurrence du serveur simulé"""
+        return {'active': 0, 'peak': 0}
+
+    def test_gather_marketdata_respects_limit(self, state):
+        """Les requêtes partent en parallèle sous la limite de concurrence"""
+        tickers = ['SBER', 'GAZP', 'LKOH', 'ROSN', 'GMKN', 'YNDX', 'MTSS', 'NVTK', 'MGNT', 'TATN']
+
+        async def scenario(base_url):
+            async with AsyncMOEXClient(base_url=base_url, max_concurrency=3) as client:
+                return await client.gather_marketdata(tickers)
+
+        results = asyncio.run(run_with_server(state, scenario))
+
+        assert list(results) == tickers
+        assert all(df['LAST'].iloc[0] == 100.0 for df in results.values())
+        assert 1 < state['peak'] <= 3
+
+    def test_failed_ticker_gives_empty_frame(self, state):
+        """Un ticker en erreur n'interrompt pas le lot"""
+        async def scenario(base_url):
+            async with AsyncMOEXClient(base_url=base_url) as client:
+                return await client.gather_marketdata(['SBER', 'FAIL'])
+
+        results = asyncio.run(run_with_server(state, scenario))
+
+        assert not results['SBER'].empty
+        assert results['FAIL'].empty
+
+    def test_gather_candles_follows_pages(self, state):
+        """Toutes les pages de bougies sont récupérées"""
+        async def scenario(base_url):
+            async with AsyncMOEXClient(base_url=base_url) as client:
+                return await client.gather_candles(['SBER', 'GAZP'], interval=1)
+
+        results = asyncio.run(run_with_server(state, scenario))
+
+        assert len(results['SBER']) == 620
+        assert 'Close' in results['GAZP'].columns
+
+    def test_gather_candles_reports_errors(self, state):
+        """Les tickers en erreur sont signalés à part des tickers sans bougies"""
+        errors = {}
+
+        async def scenario(base_url):
+            async with AsyncMOEXClient(base_url=base_url, max_retries=0) as client:
+                return await client.gather_candles(['SBER', 'IDLE', 'FAIL'], errors=errors, interval=24)
+
+        results = asyncio.run(run_with_server(state, scenario))
+
+        assert results['IDLE'].empty and results['FAIL'].empty
+        assert list(errors) == ['FAIL']
+        assert isinstance(errors['FAIL'], MOEXAPIError)
+
+    def test_process_concurrency_shared(self, state):
+        """La limite de concurrence du limiteur s'applique aussi aux requêtes asynchrones"""
+        limiter = RateLimiter(max_concurrency=2)
+        tickers = ['SBER', 'GAZP', 'LKOH', 'ROSN', 'GMKN', 'YNDX']
+
+        async def scenario(base_url):
+            async with AsyncMOEXClient(base_url=base_url, max_concurrency=8, limiter=limiter) as client:
+                return await client.gather_marketdata(tickers)
+
+        results = asyncio.run(run_with_server(state, scenario))
+
+        assert all(not df.empty for df in results.values())
+        assert state['peak'] <= 2
+        assert limiter.stats()['in_flight'] == 0
+
+    def test_rate_limit_rejection_retried(self, state):
+        """Une réservation refusée (attente trop longue) est retentée au lieu d'échouer"""
+        limiter = RateLimiter(global_budget=(20.0, 1), endpoint_budgets={}, max_wait=0.01)
+        tickers = ['SBER', 'GAZP', 'LKOH']
+
+        async def scenario(base_url):
+            async with AsyncMOEXClient(base_url=base_url, limiter=limiter) as client:
+                return await client.gather_marketdata(tickers)
+
+        results = asyncio.run(run_with_server(state, scenario))
+
+        assert all(not df.empty for df in results.values())
+        assert limiter.stats()['rejected'] > 0
+
+    def test_identical_requests_coalesced(self, state):
+        """Les requêtes identiques simultanées ne partent qu'une fois"""
+        async def scenario(base_url):
+            async with AsyncMOEXClient(base_url=base_url) as client:
+                return await asyncio.gather(*(client.get_market_data('SBER') for _ in range(5)))
+
+        results = asyncio.run(run_with_server(state, scenario))
+
+        assert state['hits'] == 1
+        assert all(df['LAST'].iloc[0] == 100.0 for df in results)
+
+    def test_sync_facade(self):
+        """La façade synchrone fonctionne avec ou sans boucle active"""
+        async def answer():
+            return 42
+
+        async def inside_loop():
+            return run_sync(answer())
+
+        assert run_sync(answer()) == 42
+        assert asyncio.run(inside_loop()) == 42
+
+    def test_requires_context(self):
+        """Le client doit être ouvert avec 'async with'"""
+        with pytest.raises(MOEXAPIError):
+            asyncio.run(AsyncMOEXClient().get_market_data('SBER'))
@@ -0,0 +1,129 @@
+"""
+Tests unitaires pour l'instantané du board
+"""
+import threading
+import time
+
+import pytest
+from src.data import board_snapshot
+from src.data.board_snapshot import BoardSnapshot
+
+
+class TestBoardSnapshot:
+    """Tests pour BoardSnapshot"""
+
+    @pytest.fixture
+    def client(self, board_client):
+        """Fixture pour le client simulé"""
+        return board_client()
+
+    def test_single_request_for_many_lookups(self, client):
+        """Toutes les recherches d'un intervalle partagent une seule requête"""
+        snapshot = BoardSnapshot(refresh_interval=60, client=client)
+
+        prices = snapshot.get_prices(['SBER', 'GAZP', 'LKOH', 'SBER', 'UNKNOWN'])
+
+        assert prices == {'SBER': 281.5, 'LKOH': 7100.0}
+        assert client.calls == 1
+
+    def test_frame_indexed_by_secid(self, client):
+        """L'instantané est indexé par SECID et enrichi des colonnes securities"""
+        snapshot = BoardSnapshot(refresh_interval=60, client=client)
+
+        frame = snapshot.frame
+
+        assert frame.index.name == 'SECID'
+        assert frame.loc['GAZP', 'SHORTNAME'] == 'ГАЗПРОМ ао'
+        assert 'LKOH' in snapshot
+
+    def test_get_row_replaces_nan(self, client):
+        """Les valeurs manquantes sont retournées comme None"""
+        snapshot = BoardSnapshot(refresh_interval=60, client=client)
+
+        row = snapshot.get_row('GAZP')
+
+        assert row['LAST'] is None
+        assert row['VOLTODAY'] == 2000
+        assert snapshot.get_row('UNKNOWN') is None
+
+    def test_refresh_after_interval(self, client):
+        """L'instantané est rechargé une fois l'intervalle écoulé"""
+        snapshot = BoardSnapshot(refresh_interval=0, client=client)
+
+        snapshot.get_price('SBER')
+        snapshot.get_price('SBER')
+
+        assert client.calls == 2
+
+    def test_failure_is_throttled(self, board_client):
+        """Un échec ne provoque pas une requête par recherche"""
+        client = board_client(fail=True)
+        snapshot = BoardSnapshot(refresh_interval=60, client=client)
+
+        assert snapshot.get_prices(['SBER', 'GAZP']) == {}
+        assert client.calls == 1
+
+    def test_failure_retried_with_backoff(self, board_client, monkeypatch):
+        """Un échec hors séance est retenté après un délai court qui double, pas à la prochaine ouverture"""
+        clock = [1000.0]
+        monkeypatch.setattr(board_snapshot.time, 'monotonic', lambda: clock[0])
+        client = board_client(fail=True)
+        # Marché fermé le samedi : intervalle jusqu'à l'ouverture de lundi
+        snapshot = BoardSnapshot(refresh_interval=46 * 3600, client=client)
+
+        snapshot.get_price('SBER')
+        clock[0] += board_snapshot.RETRY_DELAY
+        snapshot.get_price('SBER')
+        assert client.calls == 2
+
+        clock[0] += board_snapshot.RETRY_DELAY
+        snapshot.get_price('SBER')
+        assert client.calls == 2
+        clock[0] += board_snapshot.RETRY_DELAY
+        client.fail = False
+        assert snapshot.get_price('SBER') == 281.5
+        assert client.calls == 3
+
+        # Après un succès, l'intervalle de la phase du marché s'applique
+        clock[0] += board_snapshot.RETRY_MAX_DELAY
+        snapshot.get_price('SBER')
+        assert client.calls == 3
+
+    def test_revalidation_failure_retried(self, board_client, monkeypatch):
+        """Un échec de revalidation en arrière-plan est aussi retenté après le délai court"""
+        clock = [1000.0]
+        monkeypatch.setattr(board_snapshot.time, 'monotonic', lambda: clock[0])
+        client = board_client()
+        snapshot = BoardSnapshot(refresh_interval=3600, client=client)
+        snapshot.get_price('SBER')
+
+        client.fail = True
+        clock[0] += 3600
+        snapshot._reload(clock[0])
+        assert snapshot.get_price('SBER') == 281.5
+        assert client.calls == 2
+
+        clock[0] += board_snapshot.RETRY_DELAY
+        snapshot.get_price('SBER')
+        assert client.calls == 3
+
+    def test_stale_served_while_revalidating(self, board_client):
+        """En mode stale-while-revalidate, l'instantané périmé est servi sans attendre"""
+        release = threading.Event()
+        client = board_client(release=release)
+        snapshot = BoardSnapshot(refresh_interval=0, client=client, stale_while_revalidate=True)
+        snapshot.get_price('SBER')
+
+        started = time.monotonic()
+        price = snapshot.get_price('SBER')
+
+        assert price == 281.5
+        assert time.monotonic() - started < 1
+        assert snapshot.revalidating
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while snapshot.revalidating and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.calls == 2
+        assert snapshot.age < 5
@@ -0,0 +1,173 @@
+"""
+Tests unitaires pour le format des entrées du cache fichier
+"""
+import os
+import struct
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import cache_codec
+from src.utils.cache_codec import CacheFormatError, decode_entry, encode_entry, read_meta
+from src.utils.cache_maintenance import CacheJanitor
+from src.utils.cache_manager import CacheManager
+
+
+def round_trip(value, meta=None):
+    data = bytearray(b''.join(encode_entry(value, meta or {})))
+    _, header = read_meta(data)
+    return decode_entry(data, header)
+
+
+def candles(n=50):
+    index = pd.date_range('2024-01-01 10:00', periods=n, freq='min', tz='Europe/Moscow', name='begin')
+    return pd.DataFrame({
+        'close': 100.0 + np.arange(n, dtype=np.float64),
+        'volume': np.arange(n, dtype=np.int64),
+        'secid': pd.Categorical(['SBER', 'GAZP'] * (n // 2)),
+        'board': pd.array(['TQBR'] * n, dtype='string'),
+        'lots': pd.array([1, None] * (n // 2), dtype='Int64'),
+        'note': ['ok'] * n
+    }, index=index)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    janitor = CacheJanitor()
+    manager = CacheManager(str(tmp_path), janitor=janitor)
+    janitor.stop()
+    return manager
+
+
+class TestCacheCodec:
+    """Tests pour encode_entry / decode_entry"""
+
+    def test_dataframe_round_trip(self):
+        """Index fuseau horaire, catégories, chaînes et entiers nullables sont restaurés"""
+        df = candles()
+
+        pd.testing.assert_frame_equal(round_trip(df), df)
+
+    def test_arrays_and_containers_round_trip(self):
+        """Tableaux numpy, scalaires et conteneurs imbriqués sont restaurés à l'identique"""
+        value = {
+            'matrix': np.arange(12, dtype=np.float32).reshape(3, 4),
+            'when': [datetime(2024, 5, 15, 10, 0), date(2024, 5, 15), pd.Timestamp('2024-05-15', tz='UTC')],
+            'misc': (1, 2 ** 70, float('nan'), Decimal('1.10'), b'\x00\x01', None, {'a', 'b'}),
+            'series': pd.Series([1.5, 2.5], index=['SBER', 'GAZP'], name='last'),
+            ('tuple', 'key'): np.float64(3.5)
+        }
+
+        decoded = round_trip(value)
+
+        np.testing.assert_array_equal(decoded['matrix'], value['matrix'])
+        assert decoded['matrix'].dtype == np.float32
+        assert decoded['when'] == value['when']
+        assert decoded['misc'][:2] == (1, 2 ** 70) and np.isnan(decoded['misc'][2])
+        assert decoded['misc'][3:] == value['misc'][3:]
+        pd.testing.assert_series_equal(decoded['series'], value['series'])
+        assert decoded[('tuple', 'key')] == 3.5
+
+    def test_buffers_aligned(self):
+        """Les tableaux sont relus à des adresses alignées, sans copie"""
+        data = bytearray(b''.join(encode_entry({'a': np.arange(3, dtype=np.int8), 'b': np.arange(5.0)}, {})))
+        _, header = read_meta(data)
+
+        assert all(d['offset'] % cache_codec.ALIGNMENT == 0 for d in header['buffers'])
+        assert decode_entry(data, header)['b'].base is not None
+
+    def test_unsupported_type(self):
+        """Un objet arbitraire est refusé au lieu d'être exécuté à la relecture"""
+        with pytest.raises(TypeError):
+            encode_entry(object(), {})
+
+    def test_corruption_detected(self):
+        """Un fichier tronqué, modifié ou d'une autre version est rejeté"""
+        data = bytearray(b''.join(encode_entry(candles(), {'key': 'k'})))
+
+        with pytest.raises(CacheFormatError):
+            read_meta(data[:len(data) // 2])
+
+        flipped = bytearray(data)
+        flipped[len(data) // 2] ^= 0xFF
+        with pytest.raises(CacheFormatError):
+            read_meta(flipped)
+
+        other_version = bytearray(data)
+        struct.pack_into('<H', other_version, len(cache_codec.MAGIC), cache_codec.SCHEMA_VERSION + 1)
+        with pytest.raises(CacheFormatError):
+            read_meta(other_version)
+
+
+class TestCacheManagerFiles:
+    """Tests pour le niveau fichier de CacheManager"""
+
+    def test_sharded_layout(self, manager, tmp_path):
+        """Les entrées sont réparties en sous-répertoires, sans fichier temporaire résiduel"""
+        for i in range(20):
+            manager.set(f'key-{i}', i)
+
+        files = [os.path.join(root, f) for root, _, names in os.walk(tmp_path) for f in names]
+        assert len(files) == 20
+        assert all(f.endswith('.ent') and os.path.dirname(f) != str(tmp_path) for f in files)
+
+    def test_disk_round_trip(self, manager):
+        """Un DataFrame relu du disque est identique à celui stocké"""
+        manager.set('candles', candles(), ttl=60)
+        manager.memory_cache.clear()
+
+        pd.testing.assert_frame_equal(manager.get('candles'), candles())
+
+    def test_corrupt_file_is_a_miss(self, manager):
+        """Un fichier tronqué est ignoré, supprimé et compté"""
+        manager.set('key', candles(), ttl=60)
+        manager.memory_cache.clear()
+        path = manager._get_file_path('key')
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) // 2)
+
+        assert manager.get('key') is None
+        assert not os.path.exists(path)
+        assert manager.stats()['corrupt'] == 1
+
+    def test_unsupported_value_stays_in_memory(self, manager):
+        """Une valeur non sérialisable reste servie depuis la mémoire seulement"""
+        marker = object()
+        manager.set('key', marker, ttl=60)
+
+        assert manager.get('key') is marker
+        assert not os.path.exists(manager._get_file_path('key'))
+
+    def test_concurrent_readers_never_see_partial_entries(self, manager):
+        """Les lectures pendant des réécritures voient une entrée complète ou aucune"""
+        frames = [candles(500), candles(500).iloc[::-1]]
+        errors = []
+        stop = threading.Event()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                manager.set('key', frames[i % 2], ttl=60)
+                i += 1
+
+        def reader():
+            for _ in range(200):
+                manager.memory_cache.clear()
+                value = manager.get('key')
+                if value is not None and len(value) != 500:
+                    errors.append(len(value))
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads[1:]:
+            thread.join()
+        stop.set()
+        threads[0].join()
+
+        assert errors == []
+        assert manager.stats()['corrupt'] == 0
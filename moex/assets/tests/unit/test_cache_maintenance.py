@@ -0,0 +1,317 @@
+"""
+Tests unitaires pour la maintenance des répertoires de cache
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.utils import cache_manager, session
+from src.utils.cache_maintenance import CacheDirectory, CacheJanitor
+from src.utils.cache_manager import CacheManager
+from src.utils.memory_cache import MemoryCache, estimate_size
+
+
+def write_entry(directory, name, size, used_at, modified_at=None):
+    """Crée un fichier de `size` octets avec ses dates d'accès et de modification"""
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    os.utime(path, (used_at, modified_at if modified_at is not None else used_at))
+    return path
+
+
+class TestCacheDirectory:
+    """Tests pour CacheDirectory"""
+
+    def test_evicts_least_recently_used_over_budget(self, tmp_path):
+        """Les entrées les moins récemment utilisées partent jusqu'à respecter le budget"""
+        now = time.time()
+        old = write_entry(tmp_path, 'old.bin', 400, now - 300)
+        mid = write_entry(tmp_path, 'mid.bin', 400, now - 200)
+        new = write_entry(tmp_path, 'new.bin', 400, now - 100)
+        directory = CacheDirectory(str(tmp_path), max_bytes=1000)
+
+        result = directory.sweep(now)
+
+        assert result == {'expired': 0, 'evicted': 1}
+        assert not os.path.exists(old)
+        assert os.path.exists(mid) and os.path.exists(new)
+        stats = directory.stats()
+        assert stats['entries'] == 2
+        assert stats['bytes'] == 800
+
+    def test_touch_refreshes_recency(self, tmp_path):
+        """Une entrée relue redevient récente"""
+        now = time.time()
+        old = write_entry(tmp_path, 'old.bin', 400, now - 300)
+        mid = write_entry(tmp_path, 'mid.bin', 400, now - 200)
+        directory = CacheDirectory(str(tmp_path), max_bytes=500)
+
+        CacheDirectory.touch(old)
+        directory.sweep()
+
+        assert os.path.exists(old)
+        assert not os.path.exists(mid)
+
+    def test_mtime_as_expiry(self, tmp_path):
+        """Avec mtime_is_expiry, les entrées dont l'échéance est passée sont supprimées"""
+        now = time.time()
+        expired = write_entry(tmp_path, 'a.pkl', 10, now, modified_at=now - 1)
+        alive = write_entry(tmp_path, 'b.pkl', 10, now, modified_at=now + 60)
+        directory = CacheDirectory(str(tmp_path), max_bytes=1 << 20, mtime_is_expiry=True)
+
+        result = directory.sweep(now)
+
+        assert result['expired'] == 1
+        assert not os.path.exists(expired)
+        assert os.path.exists(alive)
+
+    def test_max_age_and_stale_tmp(self, tmp_path):
+        """Les entrées trop anciennes et les fichiers temporaires abandonnés sont purgés"""
+        now = time.time()
+        stale = write_entry(tmp_path, 'stale.json', 10, now - 7200)
+        tmp = write_entry(tmp_path, 'write.tmp', 10, now - 7200)
+        fresh = write_entry(tmp_path, 'fresh.json', 10, now - 60)
+        directory = CacheDirectory(str(tmp_path), max_bytes=1 << 20, max_age=3600)
+
+        directory.sweep(now)
+
+        assert not os.path.exists(stale)
+        assert not os.path.exists(tmp)
+        assert os.path.exists(fresh)
+
+    def test_non_recursive_ignores_subdirectories(self, tmp_path):
+        """Un répertoire non récursif ne touche pas aux sous-répertoires"""
+        now = time.time()
+        (tmp_path / 'history').mkdir()
+        nested = write_entry(tmp_path / 'history', 'SBER_1d.col', 10, now - 7200)
+        directory = CacheDirectory(str(tmp_path), max_bytes=0, max_age=3600, recursive=False)
+
+        directory.sweep(now)
+
+        assert os.path.exists(nested)
+
+    def test_hit_rate(self, tmp_path):
+        """Le taux de succès suit les accès enregistrés"""
+        directory = CacheDirectory(str(tmp_path), max_bytes=1)
+        directory.record_hit()
+        directory.record_hit()
+        directory.record_hit()
+        directory.record_miss()
+
+        stats = directory.stats()
+
+        assert stats['hits'] == 3
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.75
+
+
+class TestCacheJanitor:
+    """Tests pour CacheJanitor"""
+
+    def test_register_deduplicates_paths(self, tmp_path):
+        """Un même chemin n'est enregistré qu'une fois"""
+        janitor = CacheJanitor()
+        first = janitor.register(CacheDirectory(str(tmp_path), 100))
+        second = janitor.register(CacheDirectory(str(tmp_path) + os.sep, 200))
+
+        assert second is first
+        assert list(janitor.stats()) == [first.name]
+
+    def test_background_sweep(self, tmp_path):
+        """Le thread de balayage applique le budget sans appel explicite"""
+        now = time.time()
+        write_entry(tmp_path, 'a.bin', 100, now - 10)
+        janitor = CacheJanitor(interval=0.05)
+        directory = janitor.register(CacheDirectory(str(tmp_path), max_bytes=0))
+
+        janitor.start()
+        try:
+            deadline = time.time() + 2
+            while directory.stats()['sweeps'] == 0 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            janitor.stop(timeout=1)
+
+        assert directory.stats()['evictions'] == 1
+        assert os.listdir(tmp_path) == []
+
+
+class TestCacheManager:
+    """Tests pour CacheManager"""
+
+    def test_file_expiry_drives_sweep(self, tmp_path):
+        """Le TTL d'une entrée est porté par la date de modification de son fichier"""
+        janitor = CacheJanitor()
+        manager = CacheManager(str(tmp_path), janitor=janitor)
+        janitor.stop()
+        manager.set('short', 1, ttl=1)
+        manager.set('long', 2, ttl=3600)
+
+        result = manager.directory.sweep(time.time() + 10)
+
+        assert result['expired'] == 1
+        remaining = [os.path.join(root, f) for root, _, files in os.walk(tmp_path) for f in files]
+        assert remaining == [manager._get_file_path('long')]
+
+    def test_stats_count_hits_and_misses(self, tmp_path):
+        """Les lectures alimentent les compteurs du répertoire"""
+        janitor = CacheJanitor()
+        manager = CacheManager(str(tmp_path), janitor=janitor)
+        janitor.stop()
+        manager.set('key', 'value')
+
+        assert manager.get('key') == 'value'
+        assert manager.get('missing') is None
+
+        stats = manager.stats()
+        assert stats['hits'] == 0
+        assert stats['misses'] == 1
+        assert stats['memory']['entries'] == 1
+        assert stats['memory']['namespaces']['default'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+    def test_disk_hit_restores_memory_tier(self, tmp_path):
+        """Une entrée absente de la mémoire est relue sur disque puis remise en mémoire"""
+        janitor = CacheJanitor()
+        manager = CacheManager(str(tmp_path), janitor=janitor)
+        janitor.stop()
+        manager.set('key', [1, 2, 3], ttl=60, namespace='candles')
+        manager.memory_cache.clear()
+
+        assert manager.get('key', namespace='candles') == [1, 2, 3]
+        assert 'key' in manager.memory_cache
+        assert manager.stats()['hits'] == 1
+
+    def test_get_or_compute_runs_once_for_concurrent_callers(self, tmp_path):
+        """Les appelants simultanés d'une même clé partagent un seul calcul"""
+        janitor = CacheJanitor()
+        manager = CacheManager(str(tmp_path), janitor=janitor)
+        janitor.stop()
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return np.arange(1000.0)
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            results = list(pool.map(lambda _: manager.get_or_compute('candles', compute, ttl=60), range(20)))
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert manager.get_or_compute('candles', compute, ttl=60) is results[0]
+        assert len(calls) == 1
+
+    def test_session_values_not_shared(self, tmp_path, monkeypatch):
+        """Les valeurs d'une session ne sont visibles que d'elle, qui n'en garde qu'une clé"""
+        janitor = CacheJanitor()
+        manager = CacheManager(str(tmp_path), janitor=janitor)
+        janitor.stop()
+        monkeypatch.setattr(cache_manager, '_cache_manager', manager)
+        frame = pd.DataFrame({'close': np.arange(10.0)})
+
+        st.session_state.cache_session_id = 'first'
+        st.session_state.data_cache = {}
+        session.add_to_cache('SBER_candles', frame, ttl=60)
+        first = dict(st.session_state.data_cache)
+
+        assert session.get_from_cache('SBER_candles') is frame
+        assert isinstance(first['SBER_candles'], str)
+        assert session.get_from_cache('GAZP_candles') is None
+
+        # Une autre session utilisant la même clé ne voit pas la valeur
+        st.session_state.cache_session_id = 'second'
+        st.session_state.data_cache = {}
+        assert session.get_from_cache('SBER_candles') is None
+        assert st.session_state.data_cache == {}
+        del st.session_state.cache_session_id
+        # Valeurs de session en mémoire seulement : aucun fichier d'entrée
+        assert not list(tmp_path.rglob('*.ent'))
+
+
+class FakeTimer:
+    """Horloge manuelle pour les tests d'expiration"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryCache:
+    """Tests pour MemoryCache"""
+
+    def test_entry_limit_evicts_least_recently_used(self):
+        """Au-delà du nombre d'entrées, la moins récemment lue est évincée"""
+        cache = MemoryCache(max_entries=2, max_bytes=1 << 20)
+        cache.set('a', 1, ttl=60)
+        cache.set('b', 2, ttl=60)
+        cache.get('a')
+        cache.set('c', 3, ttl=60)
+
+        assert 'a' in cache and 'c' in cache
+        assert 'b' not in cache
+        assert cache.stats()['evictions'] == 1
+
+    def test_byte_limit_uses_estimated_size(self):
+        """Le budget en octets tient compte de la taille des DataFrames"""
+        frame = pd.DataFrame({'close': np.zeros(10_000)})
+        cache = MemoryCache(max_entries=100, max_bytes=200_000)
+        cache.set('first', frame, ttl=60)
+        cache.set('second', frame.copy(), ttl=60)
+        cache.set('third', frame.copy(), ttl=60)
+
+        stats = cache.stats()
+        assert stats['entries'] == 2
+        assert stats['bytes'] <= 200_000
+        assert 'first' not in cache
+
+    def test_oversized_value_rejected(self):
+        """Une valeur plus grosse que le budget n'est pas conservée"""
+        cache = MemoryCache(max_entries=10, max_bytes=1000)
+
+        assert not cache.set('big', np.zeros(1000), ttl=60)
+        assert 'big' not in cache
+        assert cache.stats()['rejected'] == 1
+
+    def test_per_entry_ttl(self):
+        """Chaque entrée expire selon son propre TTL"""
+        timer = FakeTimer()
+        cache = MemoryCache(max_entries=10, max_bytes=1 << 20, timer=timer)
+        cache.set('short', 1, ttl=5)
+        cache.set('long', 2, ttl=60)
+
+        timer.now = 10
+
+        assert cache.get('short') is None
+        assert cache.get('long') == 2
+        assert len(cache) == 1
+
+    def test_namespace_counters(self):
+        """Les succès et échecs sont comptés par espace de noms"""
+        cache = MemoryCache(max_entries=10, max_bytes=1 << 20)
+        cache.set('k', 1, ttl=60, namespace='candles')
+        cache.get('k', namespace='candles')
+        cache.get('x', namespace='candles')
+        cache.get('y', namespace='indicators')
+
+        namespaces = cache.stats()['namespaces']
+        assert namespaces['candles'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+        assert namespaces['indicators']['misses'] == 1
+
+    def test_estimate_size(self):
+        """Les tableaux sont mesurés par leurs tampons"""
+        array = np.zeros(1000)
+        frame = pd.DataFrame({'a': array, 'b': array})
+
+        assert estimate_size(array) == 8000
+        assert estimate_size(frame) >= 16000
+        assert estimate_size({'x': array}) > 8000
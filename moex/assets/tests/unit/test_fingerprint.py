@@ -0,0 +1,157 @@
+"""
+Tests unitaires pour les empreintes de contenu
+"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import cache_manager
+from src.utils.cache_maintenance import CacheJanitor
+from src.utils.cache_manager import CacheManager, cache
+from src.utils.fingerprint import fingerprint, function_identity
+
+MOEX_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+
+def candles(n=100, start=100.0):
+    index = pd.date_range('2024-01-01', periods=n, freq='D', tz='Europe/Moscow')
+    return pd.DataFrame({'close': start + np.arange(n, dtype=np.float64), 'secid': 'SBER'}, index=index)
+
+
+class TestFingerprint:
+    """Tests pour fingerprint"""
+
+    def test_equal_content_equal_fingerprint(self):
+        """Deux DataFrames de même contenu ont la même empreinte"""
+        assert fingerprint(candles()) == fingerprint(candles())
+
+    def test_content_beyond_repr_changes_fingerprint(self):
+        """Une valeur masquée par la troncature du repr change l'empreinte"""
+        a = candles(1000)
+        b = a.copy()
+        b.iloc[500, 0] += 1e-9
+
+        assert str(a) == str(b)
+        assert fingerprint(a) != fingerprint(b)
+
+    def test_dtype_shape_and_index_matter(self):
+        """Le type, la forme et l'index font partie de l'empreinte"""
+        values = np.arange(6, dtype=np.int64)
+
+        assert fingerprint(values) != fingerprint(values.astype(np.float64))
+        assert fingerprint(values) != fingerprint(values.reshape(2, 3))
+        assert fingerprint(candles()) != fingerprint(candles().reset_index(drop=True))
+
+    def test_types_are_distinguished(self):
+        """Des valeurs de types différents ne se confondent pas"""
+        values = [1, 1.0, '1', True, [1], (1,), None]
+
+        assert len({fingerprint(v) for v in values}) == len(values)
+
+    def test_dict_order_irrelevant(self):
+        """L'ordre d'insertion d'un dictionnaire est ignoré"""
+        assert fingerprint({'a': 1, 'b': 2}) == fingerprint({'b': 2, 'a': 1})
+
+    def test_unsupported_object(self):
+        """Un objet sans représentation stable est refusé"""
+        with pytest.raises(TypeError):
+            fingerprint(object())
+
+    def test_stable_across_processes(self):
+        """L'empreinte ne dépend pas de la graine de hash() du processus"""
+        code = (
+            "import numpy as np, pandas as pd\n"
+            "from src.utils.fingerprint import fingerprint\n"
+            "print(fingerprint({'symbols': {'SBER', 'GAZP'}, 'prices': np.arange(10.0)},"
+            " pd.Timestamp('2024-05-15', tz='Europe/Moscow')))\n"
+        )
+        digests = {
+            subprocess.run(
+                [sys.executable, '-c', code], cwd=MOEX_ROOT, capture_output=True, text=True, check=True,
+                env=dict(os.environ, PYTHONHASHSEED=seed)
+            ).stdout.strip()
+            for seed in ('1', '2')
+        }
+
+        assert len(digests) == 1
+
+
+class TestFunctionIdentity:
+    """Tests pour function_identity"""
+
+    def test_version_changes_identity(self):
+        """La version fait partie de l'identité"""
+        def sma(x):
+            return x
+
+        assert function_identity(sma, 'v1') != function_identity(sma, 'v2')
+
+    def test_body_changes_identity(self):
+        """Deux fonctions de même nom mais de corps différents ont des identités différentes"""
+        def first(x):
+            return x + 1
+        body_one = function_identity(first).rsplit(':', 1)[1]
+
+        def first(x):  # noqa: F811
+            return x + 2
+        body_two = function_identity(first).rsplit(':', 1)[1]
+
+        assert body_one != body_two
+
+
+class TestCacheDecorator:
+    """Tests pour le décorateur cache"""
+
+    @pytest.fixture(autouse=True)
+    def manager(self, tmp_path, monkeypatch):
+        manager = CacheManager(str(tmp_path), janitor=CacheJanitor())
+        manager.janitor.stop()
+        monkeypatch.setattr(cache_manager, '_cache_manager', manager)
+        return manager
+
+    def test_dataframe_arguments_memoized(self):
+        """Un DataFrame de même contenu réutilise le résultat mémorisé"""
+        calls = []
+
+        @cache(ttl=60)
+        def last_close(df):
+            calls.append(1)
+            return df['close'].iloc[-1]
+
+        assert last_close(candles()) == last_close(candles())
+        assert len(calls) == 1
+
+        last_close(candles(start=50.0))
+        assert len(calls) == 2
+
+    def test_unfingerprintable_arguments_not_cached(self):
+        """Les arguments sans empreinte stable contournent le cache"""
+        calls = []
+
+        @cache(ttl=60)
+        def identity(value):
+            calls.append(1)
+            return value
+
+        marker = object()
+        assert identity(marker) is marker
+        assert identity(marker) is marker
+        assert len(calls) == 2
+
+    def test_uncacheable_results_recomputed(self):
+        """Les résultats refusés par `cacheable` sont retournés sans être mis en cache"""
+        calls = []
+
+        @cache(ttl=60, cacheable=lambda result: result is not None)
+        def lookup(value):
+            calls.append(1)
+            return None if len(calls) == 1 else value
+
+        assert lookup(1) is None
+        assert lookup(1) == 1
+        assert lookup(1) == 1
+        assert len(calls) == 2
@@ -0,0 +1,116 @@
+"""
+Tests unitaires pour le moteur d'indicateurs techniques
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.indicators import IndicatorEngine, compute_indicators, with_indicators
+from src.indicators.engine import field, sma
+from src.visualization.indicators import add_bollinger_bands, add_rsi, get_all_indicators
+
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(42)
+    n = 300
+    close = 100 + rng.standard_normal(n).cumsum()
+    return pd.DataFrame({
+        'Open': close + rng.standard_normal(n) * 0.1,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': rng.integers(100, 10000, n).astype(float)
+    }, index=pd.date_range('2024-01-01', periods=n, freq='D'))
+
+
+class TestIndicatorEngine:
+    """Tests pour IndicatorEngine"""
+
+    def test_matches_pandas_reference(self, ohlcv):
+        """Les résultats correspondent aux calculs pandas de référence"""
+        result = compute_indicators(ohlcv, ['ma', 'rsi', 'bollinger', 'macd', 'volatility'])
+        close = ohlcv['Close']
+
+        delta = close.diff()
+        gain = delta.where(delta > 0, 0).rolling(14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+        macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+
+        pd.testing.assert_series_equal(result['MA50'], close.rolling(50).mean(), check_names=False)
+        pd.testing.assert_series_equal(result['RSI'], 100 - 100 / (1 + gain / loss), check_names=False)
+        pd.testing.assert_series_equal(
+            result['BB_Upper'], close.rolling(20).mean() + 2 * close.rolling(20).std(), check_names=False
+        )
+        pd.testing.assert_series_equal(
+            result['MACD_Signal'], macd.ewm(span=9, adjust=False).mean(), check_names=False
+        )
+        pd.testing.assert_series_equal(
+            result['Volatility'], close.pct_change().rolling(20).std() * np.sqrt(252), check_names=False
+        )
+
+    def test_shared_intermediates_computed_once(self):
+        """La moyenne 20 commune à MA20 et BB_Middle n'apparaît qu'une fois dans le plan"""
+        outputs = IndicatorEngine.outputs([('ma', {'windows': [20]}), 'bollinger', 'volume_ma', 'volume_ratio'])
+        plan = IndicatorEngine.plan(outputs.values())
+
+        assert len(plan) == len(set(plan))
+        assert outputs['MA20'] == outputs['BB_Middle']
+        assert plan.count(sma(field('close'), 20)) == 1
+        assert plan.count(sma(field('volume'), 20)) == 1
+        # Chaque nœud est planifié après ses entrées
+        positions = {node: i for i, node in enumerate(plan)}
+        assert all(positions[source] < positions[node] for node in plan for source in node.inputs)
+
+    def test_single_output_block(self, ohlcv):
+        """Tous les indicateurs partagent un seul bloc float64"""
+        result = compute_indicators(ohlcv)
+
+        assert (result.dtypes == np.float64).all()
+        assert len({id(result[column].to_numpy().base) for column in result.columns}) == 1
+
+    def test_missing_fields_skip_indicators(self, ohlcv):
+        """Un indicateur dont une colonne manque n'est pas produit"""
+        result = compute_indicators(ohlcv.drop(columns=['Volume']), ['rsi', 'volume_ma', 'ad'])
+
+        assert list(result.columns) == ['RSI']
+
+    def test_lowercase_columns(self, ohlcv):
+        """Les colonnes en minuscules sont reconnues"""
+        lower = ohlcv.rename(columns=str.lower)
+
+        pd.testing.assert_frame_equal(compute_indicators(lower, ['rsi']), compute_indicators(ohlcv, ['rsi']))
+
+    def test_unknown_indicator(self, ohlcv):
+        """Un indicateur inconnu est refusé"""
+        with pytest.raises(ValueError):
+            compute_indicators(ohlcv, ['ichimoku'])
+
+    def test_with_indicators_replaces_existing_columns(self, ohlcv):
+        """Recalculer un indicateur remplace la colonne au lieu de la dupliquer"""
+        once = with_indicators(ohlcv, ['rsi'])
+        twice = with_indicators(once, [('rsi', {'period': 7})])
+
+        assert list(twice.columns).count('RSI') == 1
+        assert not twice['RSI'].equals(once['RSI'])
+
+
+class TestLegacyFunctions:
+    """Tests pour les fonctions add_* adossées au moteur"""
+
+    def test_add_functions_keep_input(self, ohlcv):
+        """Les fonctions add_* ajoutent leurs colonnes sans modifier l'entrée"""
+        columns = list(ohlcv.columns)
+
+        assert list(add_rsi(ohlcv).columns) == columns + ['RSI']
+        assert list(add_bollinger_bands(ohlcv).columns) == columns + ['BB_Middle', 'BB_Upper', 'BB_Lower']
+        assert list(ohlcv.columns) == columns
+
+    def test_get_all_indicators_columns(self, ohlcv):
+        """get_all_indicators conserve les colonnes historiques"""
+        result = get_all_indicators(ohlcv.iloc[:100])
+
+        assert 'MA200' not in result.columns
+        for column in ('MA20', 'MA50', 'RSI', 'BB_Middle', 'MACD_Histogram', 'Volume_Ratio', 'AD_MA',
+                       'Volatility', 'Resistance', 'Support'):
+            assert column in result.columns
@@ -0,0 +1,135 @@
+"""
+Tests unitaires pour les supports, résistances et pivots
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.indicators import (
+    IndicatorStream, SlidingExtreme, cluster_prices, compute_indicators, compute_panel, price_levels
+)
+from src.visualization.indicators import add_support_resistance
+
+
+@pytest.fixture
+def ohlc():
+    rng = np.random.default_rng(3)
+    n = 800
+    close = 100 + rng.standard_normal(n).cumsum()
+    high = close + rng.random(n)
+    low = close - rng.random(n)
+    high[[100, 450]] = np.nan
+    return pd.DataFrame({'High': high, 'Low': low, 'Close': close},
+                        index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+class TestSupportResistance:
+    """Tests pour les extrêmes glissants"""
+
+    @pytest.mark.parametrize('window', [1, 2, 7, 20, 64])
+    def test_matches_pandas_rolling(self, ohlc, window):
+        """Les modes causal et centré correspondent à rolling(center=False/True)"""
+        causal = compute_indicators(ohlc, [('support_resistance', {'window': window})])
+        centered = compute_indicators(ohlc, [('support_resistance', {'window': window, 'causal': False})])
+
+        pd.testing.assert_series_equal(causal['Resistance'], ohlc['High'].rolling(window).max(), check_names=False)
+        pd.testing.assert_series_equal(causal['Support'], ohlc['Low'].rolling(window).min(), check_names=False)
+        pd.testing.assert_series_equal(
+            centered['Resistance'], ohlc['High'].rolling(window, center=True).max(), check_names=False
+        )
+
+    def test_causal_ignores_future_bars(self, ohlc):
+        """Les valeurs causales ne changent pas quand des barres futures sont ajoutées"""
+        full = add_support_resistance(ohlc)
+        truncated = add_support_resistance(ohlc.iloc[:500])
+
+        pd.testing.assert_frame_equal(full.iloc[:500], truncated)
+
+    def test_panel(self, ohlc):
+        """Les extrêmes glissants d'un panel correspondent à ceux de chaque colonne"""
+        panel = compute_indicators(ohlc, ['support_resistance'])
+        wide = compute_panel({'high': pd.DataFrame({'A': ohlc['High'], 'B': ohlc['High'] * 2}),
+                              'low': pd.DataFrame({'A': ohlc['Low'], 'B': ohlc['Low'] * 2})},
+                             ['support_resistance'])
+
+        np.testing.assert_array_equal(wide['Resistance']['A'].to_numpy(), panel['Resistance'].to_numpy())
+        np.testing.assert_array_equal(wide['Support']['B'].to_numpy(), panel['Support'].to_numpy() * 2)
+
+
+class TestPivots:
+    """Tests pour la détection des pivots"""
+
+    def test_definition(self, ohlc):
+        """Un pivot haut domine les left barres précédentes et les right suivantes"""
+        pivots = compute_indicators(ohlc, [('pivots', {'left': 3, 'right': 2, 'causal': False})])
+        high = ohlc['High'].to_numpy()
+
+        expected = np.full(len(high), np.nan)
+        for i in range(3, len(high) - 2):
+            window = high[i - 3:i + 3]
+            if not np.isnan(window).any() and high[i] == window.max():
+                expected[i] = high[i]
+        np.testing.assert_array_equal(pivots['Pivot_High'].to_numpy(), expected)
+
+    def test_causal_reported_at_confirmation(self, ohlc):
+        """En mode causal, chaque pivot est reporté `right` barres plus tard"""
+        centered = compute_indicators(ohlc, [('pivots', {'right': 4, 'causal': False})])
+        causal = compute_indicators(ohlc, [('pivots', {'right': 4})])
+
+        pd.testing.assert_frame_equal(causal, centered.shift(4))
+
+    def test_stream_matches_batch(self, ohlc):
+        """Les pivots et extrêmes incrémentaux correspondent au calcul par lots"""
+        requests = [('pivots', {'left': 4, 'right': 3}), ('support_resistance', {'window': 15})]
+        batch = compute_indicators(ohlc, requests)
+        head, tail = ohlc.iloc[:300], ohlc.iloc[300:]
+
+        stream = IndicatorStream(requests)
+        stream.warm_up(head)
+        stream = IndicatorStream.from_state(json.loads(json.dumps(stream.state())))
+        rows = [stream.update(bar) for bar in tail.rename(columns=str.lower).to_dict('records')]
+
+        pd.testing.assert_frame_equal(pd.DataFrame(rows, index=tail.index)[batch.columns], batch.iloc[300:])
+
+    def test_stream_rejects_centered(self):
+        """Le mode centré n'est pas disponible en continu"""
+        with pytest.raises(ValueError):
+            IndicatorStream([('support_resistance', {'causal': False})])
+
+    def test_sliding_extreme_window(self):
+        """La file monotone retourne le minimum des dernières valeurs"""
+        extreme = SlidingExtreme(3, kind='min')
+        values = [extreme.push(x) for x in [5.0, 3.0, 4.0, 6.0, 7.0, np.nan, 1.0, 2.0, 0.5]]
+
+        np.testing.assert_array_equal(values, [np.nan, np.nan, 3, 3, 4, np.nan, np.nan, np.nan, 0.5])
+
+
+class TestPriceLevels:
+    """Tests pour le regroupement des pivots en niveaux"""
+
+    def test_cluster_prices(self):
+        """Les prix proches forment un niveau borné par la tolérance"""
+        labels = cluster_prices(np.array([100.0, 200.0, 100.3, 99.9, 202.0, 100.8]), tolerance=0.005)
+
+        assert list(labels) == [0, 2, 0, 0, 3, 1]
+
+    def test_touch_counts(self):
+        """Un niveau retesté compte toutes ses touches"""
+        # Oscillation entre 90 et 110 : cinq sommets et cinq creux
+        close = np.tile(np.concatenate([np.linspace(90, 110, 11), np.linspace(110, 90, 11)[1:-1]]), 5)
+        df = pd.DataFrame({'High': close, 'Low': close}, index=pd.RangeIndex(len(close)))
+
+        levels = price_levels(df, left=3, right=3)
+
+        assert list(levels['Level']) == [110.0, 90.0]
+        assert list(levels['Pivot_Highs']) == [5, 0]
+        assert list(levels['Pivot_Lows']) == [0, 4]
+        assert levels.loc[0, 'Last'] == 4 * 20 + 10 + 3
+
+    def test_no_pivots(self):
+        """Un historique trop court ne produit aucun niveau"""
+        df = pd.DataFrame({'High': [1.0, 2.0], 'Low': [0.5, 1.5]})
+
+        assert price_levels(df).empty
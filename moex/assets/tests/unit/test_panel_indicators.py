@@ -0,0 +1,78 @@
+"""
+Tests unitaires pour les indicateurs sur panel multi-symboles
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.simulator import simulate_panel
+from src.indicators import compute_indicators, compute_panel, latest_values
+
+REQUESTS = ['rsi', 'macd', 'bollinger', 'volatility']
+
+
+@pytest.fixture
+def closes():
+    panel = simulate_panel(6, periods=300, seed=11)
+    frame = pd.DataFrame(panel.close.T.copy(), index=panel.index, columns=panel.symbols)
+    # Historiques décalés : introductions en cours de période et suspension de cotation
+    frame.iloc[:40, 1] = np.nan
+    frame.iloc[:250, 2] = np.nan
+    frame.iloc[100:105, 3] = np.nan
+    frame.iloc[:, 4] = np.nan
+    return frame
+
+
+class TestComputePanel:
+    """Tests pour compute_panel"""
+
+    @pytest.mark.parametrize('requests', [REQUESTS, [('rsi', {'period': 10, 'smoothing': 'wilder'})]])
+    def test_matches_single_symbol_engine(self, closes, requests):
+        """Chaque symbole obtient le résultat du moteur sur son propre historique"""
+        result = compute_panel(closes, requests)
+
+        for symbol in closes.columns:
+            first = closes[symbol].first_valid_index()
+            for name, frame in result.items():
+                if first is None:
+                    assert frame[symbol].isna().all()
+                    continue
+                expected = compute_indicators(closes[symbol].loc[first:].to_frame('close'), requests)[name]
+                pd.testing.assert_series_equal(frame[symbol].loc[first:], expected, check_names=False)
+                assert frame[symbol].loc[:first].iloc[:-1].isna().all()
+
+    def test_market_panel_with_volume(self):
+        """Un MarketPanel fournit tous les champs, volume compris"""
+        panel = simulate_panel(['SBER', 'GAZP'], periods=60, seed=0)
+
+        result = compute_panel(panel, ['rsi', 'volume_ratio'])
+
+        assert list(result) == ['RSI', 'Volume_Ratio']
+        assert list(result['RSI'].columns) == ['SBER', 'GAZP']
+        pd.testing.assert_series_equal(
+            result['Volume_Ratio']['GAZP'], compute_indicators(panel.to_dataframe('GAZP'), ['volume_ratio'])['Volume_Ratio'],
+            check_names=False, check_freq=False
+        )
+
+    def test_ndarray_symbols_by_time(self, closes):
+        """Un tableau (symboles x temps) donne des tableaux de même forme, dans un seul bloc"""
+        values = closes.to_numpy().T
+
+        result = compute_panel(values, ['macd', 'bollinger'])
+
+        assert all(array.shape == values.shape for array in result.values())
+        assert len({id(array.base) for array in result.values()}) == 1
+        np.testing.assert_allclose(result['MACD'], compute_panel(closes, ['macd'])['MACD'].to_numpy().T)
+
+    def test_mismatched_shapes(self, closes):
+        """Des champs de formes différentes sont refusés"""
+        with pytest.raises(ValueError):
+            compute_panel({'close': closes, 'volume': closes.iloc[:10]}, ['volume_ratio'])
+
+    def test_latest_values(self, closes):
+        """latest_values donne une ligne par symbole avec la dernière valeur connue"""
+        table = latest_values(compute_panel(closes, ['rsi']))
+
+        assert list(table.index) == list(closes.columns)
+        assert table.loc[closes.columns[3], 'RSI'] == compute_panel(closes, ['rsi'])['RSI'].iloc[-1, 3]
+        assert np.isnan(table.loc[closes.columns[4], 'RSI'])
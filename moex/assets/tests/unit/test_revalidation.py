@@ -0,0 +1,90 @@
+"""
+Tests unitaires pour le rafraîchissement en arrière-plan
+"""
+import threading
+import time
+
+import pytest
+
+from src.utils.cache_maintenance import CacheJanitor
+from src.utils.cache_manager import CacheManager
+from src.utils.revalidation import Revalidator, get_revalidator
+
+
+class TestRevalidator:
+    """Tests pour Revalidator"""
+
+    def test_one_refresh_per_key(self):
+        """Les demandes pendant un rafraîchissement en cours sont mutualisées"""
+        revalidator = Revalidator(max_workers=2)
+        release = threading.Event()
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            release.wait(5)
+            return 'ok'
+
+        first = revalidator.submit('SBER', refresh)
+        second = revalidator.submit('SBER', refresh)
+        assert second is first
+        assert revalidator.is_pending('SBER')
+
+        release.set()
+        assert first.result(timeout=5) == 'ok'
+        assert len(calls) == 1
+        stats = revalidator.stats()
+        assert stats['scheduled'] == 1
+        assert stats['deduplicated'] == 1
+        assert stats['completed'] == 1
+        assert stats['pending'] == 0
+
+    def test_failure_counted_and_key_released(self):
+        """Un échec est compté et n'empêche pas un rafraîchissement ultérieur"""
+        revalidator = Revalidator(max_workers=1)
+
+        def fail():
+            raise RuntimeError("ISS indisponible")
+
+        with pytest.raises(RuntimeError):
+            revalidator.submit('GAZP', fail).result(timeout=5)
+
+        assert revalidator.submit('GAZP', lambda: 1).result(timeout=5) == 1
+        assert revalidator.stats()['failed'] == 1
+
+
+class TestGetOrRevalidate:
+    """Tests pour CacheManager.get_or_revalidate"""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        janitor = CacheJanitor()
+        manager = CacheManager(str(tmp_path), janitor=janitor)
+        janitor.stop()
+        return manager
+
+    def test_stale_value_served_then_refreshed(self, manager):
+        """Une valeur expirée est servie immédiatement puis recalculée en arrière-plan"""
+        versions = iter(range(10))
+        release = threading.Event()
+
+        def compute():
+            version = next(versions)
+            if version:
+                release.wait(5)
+            return version
+
+        assert manager.get_or_revalidate('quotes', compute, ttl=0, stale_ttl=60) == 0
+
+        started = time.monotonic()
+        assert manager.get_or_revalidate('quotes', compute, ttl=0, stale_ttl=60) == 0
+        assert time.monotonic() - started < 1
+
+        release.set()
+        revalidator = get_revalidator()
+        deadline = time.monotonic() + 5
+        while revalidator.stats()['pending'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        fresh_until, value = manager.get('quotes')
+        assert value == 1
@@ -0,0 +1,267 @@
+"""
+Tests unitaires pour le screener technique
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import screener as screener_module
+from src.data.board_snapshot import BoardSnapshot
+from src.data.screener import Condition, Screener, load_daily_history, parse_condition, top_k
+from src.indicators import compute_indicators
+from src.utils import cache_manager
+from src.utils.cache_maintenance import CacheJanitor
+from src.utils.cache_manager import CacheManager
+from src.utils.time_utils import MOSCOW_TZ
+
+# Board simulé de quatre actions, dont une sans historique
+BOARD_ROWS = (
+    ('SBER', 'Сбербанк', 280.0, 282.5, 1000),
+    ('GAZP', 'ГАЗПРОМ ао', 160.0, 150.0, 9000),
+    ('LKOH', 'ЛУКОЙЛ', 7000.0, 7100.0, 300),
+    ('NEW', 'Новая', 10.0, 10.5, 50),
+)
+
+# Mercredi en séance, heure de Moscou
+SESSION = MOSCOW_TZ.localize(datetime(2024, 3, 13, 12, 0))
+
+
+class FakeHistory:
+    """Historique journalier simulé : hausse régulière, baisse régulière, marche aléatoire"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, secids):
+        self.calls += 1
+        dates = pd.bdate_range(end=pd.Timestamp(SESSION.date()) - pd.Timedelta(days=1), periods=80)
+        rng = np.random.default_rng(0)
+        closes = {
+            'SBER': np.linspace(200, 280, 80),
+            'GAZP': np.linspace(220, 160, 80),
+            'LKOH': 7000 + rng.standard_normal(80).cumsum() * 20,
+        }
+        return {
+            secid: pd.DataFrame({'Close': close, 'Volume': np.full(80, 1000.0)}, index=dates)
+            for secid, close in closes.items() if secid in secids
+        }
+
+
+@pytest.fixture
+def snapshot(board_client):
+    """Fixture pour l'instantané simulé"""
+    return BoardSnapshot(refresh_interval=60, client=board_client(BOARD_ROWS))
+
+
+@pytest.fixture
+def history():
+    """Fixture pour l'historique simulé"""
+    return FakeHistory()
+
+
+class TestParseCondition:
+    """Tests pour parse_condition"""
+
+    def test_column_and_number(self):
+        """Colonne comparée à une constante"""
+        assert parse_condition('RSI < 30') == Condition('RSI', '<', 30.0)
+        assert parse_condition('Volume_Ratio>=2.5') == Condition('Volume_Ratio', '>=', 2.5)
+        assert parse_condition('change > -1e-1') == Condition('change', '>', -0.1)
+
+    def test_two_columns(self):
+        """Deux colonnes comparées entre elles"""
+        assert parse_condition('close > BB_Upper') == Condition('close', '>', 'BB_Upper')
+
+    @pytest.mark.parametrize('text', ['RSI', 'RSI < ', 'RSI << 30', '__import__("os") > 1', 'RSI < 30 and 1'])
+    def test_invalid(self, text):
+        """Les filtres mal formés sont refusés sans être évalués"""
+        with pytest.raises(ValueError):
+            parse_condition(text)
+
+
+class TestTopK:
+    """Tests pour top_k"""
+
+    def test_matches_full_sort(self):
+        """La sélection partielle donne les mêmes positions qu'un tri complet"""
+        values = np.random.default_rng(1).standard_normal(1000)
+        values[::7] = np.nan
+
+        valid = np.flatnonzero(~np.isnan(values))
+        full = valid[np.argsort(-values[valid], kind='stable')]
+
+        np.testing.assert_array_equal(top_k(values, 25), full[:25])
+        np.testing.assert_array_equal(top_k(values, 25, ascending=True), full[::-1][:25])
+
+    def test_k_larger_than_values(self):
+        """k supérieur au nombre de valeurs retourne toutes les valeurs non manquantes"""
+        np.testing.assert_array_equal(top_k(np.array([1.0, np.nan, 3.0]), 10), [2, 0])
+        assert len(top_k(np.array([np.nan]), 5)) == 0
+        assert len(top_k(np.array([1.0]), 0)) == 0
+
+
+class TestScreener:
+    """Tests pour Screener"""
+
+    @pytest.fixture(autouse=True)
+    def clock(self, monkeypatch):
+        """Horloge de Moscou figée (séance ouverte par défaut)"""
+        now = [SESSION]
+        monkeypatch.setattr(screener_module, 'get_moscow_time', lambda: now[0])
+        return now
+
+    def test_table_uses_current_quote(self, snapshot, history):
+        """La dernière barre des indicateurs est la cotation courante de l'instantané"""
+        screener = Screener(snapshot, history_loader=history)
+        table = screener.table()
+
+        closes = pd.concat([history(['SBER'])['SBER']['Close'], pd.Series([snapshot.get_price('SBER')])])
+        expected = compute_indicators(pd.DataFrame({'Close': closes.to_numpy()}), ['rsi'])['RSI'].iloc[-1]
+
+        assert table.loc['SBER', 'close'] == snapshot.get_price('SBER')
+        assert table.loc['SBER', 'RSI'] == pytest.approx(expected)
+        assert table.loc['GAZP', 'change'] == pytest.approx((150.0 / 160.0 - 1) * 100)
+        # Sans historique, seuls les champs de l'instantané sont renseignés
+        assert np.isnan(table.loc['NEW', 'RSI'])
+        assert table.loc['NEW', 'close'] == 10.5
+
+    def test_closed_market_uses_history(self, snapshot, history, clock):
+        """Un samedi, aucune barre fictive n'est ajoutée à l'historique clos"""
+        clock[0] = MOSCOW_TZ.localize(datetime(2024, 3, 16, 12, 0))
+        table = Screener(snapshot, history_loader=history).table()
+
+        closes = history(['SBER'])['SBER']['Close']
+        expected = compute_indicators(pd.DataFrame({'Close': closes.to_numpy()}), ['rsi'])['RSI'].iloc[-1]
+
+        assert table.loc['SBER', 'close'] == closes.iloc[-1]
+        assert table.loc['SBER', 'RSI'] == pytest.approx(expected)
+        assert table.loc['GAZP', 'Volume_Ratio'] == pytest.approx(1.0)
+
+    def test_before_open_uses_history(self, snapshot, history, clock):
+        """Avant l'ouverture d'un jour de séance, l'historique clos est utilisé tel quel"""
+        clock[0] = SESSION.replace(hour=8)
+        table = Screener(snapshot, history_loader=history).table()
+
+        assert table.loc['SBER', 'close'] == history(['SBER'])['SBER']['Close'].iloc[-1]
+        assert table.loc['GAZP', 'volume'] == 1000.0
+
+    def test_screen_filters_and_ranks(self, snapshot, history):
+        """Seules les actions vérifiant tous les filtres sont retournées, dans l'ordre"""
+        screener = Screener(snapshot, history_loader=history)
+
+        oversold = screener.screen(['RSI < 30'], sort_by='RSI')
+        ranked = screener.screen([], sort_by='change', k=2)
+        both = screener.screen(['rsi > 50', 'close > MA20'], sort_by='volume')
+
+        assert list(oversold.index) == ['GAZP']
+        assert list(ranked.index) == ['NEW', 'LKOH']
+        assert list(both.index) == ['SBER']
+
+    def test_unknown_column(self, snapshot, history):
+        """Une colonne inconnue est signalée"""
+        with pytest.raises(ValueError):
+            Screener(snapshot, history_loader=history).screen(['Ichimoku > 0'])
+
+    def test_cached_per_snapshot(self, snapshot, history):
+        """Table et résultats sont réutilisés tant que l'instantané ne change pas"""
+        screener = Screener(snapshot, history_loader=history)
+
+        first = screener.screen(['RSI > 0'])
+        again = screener.screen([Condition('RSI', '>', 0.0)])
+        assert again is first
+        assert history.calls == 1
+
+        snapshot.refresh(force=True)
+        refreshed = screener.screen(['RSI > 0'])
+        assert refreshed is not first
+        assert history.calls == 2
+        assert refreshed.loc['SBER', 'close'] == snapshot.get_price('SBER')
+
+    def test_table_computed_outside_lock(self, snapshot, history):
+        """L'historique est chargé hors du verrou, une seule fois pour des appels concurrents"""
+        screener = Screener(snapshot, history_loader=history)
+        started, release, locked = threading.Event(), threading.Event(), []
+
+        def slow_history(secids):
+            locked.append(screener._lock.locked())
+            started.set()
+            release.wait(5)
+            return history(secids)
+
+        screener.history_loader = slow_history
+        threads = [threading.Thread(target=screener.table) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        assert started.wait(5)
+        # Le verrou reste disponible pendant le calcul
+        assert screener._lock.acquire(timeout=1)
+        screener._lock.release()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert locked == [False]
+        assert history.calls == 1
+
+
+class TestLoadDailyHistory:
+    """Tests pour load_daily_history"""
+
+    @pytest.fixture(autouse=True)
+    def manager(self, tmp_path, monkeypatch):
+        manager = CacheManager(str(tmp_path), janitor=CacheJanitor())
+        manager.janitor.stop()
+        monkeypatch.setattr(cache_manager, '_cache_manager', manager)
+        return manager
+
+    def fake_batch(self, monkeypatch, failed=(), idle=()):
+        calls = []
+
+        def fetch_candles_batch(secids, errors=None, **kwargs):
+            calls.append(kwargs)
+            candles = pd.DataFrame({'Close': [1.0]}, index=pd.DatetimeIndex(['2024-01-02']))
+            errors.update((secid, RuntimeError("HTTP 503")) for secid in secids if secid in failed)
+            return {secid: pd.DataFrame() if secid in failed or secid in idle else candles for secid in secids}
+
+        monkeypatch.setattr(screener_module, 'fetch_candles_batch', fetch_candles_batch)
+        return calls
+
+    def freeze(self, monkeypatch, day):
+        moment = MOSCOW_TZ.localize(datetime(2024, 3, day, 12, 0))
+        monkeypatch.setattr(screener_module, 'get_moscow_time', lambda: moment)
+
+    def test_failed_history_not_cached(self, monkeypatch):
+        """Un historique avec un SECID en erreur est rechargé à l'appel suivant"""
+        calls = self.fake_batch(monkeypatch, failed={'GAZP'})
+
+        first = load_daily_history(['SBER', 'GAZP'])
+        load_daily_history(['SBER', 'GAZP'])
+
+        assert first['GAZP'].empty
+        assert len(calls) == 2
+
+    def test_idle_securities_cached(self, monkeypatch):
+        """Un SECID sans bougies (suspendu, nouvelle cotation) n'empêche pas la mise en cache"""
+        calls = self.fake_batch(monkeypatch, idle={'NEW'})
+
+        load_daily_history(['SBER', 'NEW'])
+        history = load_daily_history(['SBER', 'NEW'])
+
+        assert history['NEW'].empty
+        assert len(calls) == 1
+
+    def test_cached_for_the_session(self, monkeypatch):
+        """Les bougies closes sont conservées jusqu'au changement de date de séance"""
+        calls = self.fake_batch(monkeypatch)
+        self.freeze(monkeypatch, 13)
+
+        load_daily_history(['SBER'])
+        load_daily_history(['SBER'])
+        self.freeze(monkeypatch, 14)
+        load_daily_history(['SBER'])
+
+        assert len(calls) == 2
+        assert [call['to_date'] for call in calls] == ['2024-03-12', '2024-03-13']
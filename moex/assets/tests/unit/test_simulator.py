@@ -0,0 +1,81 @@
+"""
+Tests unitaires pour le générateur de marché synthétique
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from src.data.simulator import simulate_panel, trading_timestamps
+
+
+class TestSimulatePanel:
+    """Tests pour simulate_panel"""
+
+    def test_shape_and_symbols(self):
+        """Le panel contient N symboles sur T barres"""
+        panel = simulate_panel(50, periods=200, seed=1)
+
+        assert panel.shape == (50, 200)
+        assert panel.symbols[0] == 'SYM0000'
+        assert len(panel.timestamps) == 200
+
+    def test_seed_reproducible(self):
+        """Une même graine produit le même panel"""
+        a = simulate_panel(['SBER', 'GAZP'], periods=30, seed=42, end=datetime(2024, 6, 28))
+        b = simulate_panel(['SBER', 'GAZP'], periods=30, seed=42, end=datetime(2024, 6, 28))
+
+        np.testing.assert_array_equal(a.close, b.close)
+        np.testing.assert_array_equal(a.timestamps, b.timestamps)
+
+    def test_ohlc_consistency(self):
+        """Les extrêmes encadrent l'ouverture et la clôture"""
+        panel = simulate_panel(20, periods=500, seed=3)
+
+        assert np.all(panel.high >= np.maximum(panel.open, panel.close))
+        assert np.all(panel.low <= np.minimum(panel.open, panel.close))
+        assert np.all(panel.low > 0)
+        assert np.all(panel.volume >= 0)
+
+    def test_volatility_and_correlation(self):
+        """La volatilité et la corrélation réalisées sont proches des paramètres"""
+        panel = simulate_panel(40, periods=2000, volatility=0.25, correlation=0.5, seed=7)
+
+        returns = np.diff(np.log(panel.close), axis=1)
+        realized_vol = returns.std(axis=1).mean() * np.sqrt(252)
+        corr = np.corrcoef(returns)[np.triu_indices(40, k=1)].mean()
+
+        assert abs(realized_vol - 0.25) < 0.02
+        assert abs(corr - 0.5) < 0.05
+
+    def test_bars_view(self):
+        """Les barres d'un symbole sont des vues sur le panel"""
+        panel = simulate_panel(['SBER', 'GAZP'], periods=10, seed=0)
+
+        df = panel.to_dataframe('GAZP')
+
+        assert np.shares_memory(df['close'].to_numpy(), panel.close)
+        np.testing.assert_array_equal(df['close'].to_numpy(), panel.close[1])
+
+
+class TestTradingTimestamps:
+    """Tests pour le calendrier des séances"""
+
+    def test_daily_skips_weekends_and_holidays(self):
+        """Les barres journalières tombent sur des jours de séance"""
+        timestamps, tz = trading_timestamps(20, end=datetime(2024, 5, 15))
+        dates = pd.DatetimeIndex(timestamps.view('datetime64[ns]'))
+
+        assert tz is None
+        assert (dates.weekday < 5).all()
+        assert pd.Timestamp('2024-05-09') not in dates
+        assert dates[-1] == pd.Timestamp('2024-05-15')
+
+    def test_intraday_within_session(self):
+        """Les barres intraday restent dans la séance principale, heure de Moscou"""
+        panel = simulate_panel(2, periods=1200, freq='10min', end=datetime(2024, 5, 15), seed=0)
+        index = panel.index
+
+        assert str(index.tz) == 'Europe/Moscow'
+        assert index.is_monotonic_increasing
+        minutes = index.hour * 60 + index.minute
+        assert minutes.min() >= 10 * 60
+        assert minutes.max() < 18 * 60 + 45
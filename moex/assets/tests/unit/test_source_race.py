@@ -0,0 +1,98 @@
+"""
+Tests unitaires pour la mise en concurrence des sources
+"""
+import threading
+import time
+from src.data.source_race import race_sources
+
+
+def delayed(value, delay, calls=None):
+    """Source retournant value après delay secondes"""
+    def source(budget):
+        if calls is not None:
+            calls.append(time.monotonic())
+        time.sleep(delay)
+        return value
+    return source
+
+
+def failing(message):
+    """Source levant une exception"""
+    def source(budget):
+        raise RuntimeError(message)
+    return source
+
+
+class TestRaceSources:
+    """Tests pour race_sources"""
+
+    def test_fast_primary_wins_without_hedge(self):
+        """Une source prioritaire rapide gagne sans lancer la suivante"""
+        calls = []
+
+        result = race_sources(
+            [('moex', delayed('A', 0.01)), ('yahoo', delayed('B', 0.01, calls))],
+            hedge_delay=0.5, deadline=2
+        )
+
+        assert result.source == 'moex'
+        assert result.value == 'A'
+        assert calls == []
+
+    def test_slow_primary_is_hedged(self):
+        """La source suivante est lancée après le délai et peut gagner"""
+        result = race_sources(
+            [('moex', delayed('A', 1.0)), ('yahoo', delayed('B', 0.01))],
+            hedge_delay=0.05, deadline=2
+        )
+
+        assert result.source == 'yahoo'
+        assert result.latency < 0.5
+
+    def test_failure_launches_next_immediately(self):
+        """Un échec déclenche la source suivante sans attendre le délai"""
+        result = race_sources(
+            [('moex', failing("ISS indisponible")), ('yahoo', delayed('B', 0.01))],
+            hedge_delay=5, deadline=2
+        )
+
+        assert result.source == 'yahoo'
+        assert result.latency < 1
+        assert result.errors == {'moex': "ISS indisponible"}
+
+    def test_invalid_results_are_skipped(self):
+        """Les résultats invalides ne gagnent pas"""
+        result = race_sources(
+            [('moex', delayed(None, 0)), ('yahoo', delayed([], 0))],
+            hedge_delay=0.05, deadline=1, is_valid=lambda value: bool(value)
+        )
+
+        assert not result.won
+        assert set(result.errors) == {'moex', 'yahoo'}
+
+    def test_deadline_bounds_latency(self):
+        """La course s'arrête au délai total même si les sources tardent"""
+        release = threading.Event()
+
+        def blocked(budget):
+            release.wait(5)
+            return 'late'
+
+        result = race_sources([('moex', blocked)], hedge_delay=0.01, deadline=0.1)
+        release.set()
+
+        assert not result.won
+        assert result.latency < 1
+        assert result.errors == {'moex': "délai dépassé"}
+
+    def test_budget_passed_to_source(self):
+        """Chaque source reçoit le budget restant"""
+        budgets = []
+
+        def source(budget):
+            budgets.append(budget)
+            return 'A'
+
+        race_sources([('moex', source)], deadline=3)
+
+        assert 0 < budgets[0] <= 3
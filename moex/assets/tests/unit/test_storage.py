@@ -0,0 +1,267 @@
+"""
+Tests unitaires pour le stockage columnaire des séries
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from src.data.columnar_cache import (
+    index_to_timestamps, read_columns, read_last, timestamps_to_index, write_columns
+)
+from src.data import history_store
+from src.data.bar_buffer import BarBuffer
+from src.data.history_store import HistoryStore, HistoryTimezoneError, market_timestamps
+
+
+class TestColumnarCache:
+    """Tests pour le format de cache columnaire"""
+
+    @pytest.fixture
+    def columns(self):
+        """Colonnes OHLCV typées"""
+        n = 1000
+        dates = pd.date_range('2024-01-01 10:00', periods=n, freq='min')
+        timestamps, _ = index_to_timestamps(dates)
+        return {
+            'timestamp': timestamps,
+            'open': np.linspace(100, 110, n),
+            'high': np.linspace(101, 111, n),
+            'low': np.linspace(99, 109, n),
+            'close': np.linspace(100.5, 110.5, n),
+            'volume': np.arange(n, dtype=np.int64)
+        }
+
+    def test_roundtrip_memory_mapped(self, tmp_path, columns):
+        """Les colonnes relues sont identiques et projetées en mémoire"""
+        path = str(tmp_path / "SBER.col")
+        write_columns(path, columns, {'symbol': 'SBER'})
+
+        loaded, meta = read_columns(path)
+
+        assert meta == {'symbol': 'SBER'}
+        assert isinstance(loaded['close'], np.memmap)
+        for name, values in columns.items():
+            assert loaded[name].dtype == values.dtype
+            np.testing.assert_array_equal(loaded[name], values)
+
+    def test_columns_aligned(self, tmp_path, columns):
+        """Chaque colonne commence sur une frontière de 64 octets"""
+        path = str(tmp_path / "SBER.col")
+        write_columns(path, columns)
+
+        loaded, _ = read_columns(path)
+
+        assert all(values.offset % 64 == 0 for values in loaded.values())
+
+    def test_empty_columns(self, tmp_path):
+        """Un jeu de colonnes vide est accepté"""
+        path = str(tmp_path / "EMPTY.col")
+        write_columns(path, {'close': np.empty(0)})
+
+        loaded, _ = read_columns(path, mmap=False)
+
+        assert len(loaded['close']) == 0
+
+    def test_rejects_object_columns(self, tmp_path):
+        """Les colonnes d'objets Python sont refusées"""
+        with pytest.raises(ValueError):
+            write_columns(str(tmp_path / "X.col"), {'x': np.array(['a', None], dtype=object)})
+
+    def test_rejects_foreign_file(self, tmp_path):
+        """Un fichier d'un autre format est rejeté"""
+        path = tmp_path / "old.json"
+        path.write_text('{"dates": []}')
+
+        with pytest.raises(ValueError):
+            read_columns(str(path))
+
+    def test_timezone_roundtrip(self):
+        """Le fuseau horaire est conservé"""
+        dates = pd.date_range('2024-03-01', periods=3, freq='D', tz='Europe/Moscow')
+
+        timestamps, tz = index_to_timestamps(dates)
+        restored = timestamps_to_index(timestamps, tz)
+
+        assert timestamps.dtype == np.int64
+        assert restored.equals(dates)
+
+
+
+def daily_bars(start, periods, close_start=100.0):
+    """Barres journalières de test"""
+    timestamps, _ = index_to_timestamps(pd.date_range(start, periods=periods, freq='D'))
+    close = close_start + np.arange(periods, dtype=np.float64)
+    return {
+        'timestamp': timestamps,
+        'open': close - 0.5,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': np.full(periods, 1000, dtype=np.int64)
+    }
+
+
+class TestHistoryStore:
+    """Tests pour l'historique incrémental par symbole"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Fixture pour un historique vide"""
+        return HistoryStore(str(tmp_path / "history"))
+
+    def test_empty_store(self, store):
+        """Un symbole inconnu n'a ni historique ni synchronisation"""
+        assert store.load('SBER') is None
+        assert store.last_timestamp('SBER') is None
+        assert store.age('SBER') == float('inf')
+
+    def test_append_replaces_forming_bar(self, store):
+        """La dernière barre stockée est remplacée par sa version à jour"""
+        store.merge('SBER', daily_bars('2024-01-01', 5))
+        update = daily_bars('2024-01-05', 3, close_start=200.0)
+
+        merged = store.merge('SBER', update)
+
+        assert len(merged['close']) == 7
+        np.testing.assert_array_equal(merged['close'][:4], [100, 101, 102, 103])
+        np.testing.assert_array_equal(merged['close'][4:], [200, 201, 202])
+        assert store.last_timestamp('SBER') == pd.Timestamp('2024-01-07')
+
+    def test_tail_read_without_loading_columns(self, store, monkeypatch):
+        """Dernier timestamp et âge sont lus dans l'en-tête et la fin du fichier, sans projection"""
+        store.merge('SBER', daily_bars('2024-01-01', 5))
+        store.merge('GAZP', {name: values[:0] for name, values in daily_bars('2024-01-01', 1).items()})
+
+        def no_mmap(*args, **kwargs):
+            raise AssertionError("chargement complet inattendu")
+        monkeypatch.setattr(history_store, 'read_columns', no_mmap)
+
+        assert store.last_timestamp('SBER') == pd.Timestamp('2024-01-05')
+        assert store.age('SBER') < 60
+        assert store.last_timestamp('GAZP') is None
+        assert read_last(store._path('SBER'), 'missing')[0] is None
+
+    def test_unsorted_update(self, store):
+        """Les nouvelles barres sont triées avant fusion"""
+        bars = daily_bars('2024-01-01', 4)
+        shuffled = {name: values[[2, 0, 3, 1]] for name, values in bars.items()}
+
+        merged = store.merge('GAZP', shuffled)
+
+        assert np.all(np.diff(merged['timestamp']) > 0)
+
+    def test_empty_update_refreshes_sync_time(self, store):
+        """Une synchronisation sans nouvelle barre conserve l'historique"""
+        store.merge('LKOH', daily_bars('2024-01-01', 3), {'source': 'MOEX Officiel'})
+        empty = {name: values[:0] for name, values in daily_bars('2024-01-01', 1).items()}
+
+        merged = store.merge('LKOH', empty)
+
+        assert len(merged['close']) == 3
+        assert store.load('LKOH')[1]['source'] == 'MOEX Officiel'
+        assert store.age('LKOH') < 60
+
+    def test_window(self, store):
+        """La fenêtre ne retourne que les barres postérieures à la date donnée"""
+        store.merge('SBER', daily_bars('2024-01-01', 10))
+
+        columns, _ = store.window('SBER', pd.Timestamp('2024-01-08'))
+
+        assert len(columns['close']) == 3
+
+    def test_market_timestamps(self):
+        """Les barres en fuseau de Moscou et les dates ISS naïves désignent la même séance"""
+        aware = pd.DatetimeIndex(['2026-10-09 00:00', '2026-10-12 00:00']).tz_localize('Europe/Moscow')
+        naive = pd.DatetimeIndex(['2026-10-09', '2026-10-12'])
+
+        np.testing.assert_array_equal(
+            market_timestamps(*index_to_timestamps(aware)), market_timestamps(*index_to_timestamps(naive))
+        )
+        assert market_timestamps(*index_to_timestamps(naive))[0] == pd.Timestamp('2026-10-09').value
+
+    def test_merge_rejects_other_timezone(self, store):
+        """Des barres d'un autre fuseau ne sont pas fusionnées"""
+        store.merge('SBER', daily_bars('2024-01-01', 3))
+
+        with pytest.raises(HistoryTimezoneError):
+            store.merge('SBER', daily_bars('2024-01-03', 2), {'tz': 'Europe/Moscow'})
+        assert len(store.load('SBER')[0]['close']) == 3
+
+    def test_normalize_legacy_timezone(self, store):
+        """Un historique stocké en fuseau de Moscou est ramené aux dates de séance naïves"""
+        index = pd.date_range('2024-01-01', periods=3, freq='D', tz='Europe/Moscow')
+        timestamps, tz = index_to_timestamps(index)
+        store.merge('SBER', dict(daily_bars('2024-01-01', 3), timestamp=timestamps), {'tz': tz})
+
+        store.normalize('SBER')
+        merged = store.merge('SBER', daily_bars('2024-01-03', 2, close_start=200.0), {'tz': None})
+
+        np.testing.assert_array_equal(merged['timestamp'], daily_bars('2024-01-01', 4)['timestamp'])
+        np.testing.assert_array_equal(merged['close'], [100, 101, 200, 201])
+
+    def test_locks_shared_between_instances(self, tmp_path):
+        """Deux instances sur le même dossier partagent le verrou d'un symbole"""
+        first = HistoryStore(str(tmp_path / "history"))
+        second = HistoryStore(str(tmp_path / "history"))
+
+        assert first._lock('SBER') is second._lock('SBER')
+        assert first._lock('SBER') is not first._lock('GAZP')
+
+
+
+class TestBarBuffer:
+    """Tests pour le tampon de barres"""
+
+    def test_append_grows_capacity(self):
+        """La capacité double quand le tampon est plein"""
+        buffer = BarBuffer(capacity=2)
+
+        for i in range(5):
+            buffer.append(pd.Timestamp('2024-01-01') + pd.Timedelta(days=i), 1, 2, 0.5, 1.5 + i, 100)
+
+        assert len(buffer) == 5
+        assert buffer.capacity == 8
+        np.testing.assert_array_equal(buffer.column('close'), [1.5, 2.5, 3.5, 4.5, 5.5])
+
+    def test_to_dataframe_without_copy(self):
+        """Les colonnes du DataFrame partagent la mémoire du tampon"""
+        buffer = BarBuffer()
+        buffer.extend(
+            index_to_timestamps(pd.date_range('2024-01-01', periods=10, freq='D'))[0],
+            open=np.ones(10), high=np.ones(10), low=np.ones(10), close=np.arange(10.0), volume=np.ones(10)
+        )
+
+        df = buffer.to_dataframe(copy=False)
+
+        assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+        assert np.shares_memory(df['close'].to_numpy(), buffer.column('close'))
+        assert np.shares_memory(df.index.asi8, buffer.timestamps)
+
+    def test_to_dataframe_from_memory_map_writable(self, tmp_path):
+        """Par défaut, le DataFrame d'un historique chargé par memory-map est modifiable"""
+        store = HistoryStore(str(tmp_path / "history"))
+        store.merge('SBER', daily_bars('2024-01-01', 5))
+        columns, _ = store.load('SBER')
+        buffer = BarBuffer.from_arrays(columns['timestamp'], close=columns['close'])
+
+        df = buffer.to_dataframe()
+        df.iloc[0, df.columns.get_loc('close')] = 0.0
+        df['close'] *= 2
+
+        assert df['close'].iloc[0] == 0.0
+        assert buffer.column('close')[0] == 100.0
+
+    def test_from_arrays_wraps_columns(self):
+        """Les colonnes déjà typées sont reprises telles quelles, les absentes à NaN"""
+        bars = daily_bars('2024-01-01', 4)
+
+        buffer = BarBuffer.from_arrays(bars['timestamp'], close=bars['close'])
+
+        assert np.shares_memory(buffer.column('close'), bars['close'])
+        assert np.isnan(buffer.column('volume')).all()
+
+    def test_timezone_kept(self):
+        """Le fuseau des timestamps ajoutés est conservé"""
+        buffer = BarBuffer()
+        buffer.append(pd.Timestamp('2024-03-01 10:00', tz='Europe/Moscow'), 1, 1, 1, 1, 1)
+
+        assert buffer.index[0] == pd.Timestamp('2024-03-01 10:00', tz='Europe/Moscow')
@@ -0,0 +1,89 @@
+"""
+Tests unitaires pour les indicateurs incrémentaux
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.indicators import IndicatorStream, RollingStats, StreamingEMA, StreamingRSI, compute_indicators
+
+REQUESTS = ['ma', 'rsi', 'bollinger', 'macd', 'volume_ma', 'vwap']
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(7)
+    n = 600
+    close = 100 + rng.standard_normal(n).cumsum()
+    df = pd.DataFrame({
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': rng.integers(100, 10000, n).astype(float)
+    })
+    # Trou de cotation : le flux doit se comporter comme pandas
+    df.loc[300:302, 'close'] = np.nan
+    return df
+
+
+def stream(df, requests=REQUESTS):
+    indicators = IndicatorStream(requests)
+    return pd.DataFrame([indicators.update(bar) for bar in df.to_dict('records')], index=df.index)
+
+
+class TestStreamingIndicators:
+    """Tests pour les indicateurs incrémentaux"""
+
+    def test_matches_batch_engine(self, bars):
+        """Chaque barre produit les mêmes valeurs que le calcul sur l'historique complet"""
+        batch = compute_indicators(bars, REQUESTS)
+        result = stream(bars)[batch.columns]
+
+        pd.testing.assert_frame_equal(result, batch, rtol=1e-9, atol=1e-9)
+
+    def test_wilder_rsi_matches_batch(self, bars):
+        """Le RSI de Wilder incrémental correspond à sa version par lots"""
+        request = [('rsi', {'period': 10, 'smoothing': 'wilder'})]
+        batch = compute_indicators(bars, request)
+
+        pd.testing.assert_frame_equal(stream(bars, request), batch, rtol=1e-9, atol=1e-9)
+
+    def test_rolling_stats_no_drift(self):
+        """Les sommes glissantes restent exactes sur de longues séries de grands nombres"""
+        values = 1e9 + np.random.default_rng(0).standard_normal(20000)
+        stats = RollingStats(20)
+        for x in values:
+            stats.push(x)
+
+        assert stats.mean == pytest.approx(values[-20:].mean(), rel=1e-15)
+        assert stats.std == pytest.approx(values[-20:].std(ddof=1), rel=1e-6)
+
+    def test_state_round_trip(self, bars):
+        """Un flux restauré depuis son état JSON continue à l'identique"""
+        head, tail = bars.iloc[:400], bars.iloc[400:]
+        original = IndicatorStream(REQUESTS)
+        original.warm_up(head)
+        restored = IndicatorStream.from_state(json.loads(json.dumps(original.state())))
+
+        for bar in tail.to_dict('records'):
+            assert restored.update(bar) == pytest.approx(original.update(bar), nan_ok=True)
+
+    def test_warm_up_returns_last_values(self, bars):
+        """warm_up retourne les valeurs de la dernière barre"""
+        values = IndicatorStream(['rsi', 'macd']).warm_up(bars.rename(columns=str.capitalize))
+        batch = compute_indicators(bars, ['rsi', 'macd']).iloc[-1]
+
+        assert values == pytest.approx(batch.to_dict())
+
+    def test_scalar_bars(self):
+        """Les indicateurs de prix acceptent directement un cours"""
+        ema = StreamingEMA(3)
+
+        assert [ema.update(x) for x in (1.0, 3.0)] == [1.0, 2.0]
+
+    def test_unknown_requests(self):
+        """Les indicateurs sans version incrémentale et les lissages inconnus sont refusés"""
+        with pytest.raises(ValueError):
+            IndicatorStream(['ad'])
+        with pytest.raises(ValueError):
+            StreamingRSI(smoothing='ema')
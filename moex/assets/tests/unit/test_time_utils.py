@@ -0,0 +1,82 @@
+"""
+Tests unitaires pour les utilitaires de temps et les TTL selon la phase du marché
+"""
+from datetime import datetime
+
+import pytest
+
+from src.data import board_snapshot
+from src.data.board_snapshot import BoardSnapshot
+from src.utils.time_utils import get_cache_ttl, get_market_status, get_next_open, is_market_open
+
+
+def moscow(text):
+    """Date naïve, interprétée en heure de Moscou"""
+    return datetime.fromisoformat(text)
+
+
+class TestMarketCalendar:
+    """Tests pour le statut du marché et la prochaine ouverture"""
+
+    def test_market_status(self):
+        """Le statut tient compte des horaires, des weekends et des jours fériés"""
+        assert is_market_open(moscow('2024-05-15 12:00'))
+        assert get_market_status(moscow('2024-05-15 19:00'))[0] == "Fermé"
+        assert get_market_status(moscow('2024-05-18 12:00'))[0] == "Fermé (weekend)"
+        assert get_market_status(moscow('2024-05-09 12:00'))[0] == "Fermé (jour férié)"
+
+    @pytest.mark.parametrize('now, expected', [
+        ('2024-05-15 08:00', '2024-05-15 10:00'),
+        ('2024-05-15 12:00', '2024-05-16 10:00'),
+        ('2024-05-17 20:00', '2024-05-20 10:00'),
+        ('2024-05-08 20:00', '2024-05-10 10:00'),
+    ])
+    def test_next_open(self, now, expected):
+        """La prochaine ouverture saute les weekends et jours fériés"""
+        assert get_next_open(moscow(now)).replace(tzinfo=None) == moscow(expected)
+
+
+class TestCacheTTL:
+    """Tests pour get_cache_ttl"""
+
+    def test_closed_market_until_next_open(self):
+        """Marché fermé, la donnée reste valable jusqu'à l'ouverture suivante"""
+        assert get_cache_ttl('market_data', moscow('2024-05-17 20:00')) == 62 * 3600
+
+    def test_regular_session_uses_base_ttl(self):
+        """En pleine séance, le TTL de base s'applique"""
+        assert get_cache_ttl('market_data', moscow('2024-05-15 12:00')) == 10
+        assert get_cache_ttl(120, moscow('2024-05-15 12:00')) == 120
+
+    def test_tighter_near_open_and_close(self):
+        """Près de l'ouverture et de la clôture, le TTL est réduit"""
+        assert get_cache_ttl('indices', moscow('2024-05-15 10:05')) == 30
+        assert get_cache_ttl('indices', moscow('2024-05-15 18:35')) == 30
+        assert get_cache_ttl('market_data', moscow('2024-05-15 10:05')) == 5
+
+    def test_session_data_expires_at_close(self):
+        """Une donnée obtenue en séance n'est pas conservée au-delà de la clôture"""
+        assert get_cache_ttl('securities', moscow('2024-05-15 18:40')) == 300
+        assert get_cache_ttl('securities', moscow('2024-05-15 18:44:59')) == 5
+
+
+class TestBoardSnapshotInterval:
+    """Tests pour l'intervalle dynamique de l'instantané"""
+
+    def test_interval_follows_market_phase(self, monkeypatch):
+        """Sans intervalle explicite, l'instantané n'est pas rechargé marché fermé"""
+        monkeypatch.setattr(board_snapshot, 'get_cache_ttl', lambda kind: 3600.0)
+
+        class Client:
+            calls = 0
+
+            def get_board(self, board, deadline=None):
+                Client.calls += 1
+                raise RuntimeError("ISS indisponible")
+
+        snapshot = BoardSnapshot(client=Client())
+        snapshot.refresh()
+        snapshot.refresh()
+
+        assert snapshot.current_interval() == 3600.0
+        assert Client.calls == 1
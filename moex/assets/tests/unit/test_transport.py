@@ -0,0 +1,617 @@
+"""
+Tests unitaires pour la couche de transport ISS
+"""
+import asyncio
+import json
+import threading
+import time
+import pytest
+import numpy as np
+import pandas as pd
+import requests
+from unittest.mock import Mock, patch
+from src.api.transport import ISSTransport, get_transport
+from src.api.pagination import fetch_all_columns, fetch_all_pages
+from src.api.json_stream import ColumnBuilder, stream_block
+from src.utils.singleflight import SingleFlight
+from src.api.exceptions import MOEXAPIError, MOEXRateLimitError
+from src.api.rate_limiter import RateLimiter, endpoint_key
+from src.api.iss_decoder import block_to_frame, decode_bars, decode_block
+from src.api.moex_client import candle_columns_to_frame, candles_to_frame
+
+
+def make_response(status_code=200, payload=None, headers=None):
+    """Crée une réponse HTTP simulée"""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = payload if payload is not None else {}
+    return response
+
+
+class TestISSTransport:
+    """Tests pour ISSTransport"""
+
+    @pytest.fixture
+    def transport(self):
+        """Fixture pour créer un transport sans pause de backoff"""
+        transport = ISSTransport(max_retries=2, limiter=RateLimiter())
+        transport._backoff = lambda attempt: 0
+        return transport
+
+    def test_shared_instance(self):
+        """Le transport global est unique pour le processus"""
+        assert get_transport() is get_transport()
+
+    def test_build_url(self, transport):
+        """Test la construction des URLs"""
+        assert transport.build_url("engines/x.json") == "https://iss.moex.com/iss/engines/x.json"
+        assert transport.build_url("https://example.org/a.json") == "https://example.org/a.json"
+
+    @patch('requests.Session.get')
+    def test_get_json_adds_meta_off(self, mock_get, transport):
+        """Les métadonnées ISS sont désactivées par défaut"""
+        mock_get.return_value = make_response(payload={'candles': {}})
+
+        assert transport.get_json("engines/x.json", {'limit': 10}) == {'candles': {}}
+        params = mock_get.call_args.kwargs['params']
+        assert params['iss.meta'] == 'off'
+        assert params['limit'] == 10
+
+    @patch('requests.Session.get')
+    def test_retry_on_transient_errors(self, mock_get, transport):
+        """Les erreurs réseau et 5xx sont retentées"""
+        mock_get.side_effect = [
+            requests.ConnectionError("reset"),
+            make_response(503),
+            make_response(payload={'ok': True})
+        ]
+
+        assert transport.get_json("engines/x.json") == {'ok': True}
+        assert mock_get.call_count == 3
+
+    @patch('requests.Session.get')
+    def test_retries_exhausted(self, mock_get, transport):
+        """Une erreur est levée après épuisement des retries"""
+        mock_get.side_effect = requests.Timeout("slow")
+
+        with pytest.raises(MOEXAPIError):
+            transport.get_json("engines/x.json")
+        assert mock_get.call_count == 3
+
+    @patch('requests.Session.get')
+    def test_client_error_not_retried(self, mock_get, transport):
+        """Les erreurs 4xx ne sont pas retentées"""
+        mock_get.return_value = make_response(404)
+
+        with pytest.raises(MOEXAPIError):
+            transport.get_json("engines/x.json")
+        assert mock_get.call_count == 1
+
+    @patch('requests.Session.get')
+    def test_error_responses_closed(self, mock_get, transport):
+        """Les réponses en erreur (429, 5xx, 4xx) rendent leur connexion au pool"""
+        transport.limiter.max_wait = 0
+        responses = [make_response(429, headers={'Retry-After': '0'}), make_response(503), make_response(404)]
+        mock_get.side_effect = responses
+
+        with pytest.raises(MOEXAPIError):
+            transport.get_columns("engines/x.json", 'candles')
+        assert all(response.close.called for response in responses)
+
+    @patch('requests.Session.get')
+    def test_deadline_caps_timeout(self, mock_get, transport):
+        """Le délai par tentative ne dépasse pas le budget restant"""
+        mock_get.return_value = make_response(payload={})
+
+        transport.get_json("engines/x.json", deadline=1)
+        connect_timeout, read_timeout = mock_get.call_args.kwargs['timeout']
+        assert read_timeout <= 1
+        assert connect_timeout <= 1
+
+    @patch('requests.Session.get')
+    def test_http_429_raises_rate_limit_error(self, mock_get, transport):
+        """Une réponse 429 persistante lève MOEXRateLimitError et alimente les compteurs"""
+        transport.limiter.max_wait = 0
+        mock_get.return_value = make_response(429, headers={'Retry-After': '0'})
+
+        with pytest.raises(MOEXRateLimitError):
+            transport.get_json("engines/x.json")
+        assert transport.limiter.stats()['rate_limit_hits'] == 3
+
+    @patch('requests.Session.get')
+    def test_get_columns_streams_body(self, mock_get, transport):
+        """get_columns lit le corps en flux et retourne des colonnes typées"""
+        body = json.dumps({
+            'history': {'columns': ['TRADEDATE', 'CLOSE'], 'data': [['2024-01-09', 271.5], ['2024-01-10', None]]},
+            'history.cursor': {'columns': ['INDEX', 'TOTAL', 'PAGESIZE'], 'data': [[0, 2, 100]]}
+        }).encode('utf-8')
+        response = make_response(200)
+        response.iter_content.return_value = iter(chunked(body, 16))
+        mock_get.return_value = response
+
+        columns, others = transport.get_columns("history.json", 'history')
+
+        assert mock_get.call_args.kwargs['stream'] is True
+        assert columns['TRADEDATE'].dtype == np.dtype('datetime64[ns]')
+        assert np.isnan(columns['CLOSE'][1])
+        assert others['history.cursor']['data'] == [[0, 2, 100]]
+        response.json.assert_not_called()
+
+    @patch('requests.Session.get')
+    def test_concurrent_identical_requests_coalesced(self, mock_get, transport):
+        """Des requêtes identiques simultanées ne partent qu'une fois"""
+        def slow_get(*args, **kwargs):
+            time.sleep(0.1)
+            return make_response(payload={'marketdata': {}})
+        mock_get.side_effect = slow_get
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(transport.get_json("engines/x.json", {'a': 1})))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert mock_get.call_count == 1
+        assert len(results) == 8
+        assert all(result is results[0] for result in results)
+
+    @patch('requests.Session.get')
+    def test_coalesced_columns_not_shared(self, mock_get, transport):
+        """Chaque appelant mutualisé peut modifier ses bougies sans effet sur les autres"""
+        body = json.dumps({'candles': {
+            'columns': ['close', 'begin'], 'data': [[10.0, '2024-01-09 10:00:00'], [11.0, '2024-01-10 10:00:00']]
+        }}).encode('utf-8')
+
+        def slow_get(*args, **kwargs):
+            time.sleep(0.1)
+            response = make_response(200)
+            response.iter_content.return_value = iter(chunked(body, 16))
+            return response
+        mock_get.side_effect = slow_get
+
+        frames = {}
+        barrier = threading.Barrier(2)
+
+        def caller(factor):
+            columns, _ = transport.get_columns("candles.json", 'candles')
+            barrier.wait()
+            columns['close'][0] = factor
+            frame = candle_columns_to_frame(columns)
+            frame['Close'] *= factor
+            barrier.wait()
+            frames[factor] = frame
+
+        threads = [threading.Thread(target=caller, args=(factor,)) for factor in (2.0, 3.0)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert mock_get.call_count == 1
+        assert list(frames[2.0]['Close']) == [4.0, 22.0]
+        assert list(frames[3.0]['Close']) == [9.0, 33.0]
+
+
+class TestSingleFlight:
+    """Tests pour SingleFlight"""
+
+    def test_exception_shared(self):
+        """Les appelants en attente reçoivent l'exception du premier appel"""
+        flights = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def failing():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        def follower():
+            started.wait()
+            try:
+                flights.do('k', failing)
+            except ValueError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=follower)
+        thread.start()
+        with pytest.raises(ValueError):
+            flights.do('k', failing)
+        thread.join()
+
+        assert len(errors) == 1
+        assert flights.in_flight() == 0
+
+    def test_sequential_calls_not_cached(self):
+        """Une fois terminé, un appel n'est pas réutilisé"""
+        flights = SingleFlight()
+        calls = []
+
+        flights.do('k', calls.append, 1)
+        flights.do('k', calls.append, 2)
+
+        assert calls == [1, 2]
+        assert flights.stats()['executed'] == 2
+
+    def test_private_copy_only_when_shared(self):
+        """Un appel non partagé n'est pas copié ; un appel partagé donne une copie à chacun"""
+        flights = SingleFlight()
+        started = threading.Event()
+        value = [1]
+        results = []
+
+        assert flights.do('k', lambda: value, private=list) is value
+
+        def slow():
+            started.set()
+            time.sleep(0.05)
+            return value
+
+        thread = threading.Thread(target=lambda: (started.wait(), results.append(flights.do('k', slow, private=list))))
+        thread.start()
+        results.append(flights.do('k', slow, private=list))
+        thread.join()
+
+        assert results == [[1], [1]]
+        assert all(result is not value for result in results)
+        assert results[0] is not results[1]
+
+
+class FakeClock:
+    """Horloge manuelle pour les tests du limiteur"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter:
+    """Tests pour RateLimiter"""
+
+    @pytest.fixture
+    def clock(self):
+        """Fixture pour l'horloge manuelle"""
+        return FakeClock()
+
+    def test_endpoint_key(self):
+        """Test la classification des endpoints"""
+        assert endpoint_key("engines/stock/markets/shares/securities/SBER/candles.json") == 'candles'
+        assert endpoint_key("history/engines/stock/markets/shares/boards/tqbr/securities/SBER.json") == 'history'
+        assert endpoint_key("https://iss.moex.com/iss/statistics/engines/stock/x.json") == 'statistics'
+        assert endpoint_key("engines/stock/markets/shares/boards/TQBR/securities.json") == 'marketdata'
+
+    def test_burst_then_paced(self, clock):
+        """La rafale passe sans attente, puis les requêtes sont espacées"""
+        limiter = RateLimiter(global_budget=(2.0, 3), endpoint_budgets={}, clock=clock)
+
+        waits = [limiter.reserve() for _ in range(5)]
+
+        assert waits[:3] == [0, 0, 0]
+        assert waits[3] == pytest.approx(0.5)
+        assert waits[4] == pytest.approx(1.0)
+        assert limiter.stats()['delayed'] == 2
+
+    def test_endpoint_budget(self, clock):
+        """Le budget d'un endpoint s'ajoute au budget global"""
+        limiter = RateLimiter(global_budget=(100.0, 100), endpoint_budgets={'candles': (1.0, 1)}, clock=clock)
+
+        assert limiter.reserve('candles') == 0
+        assert limiter.reserve('candles') == pytest.approx(1.0)
+        assert limiter.reserve('marketdata') == 0
+
+    def test_rejects_beyond_max_wait(self, clock):
+        """Une attente trop longue lève MOEXRateLimitError"""
+        limiter = RateLimiter(global_budget=(1.0, 1), endpoint_budgets={}, max_wait=0.5, clock=clock)
+
+        limiter.reserve()
+        with pytest.raises(MOEXRateLimitError):
+            limiter.reserve()
+        assert limiter.stats()['rejected'] == 1
+
+        clock.now = 1.0
+        assert limiter.reserve() == 0
+
+    def test_throttled_cooldown(self, clock):
+        """Un 429 suspend toutes les requêtes pendant Retry-After"""
+        limiter = RateLimiter(global_budget=(100.0, 100), endpoint_budgets={}, clock=clock)
+
+        limiter.report_throttled(retry_after=3)
+
+        assert limiter.reserve() == pytest.approx(3)
+        assert limiter.stats()['rate_limit_hits'] == 1
+
+    def test_acquire_tracks_in_flight(self):
+        """Le compteur de requêtes en cours suit le contexte d'acquisition"""
+        limiter = RateLimiter(endpoint_budgets={})
+
+        with limiter.acquire():
+            assert limiter.stats()['in_flight'] == 1
+        assert limiter.stats()['in_flight'] == 0
+        assert limiter.stats()['total_requests'] == 1
+
+    def test_concurrency_rejection_keeps_tokens(self, clock):
+        """Un refus de concurrence ne consomme aucun jeton du budget"""
+        limiter = RateLimiter(global_budget=(1.0, 5), endpoint_budgets={}, max_concurrency=1, max_wait=0.01, clock=clock)
+
+        with limiter.acquire():
+            tokens = limiter.stats()['tokens']
+            with pytest.raises(MOEXRateLimitError):
+                with limiter.acquire():
+                    pass
+            with pytest.raises(MOEXRateLimitError):
+                asyncio.run(self.enter_async(limiter))
+            assert limiter.stats()['tokens'] == tokens
+        assert limiter.stats()['total_requests'] == 1
+        assert limiter.stats()['rejected'] == 2
+
+    def test_budget_rejection_releases_slot(self, clock):
+        """Un refus de débit rend la place de concurrence"""
+        limiter = RateLimiter(global_budget=(1.0, 1), endpoint_budgets={}, max_concurrency=1, max_wait=0.01, clock=clock)
+        limiter.reserve()
+
+        with pytest.raises(MOEXRateLimitError):
+            with limiter.acquire():
+                pass
+        clock.now = 1.0
+        with limiter.acquire():
+            assert limiter.stats()['in_flight'] == 1
+
+    @staticmethod
+    async def enter_async(limiter):
+        async with limiter.acquire_async():
+            pass
+
+
+class FakePagedTransport:
+    """Transport simulé servant `total` lignes par pages de `page_size`"""
+
+    def __init__(self, total, page_size, block='history', with_cursor=True):
+        self.total = total
+        self.page_size = page_size
+        self.block = block
+        self.with_cursor = with_cursor
+        self.starts = []
+
+    def get_json(self, path, params=None, deadline=None):
+        start = params.get('start', 0)
+        self.starts.append(start)
+        rows = [[i] for i in range(start, min(start + self.page_size, self.total))]
+        payload = {self.block: {'columns': ['N'], 'data': rows}}
+        if self.with_cursor:
+            payload[f"{self.block}.cursor"] = {
+                'columns': ['INDEX', 'TOTAL', 'PAGESIZE'],
+                'data': [[start, self.total, self.page_size]]
+            }
+        return payload
+
+    def get_columns(self, path, block, params=None, deadline=None):
+        body = json.dumps(self.get_json(path, params, deadline)).encode('utf-8')
+        return stream_block(chunked(body, 7), block)
+
+
+def chunked(body, size):
+    """Découpe un corps binaire en morceaux de `size` octets"""
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class TestPagination:
+    """Tests pour fetch_all_pages"""
+
+    def test_cursor_pages_in_order(self):
+        """Toutes les pages annoncées par le curseur sont fusionnées dans l'ordre"""
+        transport = FakePagedTransport(total=250, page_size=100)
+
+        block = fetch_all_pages("history.json", 'history', transport=transport)
+
+        assert [row[0] for row in block['data']] == list(range(250))
+        assert sorted(transport.starts) == [0, 100, 200]
+
+    def test_pages_without_cursor(self):
+        """Sans curseur, la pagination s'arrête à la première page incomplète"""
+        transport = FakePagedTransport(total=1234, page_size=500, block='candles', with_cursor=False)
+
+        block = fetch_all_pages("candles.json", 'candles', transport=transport, page_size=500)
+
+        assert len(block['data']) == 1234
+        assert [row[0] for row in block['data']] == list(range(1234))
+
+    def test_speculation_bounded_without_cursor(self):
+        """Sans total connu, au plus une page est demandée au-delà de la dernière"""
+        transport = FakePagedTransport(total=2000, page_size=500, block='candles', with_cursor=False)
+
+        block = fetch_all_pages("candles.json", 'candles', transport=transport, page_size=500, max_workers=8)
+
+        assert len(block['data']) == 2000
+        # Pages utiles, la page vide qui termine la série et au plus une page d'avance
+        assert {0, 500, 1000, 1500, 2000} <= set(transport.starts)
+        assert len(transport.starts) <= 6
+
+    def test_max_rows_without_cursor(self):
+        """Sans curseur, aucune page n'est demandée au-delà de max_rows"""
+        transport = FakePagedTransport(total=5000, page_size=500, block='candles', with_cursor=False)
+
+        block = fetch_all_pages("candles.json", 'candles', transport=transport, page_size=500, max_rows=1200)
+
+        assert len(block['data']) == 1200
+        assert sorted(transport.starts) == [0, 500, 1000]
+
+    def test_single_short_page(self):
+        """Une première page incomplète ne déclenche aucune autre requête"""
+        transport = FakePagedTransport(total=30, page_size=500, block='candles', with_cursor=False)
+
+        block = fetch_all_pages("candles.json", 'candles', transport=transport, page_size=500)
+
+        assert len(block['data']) == 30
+        assert transport.starts == [0]
+
+    def test_max_rows(self):
+        """Le nombre de lignes est borné par max_rows"""
+        transport = FakePagedTransport(total=1000, page_size=100)
+
+        block = fetch_all_pages("history.json", 'history', transport=transport, max_rows=150)
+
+        assert len(block['data']) == 150
+        assert sorted(transport.starts) == [0, 100]
+
+    def test_missing_block(self):
+        """Un bloc absent donne un résultat vide"""
+        transport = FakePagedTransport(total=10, page_size=100, block='other')
+
+        assert fetch_all_pages("x.json", 'history', transport=transport) == {'columns': [], 'data': []}
+        assert fetch_all_columns("x.json", 'history', transport=transport) == {}
+
+    def test_columns_pages(self):
+        """Les pages décodées en flux sont concaténées en colonnes typées"""
+        transport = FakePagedTransport(total=250, page_size=100)
+
+        columns = fetch_all_columns("history.json", 'history', transport=transport, max_rows=220)
+
+        assert columns['N'].dtype == np.int64
+        np.testing.assert_array_equal(columns['N'], np.arange(220))
+
+
+
+class TestISSDecoder:
+    """Tests pour le décodage vectorisé des blocs ISS"""
+
+    @pytest.fixture
+    def history(self):
+        """Bloc history avec une séance sans transaction"""
+        return {
+            'columns': ['BOARDID', 'TRADEDATE', 'SECID', 'OPEN', 'CLOSE', 'VOLUME'],
+            'data': [
+                ['TQBR', '2024-01-09', 'SBER', 270.1, 271.5, 1000],
+                ['TQBR', '2024-01-10', 'SBER', None, None, 0],
+                ['TQBR', '2024-01-11', 'SBER', 272.0, 273.25, 2500]
+            ]
+        }
+
+    def test_typed_columns(self, history):
+        """Chaque colonne reçoit un dtype adapté, NaN pour les manquants"""
+        columns = decode_block(history)
+
+        assert columns['TRADEDATE'].dtype == np.dtype('datetime64[ns]')
+        assert columns['VOLUME'].dtype == np.int64
+        assert columns['SECID'].dtype == object
+        assert np.isnan(columns['OPEN'][1])
+
+    def test_dict_columns(self):
+        """Les colonnes décrites par des dictionnaires sont acceptées"""
+        block = {'columns': [{'name': 'SECID'}, {'name': 'LAST'}], 'data': [['SBER', 281.5]]}
+
+        df = block_to_frame(block, index='SECID')
+
+        assert df.loc['SBER', 'LAST'] == 281.5
+
+    def test_empty_block(self):
+        """Un bloc sans lignes conserve ses colonnes, un bloc invalide donne un DataFrame vide"""
+        assert list(block_to_frame({'columns': ['SECID', 'LAST'], 'data': []}).columns) == ['SECID', 'LAST']
+        assert block_to_frame(None).empty
+
+    def test_decode_bars_history(self, history):
+        """Les barres history sont extraites en float64 avec NaN"""
+        timestamps, bars = decode_bars(history)
+
+        assert timestamps[0] == pd.Timestamp('2024-01-09').value
+        np.testing.assert_array_equal(bars['close'], [271.5, np.nan, 273.25])
+        assert np.isnan(bars['high']).all()
+
+    def test_decode_bars_candles(self):
+        """Les lignes sans date valide sont écartées"""
+        block = {
+            'columns': ['open', 'close', 'high', 'low', 'value', 'volume', 'begin', 'end'],
+            'data': [
+                [1, 2, 3, 0.5, 10, 5, '2024-01-09 10:00:00', '2024-01-09 10:59:59'],
+                [2, 3, 4, 1.5, 10, 5, None, None]
+            ]
+        }
+
+        timestamps, bars = decode_bars(block)
+
+        assert len(timestamps) == 1
+        assert timestamps[0] == pd.Timestamp('2024-01-09 10:00').value
+        assert bars['high'][0] == 3.0
+
+    def test_candles_to_frame(self):
+        """Les bougies sont indexées par date avec des colonnes standardisées"""
+        block = {'columns': ['begin', 'open', 'close'], 'data': [['2024-01-09 10:00:00', 1, 2]]}
+
+        df = candles_to_frame(block)
+
+        assert isinstance(df.index, pd.DatetimeIndex)
+        assert list(df.columns) == ['Open', 'Close']
+
+
+class TestJSONStream:
+    """Tests pour le décodage en flux"""
+
+    @pytest.fixture
+    def document(self):
+        """Réponse ISS avec métadonnées, textes piégeux et valeurs manquantes"""
+        return {
+            'history': {
+                'metadata': {'SECID': {'type': 'string'}},
+                'columns': [{'name': 'SECID'}, {'name': 'TRADEDATE'}, {'name': 'CLOSE'}, {'name': 'VOLUME'}],
+                'data': [
+                    ['SBER', '2024-01-09', 271.5, 1000],
+                    ['Сбер ], "x" [', '2024-01-10', None, 12345678901],
+                    ['GAZP', '2024-01-11', 1e-3, 0]
+                ]
+            },
+            'history.cursor': {'columns': ['INDEX', 'TOTAL', 'PAGESIZE'], 'data': [[0, 3, 100]]}
+        }
+
+    @pytest.mark.parametrize('chunk_size', [1, 3, 64, 4096])
+    def test_matches_full_decode(self, document, chunk_size):
+        """Le résultat ne dépend pas du découpage en morceaux"""
+        body = json.dumps(document, ensure_ascii=False, indent=1).encode('utf-8')
+
+        columns, others = stream_block(chunked(body, chunk_size), 'history', batch_rows=2)
+
+        expected = decode_block(document['history'])
+        assert list(columns) == list(expected)
+        for name in expected:
+            assert columns[name].dtype == expected[name].dtype
+            np.testing.assert_array_equal(columns[name], expected[name])
+        assert others['history.cursor'] == document['history.cursor']
+
+    def test_missing_block(self, document):
+        """Un bloc absent est signalé par None"""
+        columns, others = stream_block([json.dumps(document).encode('utf-8')], 'candles')
+
+        assert columns is None
+        assert set(others) == {'history', 'history.cursor'}
+
+    def test_empty_data(self):
+        """Un bloc sans lignes conserve ses colonnes"""
+        body = b'{"candles": {"columns": ["begin", "close"], "data": []}}'
+
+        columns, _ = stream_block([body], 'candles')
+
+        assert len(columns['close']) == 0
+        assert columns['begin'].dtype == np.dtype('datetime64[ns]')
+
+    def test_truncated_body(self, document):
+        """Une réponse tronquée lève ValueError"""
+        body = json.dumps(document).encode('utf-8')
+
+        with pytest.raises(ValueError):
+            stream_block(chunked(body[:-40], 50), 'history')
+
+    def test_builder_promotes_dtype(self):
+        """Un lot introduisant des valeurs manquantes promeut la colonne en float"""
+        builder = ColumnBuilder(['N'])
+
+        builder.append_rows([[1], [2]])
+        builder.append_rows([[None]])
+
+        values = builder.columns()['N']
+        assert values.dtype == np.float64
+        assert values[1] == 2 and np.isnan(values[2])
@@ -7,5 +7,6 @@ __all__ = [
     'page_alertes',
     'page_indices',
     'page_predictions',
+    'page_screener',
     'page_configuration'
 ]
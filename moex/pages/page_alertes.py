@@ -2,36 +2,25 @@
 Page Alertes - Avec surveillance des prix réels
 """
 import streamlit as st
-import requests
 import time
 from datetime import datetime
 
+from src.data.board_snapshot import get_board_snapshot
+
 if 'alerts' not in st.session_state:
     st.session_state.alerts = []
 
 def check_price(symbol, target, condition):
     """Vérifie si le prix atteint la condition"""
-    try:
-        url = f"https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities/{symbol}.json"
-        response = requests.get(url, params={'iss.meta': 'off'}, timeout=5)
-        data = response.json()
-        
-        if 'marketdata' in data and 'data' in data['marketdata']:
-            marketdata = data['marketdata']
-            columns = marketdata['columns']
-            values = marketdata['data'][0]
-            
-            for i, col in enumerate(columns):
-                if col == 'LAST':
-                    price = float(values[i])
-                    
-                    if condition == "above" and price >= target:
-                        return True, price
-                    elif condition == "below" and price <= target:
-                        return True, price
-        return False, None
-    except:
+    price = get_board_snapshot().get_price(symbol)
+    if price is None:
         return False, None
+    
+    if condition == "above" and price >= target:
+        return True, price
+    elif condition == "below" and price <= target:
+        return True, price
+    return False, None
 
 def show():
     st.markdown("# 🔔 Alertes de prix")
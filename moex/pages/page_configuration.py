@@ -5,6 +5,12 @@ import streamlit as st
 import json
 from datetime import datetime
 
+from src.api.transport import get_transport
+from src.utils.cache_maintenance import get_cache_janitor
+from src.utils.cache_manager import get_cache_manager
+from src.utils.revalidation import get_revalidator
+from src.utils.session import sync_api_stats
+
 def show():
     st.markdown("# ⚙️ Configuration")
     
@@ -26,3 +32,54 @@ def show():
         if st.button("Vider le cache"):
             st.cache_data.clear()
             st.success("Cache vidé !")
+        
+        st.markdown("### 🚦 Trafic ISS (processus)")
+        stats = sync_api_stats()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Requêtes", stats['total_requests'])
+        col2.metric("Réponses 429", stats['rate_limit_hits'])
+        col3.metric("Refusées", stats['rejected'])
+        col4.metric("En cours", stats['in_flight'])
+        flights = get_transport().flights.stats()
+        st.caption(
+            f"Requêtes identiques mutualisées : {flights['shared']} "
+            f"(pour {flights['executed']} requêtes émises)"
+        )
+        if stats['cooldown_remaining'] > 0:
+            st.warning(f"Pause imposée par l'ISS : {stats['cooldown_remaining']:.1f}s")
+        
+        st.markdown("### 🗄️ Caches disque")
+        janitor = get_cache_janitor()
+        if st.button("Balayer maintenant"):
+            janitor.sweep_all()
+        for name, cache_stats in janitor.stats().items():
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric(f"{name} — entrées", cache_stats['entries'])
+            col2.metric("Taille", f"{cache_stats['bytes'] / 1e6:.1f} / {cache_stats['max_bytes'] / 1e6:.0f} Mo")
+            col3.metric("Taux de succès", f"{cache_stats['hit_rate']:.0%}")
+            col4.metric("Évictions", cache_stats['evictions'] + cache_stats['expired'])
+            if cache_stats['corrupt']:
+                st.caption(f"{cache_stats['corrupt']} entrée(s) illisible(s) écartée(s)")
+        
+        st.markdown("### 🧠 Cache mémoire")
+        manager_stats = get_cache_manager().stats()
+        memory = manager_stats['memory']
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Entrées", f"{memory['entries']} / {memory['max_entries']}")
+        col2.metric("Taille estimée", f"{memory['bytes'] / 1e6:.1f} / {memory['max_bytes'] / 1e6:.0f} Mo")
+        col3.metric("Évictions", memory['evictions'])
+        for namespace, counters in memory['namespaces'].items():
+            st.caption(
+                f"{namespace} : {counters['hits']} succès, {counters['misses']} échecs "
+                f"({counters['hit_rate']:.0%})"
+            )
+        computations = manager_stats['computations']
+        st.caption(
+            f"Calculs mutualisés entre sessions : {computations['shared']} "
+            f"(pour {computations['executed']} calculs effectués)"
+        )
+        revalidation = get_revalidator().stats()
+        st.caption(
+            f"Rafraîchissements en arrière-plan : {revalidation['completed']} terminés, "
+            f"{revalidation['failed']} échoués, {revalidation['pending']} en cours"
+        )
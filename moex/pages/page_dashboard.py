@@ -6,57 +6,43 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import plotly.graph_objs as go
-import requests
+
+from src.api.async_client import fetch_marketdata_batch
+from src.api.endpoints import Endpoints
+from src.api.iss_decoder import block_to_frame
+from src.api.moex_client import candle_columns_to_frame
+from src.api.pagination import CANDLES_PAGE_SIZE, fetch_all_columns
+from src.api.transport import get_transport
+from src.data.board_snapshot import get_board_snapshot
+from src.utils.constants import DEFAULT_WATCHLIST
+from src.utils.formatters import format_age
 
 def get_moex_candles(ticker, days=30):
     """
     Récupère les données historiques de l'API MOEX
     """
     try:
-        url = f"https://iss.moex.com/iss/engines/stock/markets/shares/securities/{ticker}/candles.json"
-        
         end = datetime.now()
         start = end - timedelta(days=days)
         
         params = {
             'from': start.strftime('%Y-%m-%d'),
             'till': end.strftime('%Y-%m-%d'),
-            'interval': 24,  # Quotidien
-            'limit': 100,
-            'iss.meta': 'off'
+            'interval': 24  # Quotidien
         }
         
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
+        candles = fetch_all_columns(
+            Endpoints.CANDLES.format(ticker=ticker),
+            'candles',
+            params,
+            page_size=CANDLES_PAGE_SIZE,
+            deadline=10
+        )
         
-        if 'candles' not in data:
+        if not candles:
             return None
         
-        candles = data['candles']
-        
-        # Extraire les colonnes
-        if 'columns' in candles and 'data' in candles:
-            columns = candles['columns']
-            # Si columns est une liste de dictionnaires
-            if columns and isinstance(columns[0], dict):
-                columns = [col['name'] for col in columns]
-            
-            df = pd.DataFrame(candles['data'], columns=columns)
-            
-            if 'begin' in df.columns:
-                df['begin'] = pd.to_datetime(df['begin'])
-                df.set_index('begin', inplace=True)
-            
-            # Renommer pour standardiser
-            rename_map = {
-                'open': 'Open', 'high': 'High', 'low': 'Low',
-                'close': 'Close', 'volume': 'Volume'
-            }
-            df = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
-            
-            return df
-        
-        return None
+        return candle_columns_to_frame(candles)
         
     except Exception as e:
         st.error(f"Erreur API: {e}")
@@ -64,36 +50,62 @@ def get_moex_candles(ticker, days=30):
 
 def get_current_price(ticker):
     """
-    Récupère le prix actuel depuis l'API MOEX
+    Récupère le prix actuel depuis l'instantané du board, sinon depuis l'API MOEX
     """
+    row = get_board_snapshot().get_row(ticker)
+    if row is not None:
+        return row
+    
     try:
-        url = f"https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities/{ticker}.json"
-        
         params = {
-            'iss.meta': 'off',
             'iss.only': 'marketdata'
         }
         
-        response = requests.get(url, params=params, timeout=5)
-        data = response.json()
+        data = get_transport().get_json(Endpoints.MARKET_DATA.format(ticker=ticker), params, deadline=5)
         
         if 'marketdata' in data and 'data' in data['marketdata']:
-            marketdata = data['marketdata']
-            columns = marketdata['columns']
-            values = marketdata['data'][0] if marketdata['data'] else []
-            
-            result = {}
-            for i, col in enumerate(columns):
-                if i < len(values):
-                    result[col] = values[i]
+            marketdata = block_to_frame(data['marketdata'])
+            if marketdata.empty:
+                return {}
             
-            return result
+            row = marketdata.iloc[0]
+            return {col: (None if pd.isna(value) else value) for col, value in row.items()}
         
         return None
         
     except:
         return None
 
+def get_watchlist_quotes(tickers):
+    """
+    Récupère les cotations de la watchlist depuis l'instantané du board,
+    les symboles hors board étant demandés en un seul lot concurrent
+    """
+    snapshot = get_board_snapshot()
+    quotes = {ticker: snapshot.get_row(ticker) for ticker in tickers}
+    
+    missing = [ticker for ticker, row in quotes.items() if row is None]
+    if missing:
+        try:
+            for ticker, market in fetch_marketdata_batch(missing).items():
+                if not market.empty:
+                    quotes[ticker] = market.iloc[0].to_dict()
+        except Exception as e:
+            st.error(f"Erreur API: {e}")
+    
+    rows = []
+    for ticker, row in quotes.items():
+        if row is None:
+            continue
+        rows.append({
+            'Symbole': ticker,
+            'Dernier': row.get('LAST'),
+            'Ouverture': row.get('OPEN'),
+            'Volume': row.get('VOLTODAY', row.get('VOLT'))
+        })
+    
+    return pd.DataFrame(rows)
+
 def show():
     st.markdown("# 📈 Tableau de bord MOEX")
     
@@ -217,3 +229,17 @@ def show():
             st.dataframe(hist_data.tail(10))
     else:
         st.warning("Données historiques non disponibles")
+    
+    # Watchlist
+    with st.expander("📋 Liste de surveillance"):
+        watchlist = st.session_state.get('watchlist', DEFAULT_WATCHLIST)
+        quotes = get_watchlist_quotes(watchlist)
+        if not quotes.empty:
+            st.dataframe(quotes, use_container_width=True)
+            snapshot = get_board_snapshot()
+            age_caption = f"Cotations du board : il y a {format_age(snapshot.age)}"
+            if snapshot.revalidating:
+                age_caption += " · 🔄 actualisation en arrière-plan"
+            st.caption(age_caption)
+        else:
+            st.info("Cotations indisponibles")
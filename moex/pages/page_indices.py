@@ -3,10 +3,14 @@ Page Indices MOEX
 """
 import streamlit as st
 import pandas as pd
-import requests
 from datetime import datetime, timedelta
 import plotly.graph_objs as go
 
+from src.api.endpoints import Endpoints
+from src.api.iss_decoder import block_to_frame
+from src.api.transport import get_transport
+from src.data.simulator import simulate_panel
+
 indices = {
     'IMOEX': 'MOEX Russia Index',
     'RTSI': 'RTS Index',
@@ -14,12 +18,10 @@ indices = {
 }
 
 def get_index_data(index, days=30):
-    """Récupère les données d'un indice"""
+    """Récupère la composition d'un indice (bloc analytics décodé)"""
     try:
-        url = f"https://iss.moex.com/iss/statistics/engines/stock/markets/index/analytics/{index}.json"
-        response = requests.get(url, timeout=10)
-        data = response.json()
-        return data
+        data = get_transport().get_json(Endpoints.INDEX_ANALYTICS.format(index=index), deadline=10)
+        return block_to_frame(data.get('analytics'))
     except:
         return None
 
@@ -32,10 +34,9 @@ def show():
         st.subheader(indices[selected])
         
         # Données simulées pour l'exemple (à remplacer par API réelle)
-        dates = pd.date_range(end=datetime.now(), periods=100, freq='D')
-        values = 3000 + np.cumsum(np.random.randn(100) * 20)
+        panel = simulate_panel([selected], periods=100, start_prices=3000, volatility=0.15, correlation=0.0)
         
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=dates, y=values, mode='lines', name=selected))
+        fig.add_trace(go.Scatter(x=panel.index, y=panel.close[0], mode='lines', name=selected))
         fig.update_layout(height=500)
         st.plotly_chart(fig)
@@ -3,33 +3,17 @@ Page Portefeuille - Avec prix réels MOEX
 """
 import streamlit as st
 import pandas as pd
-import requests
 from datetime import datetime
 
+from src.data.board_snapshot import get_board_snapshot
+
 # Initialisation session state
 if 'positions' not in st.session_state:
     st.session_state.positions = []
 
 def get_current_price(symbol):
-    """Récupère le prix actuel depuis l'API MOEX"""
-    try:
-        url = f"https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities/{symbol}.json"
-        params = {'iss.meta': 'off', 'iss.only': 'marketdata'}
-        
-        response = requests.get(url, params=params, timeout=5)
-        data = response.json()
-        
-        if 'marketdata' in data and 'data' in data['marketdata']:
-            marketdata = data['marketdata']
-            columns = marketdata['columns']
-            values = marketdata['data'][0] if marketdata['data'] else []
-            
-            for i, col in enumerate(columns):
-                if col == 'LAST' and i < len(values):
-                    return float(values[i])
-        return None
-    except:
-        return None
+    """Récupère le prix actuel depuis l'instantané du board MOEX"""
+    return get_board_snapshot().get_price(symbol)
 
 def show():
     st.markdown("# 💰 Portefeuille virtuel")
@@ -41,9 +25,10 @@ def show():
             total_value = 0
             total_cost = 0
             
-            # Mettre à jour les prix
+            # Mettre à jour les prix (une seule requête pour tout le board)
+            prices = get_board_snapshot().get_prices(pos['symbol'] for pos in st.session_state.positions)
             for pos in st.session_state.positions:
-                current_price = get_current_price(pos['symbol'])
+                current_price = prices.get(pos['symbol'])
                 if current_price:
                     pos['current_price'] = current_price
                     total_value += pos['shares'] * current_price
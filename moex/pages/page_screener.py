@@ -0,0 +1,54 @@
+"""
+Page Screener technique
+"""
+import streamlit as st
+
+from src.data.screener import get_screener
+
+presets = {
+    'Survendues avec volume': ['RSI < 30', 'Volume_Ratio > 1.5'],
+    'Suracheté': ['RSI > 70'],
+    'Cassure de Bollinger': ['close > BB_Upper'],
+    'MACD haussier': ['MACD > MACD_Signal', 'MACD_Histogram > 0'],
+    'Volumes anormaux': ['Volume_Ratio > 2'],
+    'Personnalisé': [],
+}
+
+sort_keys = ['RSI', 'Volume_Ratio', 'change', 'Volatility', 'MACD_Histogram', 'volume', 'close']
+
+def show():
+    st.markdown("# 🔎 Screener technique")
+    st.caption("Filtres évalués sur toutes les actions du board TQBR (cotation courante et historique journalier)")
+
+    preset = st.selectbox("Filtre prédéfini", list(presets.keys()))
+    text = st.text_area(
+        "Conditions (une par ligne)",
+        value="\n".join(presets[preset]),
+        help="Forme: colonne opérateur valeur, ex. « RSI < 30 » ou « close > BB_Upper »"
+    )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_by = st.selectbox("Trier par", sort_keys)
+    with col2:
+        k = st.slider("Nombre de résultats", 5, 100, 20)
+    with col3:
+        ascending = st.checkbox("Ordre croissant", value=sort_by == 'RSI' and preset.startswith('Survendues'))
+
+    conditions = [line for line in text.splitlines() if line.strip()]
+    screener = get_screener()
+
+    try:
+        with st.spinner("Calcul des indicateurs..."):
+            results = screener.screen(conditions, sort_by=sort_by, k=k, ascending=ascending)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    if results.empty:
+        st.info("Aucune action ne vérifie ces conditions")
+    else:
+        st.dataframe(results.round(2), use_container_width=True)
+
+    if screener.snapshot.updated_at:
+        st.caption(f"Instantané du {screener.snapshot.updated_at:%d/%m/%Y %H:%M:%S} — {len(results)} résultat(s)")
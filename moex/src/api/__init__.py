@@ -1,5 +1,7 @@
 """Package API MOEX"""
 from .moex_client import MOEXClient
+from .async_client import AsyncMOEXClient, fetch_candles_batch, fetch_marketdata_batch
+from .transport import ISSTransport, get_transport
 from .exceptions import MOEXAPIError, MOEXRateLimitError
 
-__all__ = ['MOEXClient', 'MOEXAPIError', 'MOEXRateLimitError']
\ No newline at end of file
+__all__ = ['MOEXClient', 'AsyncMOEXClient', 'fetch_candles_batch', 'fetch_marketdata_batch', 'ISSTransport', 'get_transport', 'MOEXAPIError', 'MOEXRateLimitError']
\ No newline at end of file
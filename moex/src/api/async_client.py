@@ -0,0 +1,252 @@
+"""
+Client API MOEX asynchrone (aiohttp) pour les requêtes multi-tickers
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+
+import aiohttp
+import pandas as pd
+
+from .endpoints import MOEX_BASE_URL, Endpoints
+from .exceptions import MOEXAPIError, MOEXRateLimitError
+from .iss_decoder import block_to_frame
+from .moex_client import candles_to_frame
+from .pagination import CANDLES_PAGE_SIZE
+from .rate_limiter import RateLimiter, endpoint_key, get_rate_limiter
+from ..utils.singleflight import SingleFlight
+from .transport import DEFAULT_DEADLINE, MAX_RETRIES, RETRY_STATUS, backoff_delay, retry_after_seconds
+
+# Nombre maximal de requêtes ISS simultanées pour un client
+MAX_CONCURRENCY = 8
+
+# Requêtes asynchrones identiques en cours, mutualisées entre clients et boucles
+_flights = SingleFlight()
+
+
+class AsyncMOEXClient:
+    """Client asynchrone pour interroger un ensemble de tickers en parallèle"""
+
+    def __init__(
+        self,
+        base_url: str = MOEX_BASE_URL,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        deadline: float = DEFAULT_DEADLINE,
+        limiter: Optional[RateLimiter] = None
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.limiter = limiter or get_rate_limiter()
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> 'AsyncMOEXClient':
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                'Accept': 'application/json',
+                'Accept-Encoding': 'gzip, deflate'
+            }
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+        self._session = None
+
+    async def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        GET avec retries et budget total, sous la limite de concurrence du client
+
+        Les requêtes identiques simultanées (même URL, mêmes paramètres) sont
+        mutualisées : une seule part, toutes reçoivent le même objet JSON
+        (à ne pas modifier).
+        """
+        if self._session is None:
+            raise MOEXAPIError("Client non ouvert (utiliser 'async with AsyncMOEXClient()')")
+
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        query = {'iss.meta': 'off'}
+        query.update(params or {})
+        key = (url, tuple(sorted((k, str(v)) for k, v in query.items())))
+        return await _flights.do_async(key, self._request_json, url, endpoint_key(path), query)
+
+    async def _request_json(self, url: str, endpoint: str, query: Dict[str, Any]) -> Dict[str, Any]:
+        """Requête effective : une place du client, puis le budget de débit et la concurrence du processus"""
+        loop = asyncio.get_running_loop()
+        # Le budget de la requête court à partir de l'obtention d'une place : les requêtes
+        # en attente de place n'ont encore rien réservé auprès du limiteur
+        async with self._semaphore:
+            deadline_at = loop.time() + self.deadline
+
+            last_error: Optional[BaseException] = None
+            attempt = 0
+            while attempt <= self.max_retries:
+                remaining = deadline_at - loop.time()
+                if remaining <= 0:
+                    break
+
+                try:
+                    async with self.limiter.acquire_async(endpoint):
+                        async with self._session.get(
+                            url, params=query, timeout=aiohttp.ClientTimeout(total=remaining)
+                        ) as response:
+                            if response.status == 429:
+                                self.limiter.report_throttled(retry_after_seconds(response))
+                                last_error = MOEXRateLimitError(f"HTTP 429 pour {url}")
+                            elif response.status in RETRY_STATUS:
+                                last_error = MOEXAPIError(f"HTTP {response.status}")
+                            elif response.status != 200:
+                                raise MOEXAPIError(f"HTTP {response.status} pour {url}")
+                            else:
+                                return await response.json(content_type=None)
+                except MOEXRateLimitError as e:
+                    # Budget du processus épuisé : rien n'est parti, attendre qu'il se reconstitue
+                    # puis réessayer (seul le budget total borne ces attentes)
+                    last_error = e
+                    pause = min(e.retry_after or self.limiter.max_wait, deadline_at - loop.time())
+                    if pause > 0:
+                        await asyncio.sleep(pause)
+                    continue
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    last_error = e
+                except ValueError as e:
+                    raise MOEXAPIError(f"Réponse JSON invalide pour {url}") from e
+
+                if attempt < self.max_retries:
+                    pause = min(backoff_delay(attempt), deadline_at - loop.time())
+                    if pause > 0:
+                        await asyncio.sleep(pause)
+                attempt += 1
+
+        if isinstance(last_error, MOEXRateLimitError):
+            raise last_error
+        raise MOEXAPIError(f"Échec de la requête {url}: {last_error or 'délai dépassé'}")
+
+    async def get_candles(
+        self,
+        ticker: str,
+        interval: int = 24,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Récupère toutes les bougies d'un ticker (pages successives)"""
+        params = {'interval': interval}
+        if from_date:
+            params['from'] = from_date
+        if to_date:
+            params['till'] = to_date
+
+        path = Endpoints.CANDLES.format(ticker=ticker)
+        columns, rows, start = [], [], 0
+        while limit is None or len(rows) < limit:
+            payload = await self._get_json(path, {**params, 'start': start})
+            block = payload.get('candles') or {}
+            page = block.get('data', [])
+            columns = block.get('columns', columns)
+            rows.extend(page)
+            if len(page) < CANDLES_PAGE_SIZE:
+                break
+            start += len(page)
+
+        if limit is not None:
+            rows = rows[:limit]
+        return candles_to_frame({'columns': columns, 'data': rows})
+
+    async def get_market_data(self, ticker: str) -> pd.DataFrame:
+        """Récupère les données de marché d'un ticker"""
+        payload = await self._get_json(
+            Endpoints.MARKET_DATA.format(ticker=ticker), {'iss.only': 'marketdata'}
+        )
+        return block_to_frame(payload.get('marketdata'))
+
+    async def gather_candles(
+        self,
+        tickers: Iterable[str],
+        errors: Optional[Dict[str, BaseException]] = None,
+        **kwargs
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Récupère les bougies de plusieurs tickers en parallèle
+
+        Args:
+            tickers: Liste des tickers
+            errors: Si fourni, reçoit l'exception de chaque ticker en erreur (un ticker
+                sans bougies sur la période n'est pas une erreur)
+            **kwargs: Paramètres transmis à get_candles
+
+        Returns:
+            Dict[str, pd.DataFrame]: Bougies par ticker (DataFrame vide en cas d'erreur)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        results = await asyncio.gather(
+            *(self.get_candles(ticker, **kwargs) for ticker in tickers),
+            return_exceptions=True
+        )
+        if errors is not None:
+            errors.update(
+                (ticker, result) for ticker, result in zip(tickers, results) if isinstance(result, BaseException)
+            )
+        return {
+            ticker: result if isinstance(result, pd.DataFrame) else pd.DataFrame()
+            for ticker, result in zip(tickers, results)
+        }
+
+    async def gather_marketdata(self, tickers: Iterable[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Récupère les données de marché de plusieurs tickers en parallèle
+
+        Args:
+            tickers: Liste des tickers
+
+        Returns:
+            Dict[str, pd.DataFrame]: Données de marché par ticker (vide en cas d'erreur)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        results = await asyncio.gather(
+            *(self.get_market_data(ticker) for ticker in tickers),
+            return_exceptions=True
+        )
+        return {
+            ticker: result if isinstance(result, pd.DataFrame) else pd.DataFrame()
+            for ticker, result in zip(tickers, results)
+        }
+
+
+def run_sync(coro):
+    """Exécute une coroutine depuis du code synchrone (scripts Streamlit)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Une boucle tourne déjà dans ce thread : exécuter dans un thread dédié
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def fetch_candles_batch(
+    tickers: Iterable[str],
+    client: Optional[AsyncMOEXClient] = None,
+    errors: Optional[Dict[str, BaseException]] = None,
+    **kwargs
+) -> Dict[str, pd.DataFrame]:
+    """Façade synchrone de AsyncMOEXClient.gather_candles"""
+    async def _run():
+        async with (client or AsyncMOEXClient()) as session:
+            return await session.gather_candles(tickers, errors=errors, **kwargs)
+    return run_sync(_run())
+
+
+def fetch_marketdata_batch(tickers: Iterable[str], client: Optional[AsyncMOEXClient] = None) -> Dict[str, pd.DataFrame]:
+    """Façade synchrone de AsyncMOEXClient.gather_marketdata"""
+    async def _run():
+        async with (client or AsyncMOEXClient()) as session:
+            return await session.gather_marketdata(tickers)
+    return run_sync(_run())
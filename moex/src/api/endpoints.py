@@ -9,3 +9,5 @@ class Endpoints:
     SECURITIES = "engines/stock/markets/shares/boards/{board}/securities.json"
     MARKET_DATA = "engines/stock/markets/shares/boards/TQBR/securities/{ticker}.json"
     CANDLES = "engines/stock/markets/shares/securities/{ticker}/candles.json"
+    HISTORY = "history/engines/stock/markets/shares/boards/{board}/securities/{ticker}.json"
+    INDEX_ANALYTICS = "statistics/engines/stock/markets/index/analytics/{index}.json"
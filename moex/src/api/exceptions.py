@@ -8,4 +8,8 @@ class MOEXAPIError(Exception):
 
 class MOEXRateLimitError(MOEXAPIError):
     """Exception pour dépassement de rate limit"""
-    pass
+
+    def __init__(self, message: str = '', retry_after=None):
+        super().__init__(message)
+        # Attente estimée (secondes) avant qu'une nouvelle tentative puisse passer, si connue
+        self.retry_after = retry_after
@@ -0,0 +1,133 @@
+"""
+Décodage vectorisé des blocs ISS {columns, data} en colonnes numpy typées
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Colonnes ISS contenant des dates ou des dates-heures
+DATE_COLUMNS = frozenset({'TRADEDATE', 'SYSTIME', 'begin', 'end', 'tradedate'})
+
+# Champs OHLCV (noms minuscules dans candles, majuscules dans history)
+BAR_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+TIME_COLUMNS = ('begin', 'TRADEDATE', 'tradedate')
+
+
+def column_names(block) -> List[str]:
+    """Noms des colonnes d'un bloc (chaînes ou dictionnaires {'name': ...})"""
+    if not isinstance(block, dict):
+        return []
+    return [c['name'] if isinstance(c, dict) else c for c in block.get('columns', [])]
+
+
+def decode_dates(values) -> np.ndarray:
+    """Convertit des dates ISO (ou None) en datetime64[ns], NaT si illisible"""
+    try:
+        return np.array(values, dtype='datetime64[ns]')
+    except (ValueError, TypeError):
+        return pd.to_datetime(pd.Series(values, dtype=object), errors='coerce').to_numpy('datetime64[ns]')
+
+
+def decode_values(values) -> np.ndarray:
+    """
+    Convertit les valeurs d'une colonne en tableau typé
+
+    Les entiers et flottants restent numériques (float64 avec NaN si des valeurs
+    manquent) ; les colonnes de texte deviennent des tableaux d'objets.
+    """
+    array = np.array(values)
+    if array.dtype.kind in 'iufb':
+        return array
+    if array.dtype.kind == 'O':
+        try:
+            return np.array(values, dtype=np.float64)
+        except (ValueError, TypeError):
+            return array
+    return np.array(values, dtype=object)
+
+
+def decode_block(block, date_columns=DATE_COLUMNS) -> Dict[str, np.ndarray]:
+    """
+    Décode un bloc ISS en une passe (transposition puis conversion par colonne)
+
+    Args:
+        block: Bloc {'columns': [...], 'data': [[...], ...]}
+        date_columns: Colonnes à interpréter comme des dates
+
+    Returns:
+        Dict[str, np.ndarray]: Colonnes typées, dans l'ordre du bloc
+    """
+    names = column_names(block)
+    if not names:
+        return {}
+
+    rows = block.get('data') or []
+    values = list(zip(*rows)) if rows else [()] * len(names)
+
+    return {
+        name: decode_dates(column) if name in date_columns else decode_values(column)
+        for name, column in zip(names, values)
+    }
+
+
+def block_to_frame(block, index: Optional[str] = None) -> pd.DataFrame:
+    """
+    Convertit un bloc ISS en DataFrame sans passer par une liste de lignes
+
+    Args:
+        block: Bloc {'columns': [...], 'data': [[...], ...]}
+        index: Colonne à utiliser comme index, si présente
+
+    Returns:
+        pd.DataFrame: DataFrame typé (vide si le bloc est invalide)
+    """
+    return columns_to_frame(decode_block(block), index)
+
+
+def columns_to_frame(columns: Dict[str, np.ndarray], index: Optional[str] = None) -> pd.DataFrame:
+    """DataFrame construit sur des colonnes déjà décodées (sans copie)"""
+    if not columns:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(columns, copy=False)
+    if index and index in df.columns:
+        df = df.set_index(index)
+    return df
+
+
+def decode_bars(block) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Extrait les barres OHLCV d'un bloc candles ou history
+
+    Args:
+        block: Bloc ISS candles (begin, open...) ou history (TRADEDATE, OPEN...)
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, np.ndarray]]: (timestamps int64 en ns, colonnes float64)
+    """
+    return bars_from_columns(decode_block(block))
+
+
+def bars_from_columns(columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Extrait les barres OHLCV de colonnes décodées
+
+    Les lignes sans date valide sont écartées ; les valeurs manquantes sont NaN.
+    """
+    time_column = next((name for name in TIME_COLUMNS if name in columns), None)
+    if time_column is None:
+        return np.empty(0, dtype=np.int64), {name: np.empty(0) for name in BAR_FIELDS}
+
+    dates = columns[time_column]
+    valid = ~np.isnat(dates)
+    timestamps = dates[valid].view(np.int64)
+
+    bars = {}
+    for name in BAR_FIELDS:
+        values = columns.get(name, columns.get(name.upper()))
+        if values is None or values.dtype.kind not in 'iufb':
+            bars[name] = np.full(len(timestamps), np.nan)
+        else:
+            bars[name] = values[valid].astype(np.float64)
+    return timestamps, bars
@@ -0,0 +1,201 @@
+"""
+Décodage en flux des réponses ISS volumineuses
+
+Le corps HTTP est lu par morceaux ; les lignes du bloc demandé sont décodées
+une à une et versées par lots dans des colonnes numpy extensibles, sans
+jamais construire la liste de listes complète.
+"""
+import codecs
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .iss_decoder import DATE_COLUMNS, column_names, decode_block
+
+CHUNK_SIZE = 64 * 1024
+BATCH_ROWS = 4096
+INITIAL_CAPACITY = 1024
+
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+
+
+class ColumnBuilder:
+    """Colonnes typées extensibles alimentées par lots de lignes"""
+
+    def __init__(self, names: List[str], date_columns=DATE_COLUMNS):
+        self.names = names
+        self.date_columns = date_columns
+        self.size = 0
+        self._values: Dict[str, np.ndarray] = {}
+
+    def append_rows(self, rows: List[list]):
+        """Décode un lot de lignes et l'ajoute aux colonnes"""
+        if not rows:
+            return
+        batch = decode_block({'columns': self.names, 'data': rows}, self.date_columns)
+        end = self.size + len(rows)
+        for name, chunk in batch.items():
+            values = self._values.get(name)
+            if values is None:
+                values = np.empty(max(INITIAL_CAPACITY, end), dtype=chunk.dtype)
+            else:
+                try:
+                    dtype = np.result_type(values.dtype, chunk.dtype)
+                except TypeError:
+                    dtype = np.dtype(object)
+                if end > len(values) or dtype != values.dtype:
+                    grown = np.empty(max(end, 2 * len(values)), dtype=dtype)
+                    grown[:self.size] = values[:self.size]
+                    values = grown
+            values[self.size:end] = chunk
+            self._values[name] = values
+        self.size = end
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Colonnes remplies (vues sur les tampons)"""
+        if not self._values:
+            return decode_block({'columns': self.names, 'data': []}, self.date_columns)
+        return {name: self._values[name][:self.size] for name in self.names}
+
+
+class _Reader:
+    """Tampon texte alimenté par les morceaux binaires de la réponse"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Lit le morceau suivant ; False si la réponse est épuisée"""
+        if self.eof:
+            return False
+        text = ''
+        while not text:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                text = self._utf8.decode(b'', final=True)
+                self.eof = True
+                break
+            text = self._utf8.decode(chunk)
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return bool(text) or not self.eof
+
+    def peek(self) -> str:
+        """Prochain caractère significatif ('' en fin de réponse)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"JSON ISS inattendu: '{char}' attendu à la position {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Décode une valeur JSON complète"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # Un nombre en fin de tampon peut se poursuivre dans le morceau suivant
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self.fill():
+                raise ValueError("Réponse JSON tronquée")
+
+
+def _read_table(reader: _Reader, batch_rows: int, date_columns) -> Dict[str, np.ndarray]:
+    """Lit un bloc {columns, data} en versant les lignes dans un ColumnBuilder"""
+    names: Optional[List[str]] = None
+    builder: Optional[ColumnBuilder] = None
+    batch: List[list] = []
+
+    def flush():
+        nonlocal builder
+        if names is None:
+            return
+        if builder is None:
+            builder = ColumnBuilder(names, date_columns)
+        builder.append_rows(batch)
+        batch.clear()
+
+    reader.expect('{')
+    while reader.peek() != '}':
+        key = reader.value()
+        reader.expect(':')
+        if key == 'columns':
+            names = column_names({'columns': reader.value()})
+        elif key == 'data':
+            reader.expect('[')
+            while reader.peek() != ']':
+                batch.append(reader.value())
+                if len(batch) >= batch_rows:
+                    flush()
+                if reader.peek() == ',':
+                    reader.pos += 1
+            reader.pos += 1
+        else:
+            reader.value()
+        if reader.peek() == ',':
+            reader.pos += 1
+    reader.pos += 1
+
+    if names is None:
+        return {}
+    flush()
+    return builder.columns()
+
+
+def stream_block(
+    chunks: Iterable[bytes],
+    block: str,
+    batch_rows: int = BATCH_ROWS,
+    date_columns=DATE_COLUMNS
+) -> Tuple[Optional[Dict[str, np.ndarray]], Dict[str, Any]]:
+    """
+    Décode en flux une réponse ISS
+
+    Args:
+        chunks: Morceaux binaires du corps de la réponse
+        block: Bloc à décoder en colonnes (ex: 'history', 'candles')
+        batch_rows: Nombre de lignes décodées par lot
+        date_columns: Colonnes à interpréter comme des dates
+
+    Returns:
+        Tuple: (colonnes typées du bloc ou None s'il est absent,
+                autres entrées de premier niveau décodées normalement, ex: curseur)
+
+    Raises:
+        ValueError: Si la réponse n'est pas un JSON ISS valide
+    """
+    reader = _Reader(chunks)
+    columns = None
+    others: Dict[str, Any] = {}
+
+    reader.expect('{')
+    while reader.peek() != '}':
+        key = reader.value()
+        reader.expect(':')
+        if key == block:
+            columns = _read_table(reader, batch_rows, date_columns)
+        else:
+            others[key] = reader.value()
+        if reader.peek() == ',':
+            reader.pos += 1
+        elif reader.peek() == '':
+            raise ValueError("Réponse JSON tronquée")
+    return columns, others
@@ -1,24 +1,44 @@
 """
 Client API MOEX - Version ultra-simplifiée
 """
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
 
+from .endpoints import Endpoints
+from .iss_decoder import block_to_frame, columns_to_frame, decode_block
+from .pagination import CANDLES_PAGE_SIZE, fetch_all_columns
+from .transport import ISSTransport, get_transport
+
+def candles_to_frame(candles) -> pd.DataFrame:
+    """Convertit un bloc ISS `candles` en DataFrame indexé par date"""
+    return candle_columns_to_frame(decode_block(candles))
+
+def candle_columns_to_frame(columns) -> pd.DataFrame:
+    """Convertit des colonnes de bougies décodées en DataFrame indexé par date"""
+    df = columns_to_frame(columns, index='begin')
+    
+    # Renommer pour standardiser
+    rename = {
+        'open': 'Open',
+        'high': 'High', 
+        'low': 'Low',
+        'close': 'Close',
+        'volume': 'Volume'
+    }
+    return df.rename(columns={k: v for k, v in rename.items() if k in df.columns})
+
 class MOEXClient:
     """Client simple pour l'API MOEX"""
     
-    def __init__(self):
-        self.base_url = "https://iss.moex.com/iss"
+    def __init__(self, transport: ISSTransport = None):
+        self.transport = transport or get_transport()
+        self.base_url = self.transport.base_url
+        self.session = self.transport.session
     
-    def get_candles(self, ticker, interval=24, from_date=None, to_date=None, limit=100):
-        """Récupère les données historiques"""
-        url = f"{self.base_url}/engines/stock/markets/shares/securities/{ticker}/candles.json"
-        
+    def get_candles(self, ticker, interval=24, from_date=None, to_date=None, limit=None, deadline=None):
+        """Récupère les données historiques (toutes les pages, tronquées à `limit` si fourni)"""
         params = {
-            'interval': interval,
-            'limit': limit,
-            'iss.meta': 'off'
+            'interval': interval
         }
         
         if from_date:
@@ -27,62 +47,57 @@ class MOEXClient:
             params['till'] = to_date
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            candles = fetch_all_columns(
+                Endpoints.CANDLES.format(ticker=ticker),
+                'candles',
+                params,
+                transport=self.transport,
+                max_rows=limit,
+                page_size=CANDLES_PAGE_SIZE,
+                deadline=deadline
+            )
             
-            if 'candles' not in data:
-                return pd.DataFrame()
-            
-            candles = data['candles']
-            
-            # Extraction simple
-            if isinstance(candles, dict) and 'columns' in candles and 'data' in candles:
-                columns = candles['columns']
-                # Si columns est une liste de strings
-                if columns and isinstance(columns[0], str):
-                    df = pd.DataFrame(candles['data'], columns=columns)
-                    
-                    # Convertir les colonnes importantes
-                    if 'begin' in df.columns:
-                        df['begin'] = pd.to_datetime(df['begin'])
-                        df.set_index('begin', inplace=True)
-                    
-                    # Renommer pour standardiser
-                    rename = {
-                        'open': 'Open',
-                        'high': 'High', 
-                        'low': 'Low',
-                        'close': 'Close',
-                        'volume': 'Volume'
-                    }
-                    df = df.rename(columns={k: v for k, v in rename.items() if k in df.columns})
-                    
-                    return df
-            
-            return pd.DataFrame()
+            return candle_columns_to_frame(candles)
             
         except Exception as e:
             print(f"Erreur: {e}")
             return pd.DataFrame()
     
-    def get_market_data(self, ticker):
+    def get_market_data(self, ticker, deadline=None):
         """Récupère les données de marché"""
-        url = f"{self.base_url}/engines/stock/markets/shares/boards/TQBR/securities/{ticker}.json"
-        
         try:
-            response = requests.get(url, params={'iss.meta': 'off'}, timeout=10)
-            data = response.json()
+            data = self.transport.get_json(
+                Endpoints.MARKET_DATA.format(ticker=ticker),
+                {'iss.only': 'marketdata'},
+                deadline=deadline
+            )
             
-            if 'marketdata' in data:
-                market = data['marketdata']
-                if isinstance(market, dict) and 'columns' in market and 'data' in market:
-                    columns = market['columns']
-                    if columns and isinstance(columns[0], str):
-                        df = pd.DataFrame(market['data'], columns=columns)
-                        return df
+            return block_to_frame(data.get('marketdata'))
             
+        except Exception as e:
+            print(f"Erreur: {e}")
             return pd.DataFrame()
-            
+    
+    def get_board(self, board='TQBR', deadline=None):
+        """
+        Récupère en une requête les blocs `securities` et `marketdata` de tout un board
+        
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: (securities, marketdata)
+        """
+        data = self.transport.get_json(
+            Endpoints.SECURITIES.format(board=board),
+            {'iss.only': 'securities,marketdata'},
+            deadline=deadline
+        )
+        
+        return block_to_frame(data.get('securities')), block_to_frame(data.get('marketdata'))
+    
+    def get_securities(self, board='TQBR'):
+        """Récupère la liste des actions d'un board"""
+        try:
+            securities, _ = self.get_board(board)
+            return securities
         except Exception as e:
             print(f"Erreur: {e}")
             return pd.DataFrame()
@@ -0,0 +1,200 @@
+"""
+Pagination automatique des réponses ISS (curseur `start`)
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .transport import ISSTransport, get_transport
+
+MAX_PAGE_WORKERS = 4
+
+# Sans curseur, pages demandées d'avance : au plus autant de requêtes inutiles après la dernière page
+SPECULATIVE_PAGES = 1
+
+# Taille de page servie par l'ISS pour les bougies (pas de bloc curseur)
+CANDLES_PAGE_SIZE = 500
+
+
+def _read_cursor(payload: Dict[str, Any], block: str) -> Optional[Dict[str, int]]:
+    """Lit le bloc `<block>.cursor` (INDEX, TOTAL, PAGESIZE) s'il existe"""
+    cursor = payload.get(f"{block}.cursor")
+    if not isinstance(cursor, dict) or not cursor.get('data'):
+        return None
+
+    columns = [c['name'] if isinstance(c, dict) else c for c in cursor.get('columns', [])]
+    values = dict(zip(columns, cursor['data'][0]))
+    if not {'INDEX', 'TOTAL', 'PAGESIZE'} <= values.keys():
+        return None
+    return {k: int(values[k]) for k in ('INDEX', 'TOTAL', 'PAGESIZE')}
+
+
+def _collect_pages(
+    fetch_page: Callable[[int], Tuple[Any, Dict[str, Any]]],
+    page_length: Callable[[Any], int],
+    block: str,
+    start: int,
+    max_workers: int,
+    max_rows: Optional[int],
+    page_size: Optional[int]
+) -> List[Any]:
+    """
+    Récupère les pages d'un bloc ISS à partir de `start`
+
+    Si la réponse contient un bloc `<block>.cursor`, les pages restantes sont
+    connues d'avance et demandées en parallèle. Sinon (bougies), le total est
+    inconnu : chaque page est demandée avec SPECULATIVE_PAGES page(s) d'avance
+    jusqu'à la première page incomplète, et les pages pas encore parties sont
+    alors annulées.
+
+    Args:
+        fetch_page: Fonction (start) -> (page ou None si le bloc est absent, réponse)
+        page_length: Nombre de lignes d'une page
+
+    Returns:
+        List[Any]: Pages non vides dans l'ordre (vide si le bloc est absent)
+    """
+    first, first_payload = fetch_page(start)
+    if first is None:
+        return []
+
+    pages = [first]
+
+    def enough() -> bool:
+        return max_rows is not None and sum(page_length(p) for p in pages) >= max_rows
+
+    cursor = _read_cursor(first_payload, block)
+    if cursor is not None:
+        page_size = cursor['PAGESIZE'] or page_length(first)
+        stop = cursor['TOTAL']
+        if max_rows is not None:
+            stop = min(stop, start + max_rows)
+        starts = list(range(cursor['INDEX'] + page_size, stop, page_size)) if page_size else []
+        if starts:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(starts))) as executor:
+                for page, _ in executor.map(fetch_page, starts):
+                    if page is not None:
+                        pages.append(page)
+    elif page_size or page_length(first):
+        page_size = page_size or page_length(first)
+        if page_length(first) < page_size or enough():
+            return pages
+        stop = start + max_rows if max_rows is not None else None
+        window = max(1, min(max_workers, 1 + SPECULATIVE_PAGES))
+        next_start = start + page_size
+        with ThreadPoolExecutor(max_workers=window) as executor:
+            pending = deque()
+
+            def submit():
+                nonlocal next_start
+                if stop is None or next_start < stop:
+                    pending.append(executor.submit(fetch_page, next_start))
+                    next_start += page_size
+
+            for _ in range(window):
+                submit()
+            while pending:
+                page, _ = pending.popleft().result()
+                length = page_length(page) if page is not None else 0
+                if length:
+                    pages.append(page)
+                if length < page_size or enough():
+                    for future in pending:
+                        future.cancel()
+                    break
+                submit()
+
+    return pages
+
+
+def fetch_all_pages(
+    path: str,
+    block: str,
+    params: Optional[Dict[str, Any]] = None,
+    transport: Optional[ISSTransport] = None,
+    max_workers: int = MAX_PAGE_WORKERS,
+    max_rows: Optional[int] = None,
+    page_size: Optional[int] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, List]:
+    """
+    Récupère toutes les pages d'un bloc ISS et les concatène
+
+    Args:
+        path: Chemin ISS relatif
+        block: Nom du bloc de données (ex: 'history', 'candles')
+        params: Paramètres de requête
+        transport: Transport HTTP (partagé par défaut)
+        max_workers: Nombre maximal de pages demandées simultanément
+        max_rows: Nombre maximal de lignes à retourner (None = tout)
+        page_size: Taille de page attendue quand il n'y a pas de curseur
+        deadline: Budget par requête en secondes
+
+    Returns:
+        Dict[str, List]: Bloc fusionné {'columns': [...], 'data': [...]}
+    """
+    transport = transport or get_transport()
+    params = dict(params or {})
+    start = int(params.pop('start', 0))
+
+    def fetch_page(page_start: int):
+        payload = transport.get_json(path, {**params, 'start': page_start}, deadline=deadline)
+        page = payload.get(block)
+        if not isinstance(page, dict) or 'data' not in page:
+            return None, payload
+        return page, payload
+
+    pages = _collect_pages(
+        fetch_page, lambda page: len(page.get('data', [])), block, start, max_workers, max_rows, page_size
+    )
+    if not pages:
+        return {'columns': [], 'data': []}
+
+    data = list(chain.from_iterable(page.get('data', []) for page in pages))
+    if max_rows is not None:
+        data = data[:max_rows]
+    return {'columns': pages[0].get('columns', []), 'data': data}
+
+
+def fetch_all_columns(
+    path: str,
+    block: str,
+    params: Optional[Dict[str, Any]] = None,
+    transport: Optional[ISSTransport] = None,
+    max_workers: int = MAX_PAGE_WORKERS,
+    max_rows: Optional[int] = None,
+    page_size: Optional[int] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Récupère toutes les pages d'un bloc ISS en colonnes typées, décodées en flux
+
+    Mêmes paramètres que fetch_all_pages ; chaque page est décodée pendant sa
+    lecture puis les colonnes des pages sont concaténées.
+
+    Returns:
+        Dict[str, np.ndarray]: Colonnes typées (vide si le bloc est absent)
+    """
+    transport = transport or get_transport()
+    params = dict(params or {})
+    start = int(params.pop('start', 0))
+
+    def fetch_page(page_start: int):
+        return transport.get_columns(path, block, {**params, 'start': page_start}, deadline=deadline)
+
+    def page_length(page: Dict[str, np.ndarray]) -> int:
+        return len(next(iter(page.values()))) if page else 0
+
+    pages = _collect_pages(fetch_page, page_length, block, start, max_workers, max_rows, page_size)
+    if not pages:
+        return {}
+
+    columns = pages[0] if len(pages) == 1 else {
+        name: np.concatenate([page[name] for page in pages]) for name in pages[0]
+    }
+    if max_rows is not None:
+        columns = {name: values[:max_rows] for name, values in columns.items()}
+    return columns
@@ -0,0 +1,225 @@
+"""
+Limitation de débit des appels ISS (token bucket + concurrence) pour tout le processus
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from .exceptions import MOEXRateLimitError
+
+# Budget global et par famille d'endpoints : (requêtes/seconde, rafale)
+GLOBAL_BUDGET = (20.0, 40)
+ENDPOINT_BUDGETS = {
+    'candles': (5.0, 10),
+    'history': (5.0, 10),
+    'statistics': (2.0, 4),
+    'marketdata': (10.0, 20)
+}
+MAX_CONCURRENCY = 10
+MAX_WAIT = 10.0
+# Intervalle de sondage du sémaphore de concurrence depuis une boucle asyncio
+SEMAPHORE_POLL = 0.01
+
+
+def endpoint_key(path: str) -> str:
+    """Famille d'endpoint d'un chemin ISS, utilisée pour le budget"""
+    path = path.split('/iss/', 1)[-1].lstrip('/')
+    if 'candles' in path:
+        return 'candles'
+    if path.startswith('history'):
+        return 'history'
+    if path.startswith('statistics'):
+        return 'statistics'
+    return 'marketdata'
+
+
+class TokenBucket:
+    """Seau à jetons avec réservation (le solde peut devenir négatif)"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Attente nécessaire avant qu'un jeton soit disponible"""
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def take(self):
+        """Consomme un jeton (éventuellement par anticipation)"""
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """Limiteur partagé : budget global, budgets par endpoint, concurrence et pénalité 429"""
+
+    def __init__(
+        self,
+        global_budget: Tuple[float, float] = GLOBAL_BUDGET,
+        endpoint_budgets: Optional[Dict[str, Tuple[float, float]]] = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_wait: float = MAX_WAIT,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.clock = clock
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._global = TokenBucket(*global_budget, clock=clock)
+        self._buckets = {
+            name: TokenBucket(*budget, clock=clock)
+            for name, budget in (endpoint_budgets if endpoint_budgets is not None else ENDPOINT_BUDGETS).items()
+        }
+        self._cooldown_until = 0.0
+        self._counters = {
+            'total_requests': 0,
+            'rate_limit_hits': 0,
+            'rejected': 0,
+            'delayed': 0,
+            'wait_seconds': 0.0,
+            'in_flight': 0,
+            'last_request_time': None
+        }
+
+    def reserve(self, endpoint: str = 'marketdata') -> float:
+        """
+        Réserve un créneau et retourne le délai à attendre avant d'émettre la requête
+
+        Raises:
+            MOEXRateLimitError: Si l'attente dépasserait max_wait
+        """
+        with self._lock:
+            now = self.clock()
+            buckets = [self._global]
+            if endpoint in self._buckets:
+                buckets.append(self._buckets[endpoint])
+
+            wait = max([self._cooldown_until - now] + [b.wait_time(now) for b in buckets])
+            wait = max(0.0, wait)
+            if wait > self.max_wait:
+                self._counters['rejected'] += 1
+                raise MOEXRateLimitError(
+                    f"Budget ISS épuisé pour '{endpoint}' (attente estimée {wait:.1f}s)", retry_after=wait
+                )
+
+            for bucket in buckets:
+                bucket.take()
+            self._counters['total_requests'] += 1
+            self._counters['last_request_time'] = datetime.now()
+            if wait > 0:
+                self._counters['delayed'] += 1
+                self._counters['wait_seconds'] += wait
+            return wait
+
+    @contextmanager
+    def acquire(self, endpoint: str = 'marketdata'):
+        """
+        Attend une place de concurrence puis un créneau de débit (usage synchrone)
+
+        Les jetons ne sont réservés qu'une fois la place obtenue : un refus de
+        concurrence ne consomme pas le budget, et la réservation n'a pas vieilli
+        pendant l'attente de la place.
+        """
+        if not self._semaphore.acquire(timeout=self.max_wait):
+            self._reject_concurrency()
+        try:
+            wait = self.reserve(endpoint)
+            if wait > 0:
+                time.sleep(wait)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        self._enter()
+        try:
+            yield
+        finally:
+            self._leave()
+
+    @asynccontextmanager
+    async def acquire_async(self, endpoint: str = 'marketdata'):
+        """
+        Équivalent asynchrone de acquire : même budget de débit, même limite de
+        concurrence et mêmes compteurs que les requêtes synchrones du processus
+
+        Raises:
+            MOEXRateLimitError: Si l'attente dépasserait max_wait
+        """
+        # Sémaphore partagé avec les threads : sondé sans bloquer la boucle
+        give_up = time.monotonic() + self.max_wait
+        while not self._semaphore.acquire(blocking=False):
+            if time.monotonic() >= give_up:
+                self._reject_concurrency()
+            await asyncio.sleep(SEMAPHORE_POLL)
+        try:
+            wait = self.reserve(endpoint)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        self._enter()
+        try:
+            yield
+        finally:
+            self._leave()
+
+    def _reject_concurrency(self):
+        with self._lock:
+            self._counters['rejected'] += 1
+        raise MOEXRateLimitError("Trop de requêtes ISS simultanées")
+
+    def _enter(self):
+        with self._lock:
+            self._counters['in_flight'] += 1
+
+    def _leave(self):
+        with self._lock:
+            self._counters['in_flight'] -= 1
+        self._semaphore.release()
+
+    def report_throttled(self, retry_after: Optional[float] = None, penalty: float = 1.0):
+        """
+        Signale une réponse HTTP 429 : toutes les requêtes sont suspendues un moment
+
+        Args:
+            retry_after: Valeur de l'en-tête Retry-After en secondes, si fournie
+            penalty: Pause par défaut en secondes
+        """
+        with self._lock:
+            self._counters['rate_limit_hits'] += 1
+            pause = retry_after if retry_after is not None else penalty
+            self._cooldown_until = max(self._cooldown_until, self.clock() + pause)
+
+    def stats(self) -> dict:
+        """Compteurs courants du limiteur"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['cooldown_remaining'] = max(0.0, self._cooldown_until - self.clock())
+            stats['tokens'] = round(self._global.tokens, 2)
+            return stats
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Retourne le limiteur partagé par tout le processus"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
@@ -0,0 +1,266 @@
+"""
+Couche de transport HTTP partagée pour l'API ISS MOEX
+"""
+import random
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from .endpoints import MOEX_BASE_URL
+from .exceptions import MOEXAPIError, MOEXRateLimitError
+from .json_stream import CHUNK_SIZE, stream_block
+from .rate_limiter import RateLimiter, endpoint_key, get_rate_limiter
+from ..utils.singleflight import SingleFlight
+
+# Délais par défaut (connexion, lecture) et budget total par appel, en secondes
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_DEADLINE = 15
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.25
+BACKOFF_MAX = 4.0
+POOL_SIZE = 20
+
+# Statuts HTTP transitoires qui justifient une nouvelle tentative
+RETRY_STATUS = {500, 502, 503, 504}
+
+# Erreurs réseau transitoires (y compris pendant la lecture du corps)
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Pause avant la prochaine tentative (backoff exponentiel, full jitter)"""
+    cap = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    """Valeur de l'en-tête Retry-After en secondes, si exploitable"""
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _own_columns(result):
+    """Copie des colonnes d'une réponse mutualisée, propre à un appelant"""
+    columns, others = result
+    if columns is not None:
+        columns = {name: values.copy() for name, values in columns.items()}
+    return columns, others
+
+
+class ISSTransport:
+    """Session HTTP mutualisée (keep-alive, gzip, retries) pour l'ISS"""
+
+    def __init__(
+        self,
+        base_url: str = MOEX_BASE_URL,
+        pool_size: int = POOL_SIZE,
+        max_retries: int = MAX_RETRIES,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        deadline: float = DEFAULT_DEADLINE,
+        limiter: Optional[RateLimiter] = None
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.limiter = limiter or get_rate_limiter()
+        self.flights = SingleFlight()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.deadline = deadline
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
+        })
+
+    def build_url(self, path: str) -> str:
+        """Construit l'URL complète à partir d'un chemin relatif ISS"""
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _backoff(self, attempt: int) -> float:
+        """Pause avant la prochaine tentative"""
+        return backoff_delay(attempt)
+
+    def get_json(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[Tuple[float, float]] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Exécute une requête GET et retourne le JSON décodé
+
+        Les appels simultanés portant sur la même URL et les mêmes paramètres
+        sont mutualisés : une seule requête part, tous reçoivent le même objet
+        JSON (à ne pas modifier).
+
+        Args:
+            path: Chemin ISS relatif (ou URL complète)
+            params: Paramètres de requête
+            timeout: Délais (connexion, lecture) par tentative
+            deadline: Budget total en secondes, retries compris
+
+        Returns:
+            Dict[str, Any]: Réponse JSON
+
+        Raises:
+            MOEXRateLimitError: Si le budget de débit est épuisé ou si l'ISS répond 429
+            MOEXAPIError: Si la requête échoue après les retries ou dépasse le budget
+        """
+        url, query, budget, key = self._prepare(path, params, deadline)
+
+        try:
+            return self.flights.do(
+                key, self._request_json, url, endpoint_key(path), query, timeout, budget, timeout=budget
+            )
+        except FutureTimeoutError as e:
+            raise MOEXAPIError(f"Délai dépassé en attente de {url}") from e
+
+    def get_columns(
+        self,
+        path: str,
+        block: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[Tuple[float, float]] = None,
+        deadline: Optional[float] = None
+    ) -> Tuple[Optional[Dict[str, np.ndarray]], Dict[str, Any]]:
+        """
+        Exécute une requête GET et décode le bloc demandé en flux, en colonnes typées
+
+        Le corps est lu par morceaux : la mémoire utilisée reste proportionnelle
+        aux colonnes produites, pas à la taille du JSON. Les appels simultanés
+        identiques sont mutualisés comme pour get_json, mais chaque appelant
+        reçoit ses propres tableaux : il peut les modifier (DataFrame construit
+        sans copie) sans effet sur les autres.
+
+        Args:
+            path: Chemin ISS relatif (ou URL complète)
+            block: Bloc à décoder (ex: 'history', 'candles')
+            params: Paramètres de requête
+            timeout: Délais (connexion, lecture) par tentative
+            deadline: Budget total en secondes, retries compris
+
+        Returns:
+            Tuple: (colonnes du bloc ou None s'il est absent, autres entrées de la réponse)
+
+        Raises:
+            MOEXRateLimitError: Si le budget de débit est épuisé ou si l'ISS répond 429
+            MOEXAPIError: Si la requête échoue après les retries ou dépasse le budget
+        """
+        url, query, budget, key = self._prepare(path, params, deadline)
+
+        def decode(response):
+            return stream_block(response.iter_content(chunk_size=CHUNK_SIZE), block)
+
+        try:
+            return self.flights.do(
+                key + (('columns', block),), self._request_json,
+                url, endpoint_key(path), query, timeout, budget, decode, timeout=budget, private=_own_columns
+            )
+        except FutureTimeoutError as e:
+            raise MOEXAPIError(f"Délai dépassé en attente de {url}") from e
+
+    def _prepare(self, path: str, params: Optional[Dict[str, Any]], deadline: Optional[float]):
+        """URL, paramètres, budget et clé de mutualisation d'une requête"""
+        url = self.build_url(path)
+        query = {'iss.meta': 'off'}
+        query.update(params or {})
+        budget = deadline if deadline is not None else self.deadline
+        key = (url, tuple(sorted((k, str(v)) for k, v in query.items())))
+        return url, query, budget, key
+
+    def _request_json(
+        self,
+        url: str,
+        endpoint: str,
+        query: Dict[str, Any],
+        timeout: Optional[Tuple[float, float]],
+        budget: float,
+        decode: Optional[Callable[[requests.Response], Any]] = None
+    ) -> Any:
+        """
+        Requête effective avec limitation de débit, retries et budget total
+
+        Sans `decode`, le corps est décodé par response.json() ; sinon la réponse
+        est lue en flux (stream=True) par `decode`.
+        """
+        stream = {'stream': True} if decode is not None else {}
+        connect_timeout, read_timeout = timeout or self.timeout
+        deadline_at = time.monotonic() + budget
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+
+            try:
+                with self.limiter.acquire(endpoint):
+                    response = self.session.get(
+                        url,
+                        params=query,
+                        timeout=(min(connect_timeout, remaining), min(read_timeout, remaining)),
+                        **stream
+                    )
+            except RETRY_ERRORS as e:
+                last_error = e
+            else:
+                # Toute réponse rend sa connexion au pool, erreurs comprises (stream=True)
+                try:
+                    if response.status_code == 429:
+                        # La pause imposée par l'ISS s'applique à toutes les requêtes du processus
+                        self.limiter.report_throttled(retry_after_seconds(response))
+                        last_error = MOEXRateLimitError(f"HTTP 429 pour {url}")
+                    elif response.status_code in RETRY_STATUS:
+                        last_error = MOEXAPIError(f"HTTP {response.status_code}")
+                    elif response.status_code != 200:
+                        raise MOEXAPIError(f"HTTP {response.status_code} pour {url}")
+                    else:
+                        try:
+                            return decode(response) if decode is not None else response.json()
+                        except RETRY_ERRORS as e:
+                            last_error = e
+                        except ValueError as e:
+                            raise MOEXAPIError(f"Réponse JSON invalide pour {url}") from e
+                finally:
+                    response.close()
+
+            if attempt < self.max_retries:
+                pause = min(self._backoff(attempt), deadline_at - time.monotonic())
+                if pause > 0:
+                    time.sleep(pause)
+
+        if isinstance(last_error, MOEXRateLimitError):
+            raise last_error
+        raise MOEXAPIError(f"Échec de la requête {url}: {last_error or 'délai dépassé'}")
+
+    def close(self):
+        """Ferme les connexions du pool"""
+        self.session.close()
+
+
+_transport: Optional[ISSTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> ISSTransport:
+    """Retourne le transport partagé par tout le processus"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = ISSTransport()
+    return _transport
@@ -1,5 +1,11 @@
 """Package traitement des données"""
 from .processors import DataProcessor
 from .validators import DataValidator
+from .board_snapshot import BoardSnapshot, get_board_snapshot
+from .bar_buffer import BarBuffer
+from .history_store import HistoryStore
+from .simulator import MarketPanel, simulate_panel
+from .source_race import RaceResult, race_sources
+from .screener import Screener, get_screener, parse_condition
 
-__all__ = ['DataProcessor', 'DataValidator']
\ No newline at end of file
+__all__ = ['DataProcessor', 'DataValidator', 'BoardSnapshot', 'get_board_snapshot', 'BarBuffer', 'HistoryStore', 'MarketPanel', 'simulate_panel', 'RaceResult', 'race_sources', 'Screener', 'get_screener', 'parse_condition']
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Tampon de barres OHLCV sur tableaux numpy préalloués
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class BarBuffer:
+    """
+    Barres OHLCV stockées colonne par colonne dans des tableaux extensibles
+
+    Les timestamps sont des entiers int64 (ns UTC, ou heure locale si tz est
+    None) ; les valeurs sont en float64 (NaN pour une valeur manquante).
+    La capacité double à chaque dépassement, l'ajout est donc amorti en O(1).
+    """
+
+    __slots__ = ('_timestamps', '_values', '_size', 'tz')
+
+    def __init__(self, capacity: int = 256, tz: Optional[str] = None):
+        capacity = max(1, capacity)
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._values: Dict[str, np.ndarray] = {name: np.empty(capacity, dtype=np.float64) for name in FIELDS}
+        self._size = 0
+        self.tz = tz
+
+    @classmethod
+    def from_arrays(cls, timestamps: np.ndarray, tz: Optional[str] = None, **columns: np.ndarray) -> 'BarBuffer':
+        """
+        Construit un tampon autour de tableaux existants (sans copie s'ils sont déjà typés)
+
+        Args:
+            timestamps: Timestamps int64 en ns
+            tz: Fuseau horaire des timestamps
+            **columns: Colonnes open, high, low, close, volume
+
+        Returns:
+            BarBuffer: Tampon plein (le prochain ajout réalloue)
+        """
+        buffer = cls.__new__(cls)
+        buffer._timestamps = np.asarray(timestamps, dtype=np.int64)
+        size = len(buffer._timestamps)
+        buffer._values = {}
+        for name in FIELDS:
+            values = columns.get(name)
+            if values is None:
+                values = np.full(size, np.nan)
+            buffer._values[name] = np.asarray(values, dtype=np.float64)
+            if len(buffer._values[name]) != size:
+                raise ValueError(f"Colonne '{name}' de longueur {len(buffer._values[name])} au lieu de {size}")
+        buffer._size = size
+        buffer.tz = tz
+        return buffer
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._timestamps)
+
+    def reserve(self, capacity: int):
+        """Agrandit les tableaux pour contenir au moins capacity barres"""
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, 2 * self.capacity)
+        timestamps = np.empty(capacity, dtype=np.int64)
+        timestamps[:self._size] = self._timestamps[:self._size]
+        self._timestamps = timestamps
+        for name, values in self._values.items():
+            grown = np.empty(capacity, dtype=np.float64)
+            grown[:self._size] = values[:self._size]
+            self._values[name] = grown
+
+    def append(self, timestamp, open: float, high: float, low: float, close: float, volume: float):
+        """Ajoute une barre"""
+        ts = pd.Timestamp(timestamp)
+        if ts.tzinfo is not None and self.tz is None and self._size == 0:
+            self.tz = str(ts.tz)
+        if self._size == self.capacity:
+            self.reserve(self._size + 1)
+        i = self._size
+        self._timestamps[i] = ts.as_unit('ns').value
+        self._values['open'][i] = open
+        self._values['high'][i] = high
+        self._values['low'][i] = low
+        self._values['close'][i] = close
+        self._values['volume'][i] = volume
+        self._size += 1
+
+    def extend(self, timestamps: np.ndarray, **columns: np.ndarray):
+        """Ajoute un bloc de barres (timestamps int64 en ns, colonnes manquantes à NaN)"""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        start, end = self._size, self._size + len(timestamps)
+        self.reserve(end)
+        self._timestamps[start:end] = timestamps
+        for name in FIELDS:
+            values = columns.get(name)
+            self._values[name][start:end] = np.nan if values is None else values
+        self._size = end
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Vue int64 des timestamps"""
+        return self._timestamps[:self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        """Vue d'une colonne (open, high, low, close ou volume)"""
+        return self._values[name][:self._size]
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """Timestamps sous forme de DatetimeIndex (sans copie hors fuseau horaire)"""
+        index = pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'), copy=False)
+        if self.tz:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        return index
+
+    def to_dataframe(self, copy: bool = True) -> pd.DataFrame:
+        """
+        DataFrame OHLCV des barres
+
+        Args:
+            copy: Si False, les colonnes sont des vues des tampons (sans copie) ; elles
+                sont alors en lecture seule pour un tampon chargé par memory-map
+
+        Returns:
+            pd.DataFrame: Colonnes open, high, low, close, volume indexées par date
+        """
+        return pd.DataFrame(
+            {name: self.column(name) for name in FIELDS},
+            index=self.index,
+            copy=copy
+        )
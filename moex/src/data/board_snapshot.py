@@ -0,0 +1,217 @@
+"""
+Instantané des cotations de tout un board MOEX en une seule requête
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..api.moex_client import MOEXClient
+from ..utils.revalidation import get_revalidator
+from ..utils.time_utils import get_cache_ttl
+
+logger = logging.getLogger(__name__)
+
+# Colonnes du bloc `securities` ajoutées à l'instantané
+SECURITIES_COLUMNS = ['SHORTNAME', 'PREVPRICE', 'LOTSIZE']
+
+# Reprise après un échec : backoff exponentiel de RETRY_DELAY à RETRY_MAX_DELAY secondes
+RETRY_DELAY = 5.0
+RETRY_MAX_DELAY = 300.0
+
+
+class BoardSnapshot:
+    """
+    Cotations de toutes les actions d'un board, indexées par SECID
+
+    Avec stale_while_revalidate, un instantané périmé est servi tel quel
+    pendant qu'il est rechargé en arrière-plan : seul le tout premier
+    chargement attend l'ISS.
+
+    Sans intervalle explicite, l'intervalle suit la phase du marché : court
+    en séance, jusqu'à la prochaine ouverture quand le marché est fermé.
+    Cet intervalle ne s'applique qu'après un chargement réussi : un échec
+    est retenté après un délai court, qui double à chaque échec consécutif.
+    """
+
+    def __init__(
+        self,
+        board: str = 'TQBR',
+        refresh_interval: Optional[float] = None,
+        client: Optional[MOEXClient] = None,
+        stale_while_revalidate: bool = False
+    ):
+        self.board = board
+        self.refresh_interval = refresh_interval
+        self.client = client or MOEXClient()
+        self.stale_while_revalidate = stale_while_revalidate
+        self.updated_at: Optional[datetime] = None
+
+        self._lock = threading.Lock()
+        self._fetched_at: Optional[float] = None
+        self._refresh_at: Optional[float] = None
+        self._failures = 0
+        self._frame = pd.DataFrame()
+        # (positions par SECID, colonnes) remplacés ensemble à chaque rechargement
+        self._lookup: Tuple[Dict[str, int], Dict[str, np.ndarray]] = ({}, {})
+
+    def current_interval(self) -> float:
+        """Intervalle de rafraîchissement applicable à un chargement effectué maintenant"""
+        if self.refresh_interval is not None:
+            return self.refresh_interval
+        return get_cache_ttl('market_data')
+
+    def _retry_delay(self) -> float:
+        """Délai avant une nouvelle tentative, selon le nombre d'échecs consécutifs"""
+        delay = min(RETRY_MAX_DELAY, RETRY_DELAY * 2 ** max(0, self._failures - 1))
+        return min(delay, self.current_interval())
+
+    @property
+    def age(self) -> float:
+        """Âge de l'instantané en secondes (inf si jamais chargé)"""
+        if self._fetched_at is None:
+            return float('inf')
+        return time.monotonic() - self._fetched_at
+
+    def _build(self, securities: pd.DataFrame, market: pd.DataFrame) -> pd.DataFrame:
+        """Assemble le DataFrame columnaire indexé par SECID"""
+        if market.empty or 'SECID' not in market.columns:
+            return pd.DataFrame()
+
+        frame = market.drop_duplicates('SECID').set_index('SECID')
+        if not securities.empty and 'SECID' in securities.columns:
+            extra = [c for c in SECURITIES_COLUMNS if c in securities.columns and c not in frame.columns]
+            if extra:
+                frame = frame.join(securities.drop_duplicates('SECID').set_index('SECID')[extra])
+        return frame
+
+    def refresh(self, force: bool = False) -> pd.DataFrame:
+        """
+        Recharge l'instantané s'il est plus vieux que l'intervalle de rafraîchissement
+
+        Args:
+            force: Recharger immédiatement, même si l'instantané est récent
+
+        Returns:
+            pd.DataFrame: Instantané courant (le précédent est conservé en cas d'erreur,
+                et pendant un rechargement en arrière-plan)
+        """
+        with self._lock:
+            # Une tentative récente (même échouée) n'est pas renouvelée avant l'intervalle
+            if not force and self._refresh_at is not None and time.monotonic() < self._refresh_at:
+                return self._frame
+
+            attempted_at = time.monotonic()
+            # Pendant la tentative, pas de nouvel essai avant le délai de reprise ; l'intervalle
+            # de la phase du marché n'est appliqué qu'une fois le chargement réussi
+            self._refresh_at = attempted_at + self._retry_delay()
+            if self.stale_while_revalidate and not force and self._fetched_at is not None:
+                get_revalidator().submit(('board', self.board, id(self)), self._reload, attempted_at)
+                return self._frame
+
+            return self._load(attempted_at)
+
+    def _reload(self, attempted_at: float):
+        """Rechargement en arrière-plan (l'instantané courant reste lisible pendant la requête)"""
+        fetched = self._fetch()
+        with self._lock:
+            self._settle(fetched, attempted_at)
+
+    def _load(self, attempted_at: float) -> pd.DataFrame:
+        self._settle(self._fetch(), attempted_at)
+        return self._frame
+
+    def _settle(self, fetched: Optional[pd.DataFrame], attempted_at: float):
+        """Installe le résultat d'une tentative et planifie la suivante (appelé sous le verrou)"""
+        if fetched is None:
+            self._failures += 1
+            self._refresh_at = time.monotonic() + self._retry_delay()
+            return
+        self._failures = 0
+        self._install(fetched, attempted_at)
+        self._refresh_at = attempted_at + self.current_interval()
+
+    def _fetch(self) -> Optional[pd.DataFrame]:
+        try:
+            securities, market = self.client.get_board(self.board, deadline=10)
+        except Exception as e:
+            logger.warning(f"Instantané {self.board} indisponible: {e}")
+            return None
+        return self._build(securities, market)
+
+    def _install(self, frame: pd.DataFrame, fetched_at: float):
+        self._frame = frame
+        self._lookup = (
+            {secid: i for i, secid in enumerate(frame.index)},
+            {col: frame[col].to_numpy() for col in frame.columns}
+        )
+        self._fetched_at = fetched_at
+        self.updated_at = datetime.now()
+
+    @property
+    def revalidating(self) -> bool:
+        """Indique si un rechargement en arrière-plan est en cours"""
+        return get_revalidator().is_pending(('board', self.board, id(self)))
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Instantané à jour"""
+        return self.refresh()
+
+    def __contains__(self, secid: str) -> bool:
+        self.refresh()
+        return secid in self._lookup[0]
+
+    def get_value(self, secid: str, column: str):
+        """Valeur d'une colonne pour un SECID (None si absente)"""
+        self.refresh()
+        positions, columns = self._lookup
+        pos = positions.get(secid)
+        values = columns.get(column)
+        if pos is None or values is None:
+            return None
+        value = values[pos]
+        return None if pd.isna(value) else value
+
+    def get_price(self, secid: str) -> Optional[float]:
+        """Dernier prix (LAST) d'un SECID"""
+        value = self.get_value(secid, 'LAST')
+        return float(value) if value is not None else None
+
+    def get_prices(self, secids: Iterable[str]) -> Dict[str, float]:
+        """Derniers prix connus pour une liste de SECID"""
+        prices = {}
+        for secid in secids:
+            price = self.get_price(secid)
+            if price is not None:
+                prices[secid] = price
+        return prices
+
+    def get_row(self, secid: str) -> Optional[dict]:
+        """Toutes les colonnes d'un SECID sous forme de dictionnaire"""
+        self.refresh()
+        positions, columns = self._lookup
+        pos = positions.get(secid)
+        if pos is None:
+            return None
+        row = {}
+        for col, values in columns.items():
+            value = values[pos]
+            row[col] = None if pd.isna(value) else value
+        return row
+
+
+_snapshots: Dict[str, BoardSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_board_snapshot(board: str = 'TQBR') -> BoardSnapshot:
+    """Retourne l'instantané partagé par tout le processus pour un board"""
+    with _snapshots_lock:
+        if board not in _snapshots:
+            _snapshots[board] = BoardSnapshot(board, stale_while_revalidate=True)
+        return _snapshots[board]
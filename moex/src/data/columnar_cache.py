@@ -0,0 +1,171 @@
+"""
+Format de cache binaire columnaire (colonnes typées, chargement par memory-map)
+
+Disposition d'un fichier :
+    MAGIC (8 octets) | taille de l'en-tête (uint32 LE) | en-tête JSON | colonnes
+
+Chaque colonne est un tableau numpy contigu aligné sur 64 octets ; l'en-tête
+décrit son nom, son dtype, son décalage et sa longueur.
+"""
+import json
+import os
+import struct
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'MOEXCOL1'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Types acceptés : entiers, flottants, booléens et dates (pas d'objets Python)
+ALLOWED_KINDS = {'i', 'u', 'f', 'b', 'M'}
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_columns(path: str, columns: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None):
+    """
+    Écrit des colonnes typées dans un fichier (écriture atomique)
+
+    Args:
+        path: Chemin du fichier
+        columns: Colonnes numpy 1-D de même longueur
+        meta: Métadonnées sérialisables en JSON
+    """
+    arrays = {name: np.ascontiguousarray(values) for name, values in columns.items()}
+    lengths = {len(values) for values in arrays.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Colonnes de longueurs différentes: {lengths}")
+    for name, values in arrays.items():
+        if values.ndim != 1 or values.dtype.kind not in ALLOWED_KINDS:
+            raise ValueError(f"Colonne non supportée: {name} ({values.dtype}, ndim={values.ndim})")
+
+    # Les décalages dépendent de la taille de l'en-tête qui les contient : itérer jusqu'à stabilité
+    descriptors = [
+        {'name': name, 'dtype': values.dtype.str, 'length': len(values), 'offset': 0}
+        for name, values in arrays.items()
+    ]
+    header = {'version': FORMAT_VERSION, 'meta': meta or {}, 'columns': descriptors}
+    while True:
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        offsets = []
+        offset = _align(len(MAGIC) + 4 + len(header_bytes))
+        for values in arrays.values():
+            offsets.append(offset)
+            offset = _align(offset + values.nbytes)
+        if offsets == [d['offset'] for d in descriptors]:
+            break
+        for descriptor, value in zip(descriptors, offsets):
+            descriptor['offset'] = value
+
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header_bytes)))
+            f.write(header_bytes)
+            for descriptor, values in zip(descriptors, arrays.values()):
+                f.seek(descriptor['offset'])
+                f.write(values.tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_header(f, path: str) -> Dict[str, Any]:
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"Format de cache inconnu: {path}")
+    (header_size,) = struct.unpack('<I', f.read(4))
+    header = json.loads(f.read(header_size).decode('utf-8'))
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Version de cache non supportée: {header.get('version')}")
+    return header
+
+
+def read_last(path: str, name: str) -> Tuple[Optional[Any], Dict[str, Any]]:
+    """
+    Lit la dernière valeur d'une colonne et les métadonnées, sans projeter le fichier
+
+    Seuls l'en-tête et la valeur demandée sont lus.
+
+    Args:
+        path: Chemin du fichier
+        name: Nom de la colonne
+
+    Returns:
+        Tuple[Optional[Any], Dict[str, Any]]: (dernière valeur ou None si la colonne
+        est vide ou absente, métadonnées)
+
+    Raises:
+        ValueError: Si le fichier n'est pas au format attendu
+    """
+    with open(path, 'rb') as f:
+        header = _read_header(f, path)
+        descriptor = next((d for d in header['columns'] if d['name'] == name), None)
+        if descriptor is None or descriptor['length'] == 0:
+            return None, header.get('meta', {})
+        dtype = np.dtype(descriptor['dtype'])
+        f.seek(descriptor['offset'] + (descriptor['length'] - 1) * dtype.itemsize)
+        value = np.frombuffer(f.read(dtype.itemsize), dtype=dtype)
+    if len(value) != 1:
+        raise ValueError(f"Fichier tronqué: {path}")
+    return value[0], header.get('meta', {})
+
+
+def read_columns(path: str, mmap: bool = True) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Lit un fichier columnaire
+
+    Args:
+        path: Chemin du fichier
+        mmap: Projeter les colonnes en mémoire (lecture seule) au lieu de les copier
+
+    Returns:
+        Tuple[Dict[str, np.ndarray], Dict[str, Any]]: (colonnes, métadonnées)
+
+    Raises:
+        ValueError: Si le fichier n'est pas au format attendu
+    """
+    with open(path, 'rb') as f:
+        header = _read_header(f, path)
+
+    columns = {}
+    for descriptor in header['columns']:
+        dtype = np.dtype(descriptor['dtype'])
+        length = descriptor['length']
+        if length == 0:
+            columns[descriptor['name']] = np.empty(0, dtype=dtype)
+        elif mmap:
+            columns[descriptor['name']] = np.memmap(
+                path, dtype=dtype, mode='r', offset=descriptor['offset'], shape=(length,)
+            )
+        else:
+            with open(path, 'rb') as f:
+                f.seek(descriptor['offset'])
+                columns[descriptor['name']] = np.fromfile(f, dtype=dtype, count=length)
+    return columns, header.get('meta', {})
+
+
+def timestamps_to_index(timestamps: np.ndarray, tz: Optional[str] = None) -> pd.DatetimeIndex:
+    """Convertit des timestamps int64 (ns UTC) en DatetimeIndex sans objet Python"""
+    index = pd.DatetimeIndex(np.asarray(timestamps, dtype=np.int64).view('datetime64[ns]'))
+    if tz:
+        index = index.tz_localize('UTC').tz_convert(tz)
+    return index
+
+
+def index_to_timestamps(dates) -> Tuple[np.ndarray, Optional[str]]:
+    """Convertit des dates en timestamps int64 (ns UTC) et nom du fuseau éventuel"""
+    index = pd.DatetimeIndex(dates)
+    tz = str(index.tz) if index.tz is not None else None
+    if tz:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.as_unit('ns').asi8, tz
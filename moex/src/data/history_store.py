@@ -0,0 +1,189 @@
+"""
+Historique persistant par symbole, complété de façon incrémentale
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils.cache_maintenance import CacheDirectory
+from ..utils.constants import MOSCOW_TZ
+from .columnar_cache import read_columns, read_last, timestamps_to_index, write_columns
+
+Columns = Dict[str, np.ndarray]
+
+# Verrous par fichier, partagés par toutes les instances du processus : un
+# HistoryStore est recréé à chaque exécution du script Streamlit, alors que les
+# rafraîchissements en arrière-plan des exécutions précédentes écrivent encore
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+class HistoryTimezoneError(ValueError):
+    """Barres dont le fuseau horaire diffère de celui de l'historique stocké"""
+
+
+def market_timestamps(timestamps: np.ndarray, tz: Optional[str] = None, daily: bool = True) -> np.ndarray:
+    """
+    Convertit des timestamps à la convention de stockage : heure de Moscou naïve
+
+    Args:
+        timestamps: Timestamps int64 (ns UTC si tz, heure locale sinon)
+        tz: Fuseau horaire des timestamps
+        daily: Ramener chaque barre à sa date de séance (minuit)
+
+    Returns:
+        np.ndarray: Timestamps int64 en ns, heure de Moscou sans fuseau
+    """
+    index = timestamps_to_index(np.asarray(timestamps, dtype=np.int64), tz)
+    if index.tz is not None:
+        index = index.tz_convert(MOSCOW_TZ).tz_localize(None)
+    if daily:
+        index = index.normalize()
+    return index.as_unit('ns').asi8
+
+
+class HistoryStore:
+    """
+    Stocke une série OHLCV par symbole (un fichier columnaire par symbole)
+
+    Les nouvelles barres sont fusionnées à partir de leur premier timestamp :
+    les barres stockées à partir de ce point (typiquement la dernière barre,
+    encore en formation) sont remplacées, les plus anciennes sont conservées.
+    Toutes les sources doivent être ramenées à la même convention
+    (market_timestamps) : une fusion dans un autre fuseau est refusée.
+    """
+
+    def __init__(self, root: str, interval: str = '1d'):
+        self.root = root
+        self.interval = interval
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol}_{self.interval}.col")
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        path = os.path.abspath(self._path(symbol))
+        with _path_locks_guard:
+            return _path_locks.setdefault(path, threading.Lock())
+
+    def load(self, symbol: str) -> Optional[Tuple[Columns, Dict[str, Any]]]:
+        """Charge les colonnes et métadonnées d'un symbole (None si absent ou illisible)"""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            return read_columns(path)
+        except (OSError, ValueError):
+            return None
+
+    def _tail(self, symbol: str) -> Optional[Tuple[Optional[int], Dict[str, Any]]]:
+        """Dernier timestamp et métadonnées, lus sans charger les colonnes (None si absent ou illisible)"""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            return read_last(path, 'timestamp')
+        except (OSError, ValueError):
+            return None
+
+    def last_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Timestamp de la dernière barre stockée"""
+        tail = self._tail(symbol)
+        if tail is None or tail[0] is None:
+            return None
+        last, meta = tail
+        return timestamps_to_index(np.array([last], dtype=np.int64), meta.get('tz'))[0]
+
+    def age(self, symbol: str) -> float:
+        """Secondes écoulées depuis la dernière synchronisation (inf si jamais synchronisé)"""
+        tail = self._tail(symbol)
+        if tail is None or 'synced_at' not in tail[1]:
+            return float('inf')
+        return time.time() - tail[1]['synced_at']
+
+    def merge(self, symbol: str, new_columns: Columns, meta: Optional[Dict[str, Any]] = None) -> Columns:
+        """
+        Fusionne de nouvelles barres dans l'historique et le réécrit
+
+        Args:
+            symbol: Symbole
+            new_columns: Colonnes des nouvelles barres (dont 'timestamp' en ns UTC, ou
+                heure locale si meta ne précise pas de fuseau)
+            meta: Métadonnées à mettre à jour (dont 'tz', le fuseau des nouvelles barres)
+
+        Returns:
+            Columns: Historique complet après fusion
+
+        Raises:
+            HistoryTimezoneError: Si le fuseau des nouvelles barres diffère de celui stocké
+        """
+        with self._lock(symbol):
+            stored = self.load(symbol)
+            old_columns, old_meta = stored if stored is not None else ({}, {})
+
+            tz = (meta or {}).get('tz')
+            if old_columns and len(old_columns['timestamp']) and old_meta.get('tz') != tz:
+                raise HistoryTimezoneError(
+                    f"{symbol}: barres en fuseau {tz!r}, historique stocké en {old_meta.get('tz')!r}"
+                )
+
+            order = np.argsort(new_columns['timestamp'], kind='stable')
+            new_columns = {name: np.asarray(values)[order] for name, values in new_columns.items()}
+
+            if old_columns and len(new_columns['timestamp']):
+                keep = np.searchsorted(old_columns['timestamp'], new_columns['timestamp'][0], side='left')
+                merged = {
+                    name: np.concatenate([old_columns[name][:keep], new_columns[name]])
+                    for name in old_columns
+                }
+            elif old_columns:
+                merged = {name: np.array(values) for name, values in old_columns.items()}
+            else:
+                merged = new_columns
+
+            merged_meta = dict(old_meta)
+            merged_meta.update(meta or {})
+            merged_meta['synced_at'] = time.time()
+            write_columns(self._path(symbol), merged, merged_meta)
+            return merged
+
+    def normalize(self, symbol: str):
+        """
+        Réécrit un historique stocké dans un autre fuseau à la convention market_timestamps
+
+        Les barres d'une même séance enregistrées sous deux timestamps différents
+        (une par source) sont dédoublonnées : la dernière écrite est conservée.
+        """
+        with self._lock(symbol):
+            stored = self.load(symbol)
+            if stored is None or stored[1].get('tz') is None:
+                return
+            columns, meta = stored
+            timestamps = market_timestamps(columns['timestamp'], meta['tz'], daily=self.interval == '1d')
+            order = np.argsort(timestamps, kind='stable')
+            timestamps = timestamps[order]
+            unique = np.append(timestamps[1:] != timestamps[:-1], True)
+            rows = order[unique]
+            normalized = {name: np.array(values)[rows] for name, values in columns.items()}
+            normalized['timestamp'] = timestamps[unique]
+            write_columns(self._path(symbol), normalized, dict(meta, tz=None))
+
+    def window(self, symbol: str, since: Optional[pd.Timestamp] = None) -> Optional[Tuple[Columns, Dict[str, Any]]]:
+        """Barres à partir de `since` (toutes si None)"""
+        stored = self.load(symbol)
+        if stored is None:
+            return None
+        # Lecture effective : rafraîchit l'ordre LRU du balayeur de cache
+        CacheDirectory.touch(self._path(symbol))
+        columns, meta = stored
+        if since is not None:
+            since_ns = pd.Timestamp(since)
+            if since_ns.tzinfo is not None:
+                since_ns = since_ns.tz_convert('UTC').tz_localize(None)
+            start = np.searchsorted(columns['timestamp'], since_ns.as_unit('ns').value, side='left')
+            columns = {name: values[start:] for name, values in columns.items()}
+        return columns, meta
@@ -7,6 +7,8 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 import logging
 
+from ..indicators import with_indicators
+
 logger = logging.getLogger(__name__)
 
 class DataProcessor:
@@ -115,38 +117,8 @@ class DataProcessor:
         if df.empty:
             return df
         
-        result = df.copy()
-        
-        # Moyennes mobiles
-        if 'Close' in result.columns:
-            result['MA20'] = result['Close'].rolling(window=20).mean()
-            result['MA50'] = result['Close'].rolling(window=50).mean()
-            result['MA200'] = result['Close'].rolling(window=200).mean()
-        
-        # RSI
-        if 'Close' in result.columns:
-            delta = result['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            result['RSI'] = 100 - (100 / (1 + rs))
-        
-        # Bollinger Bands
-        if 'Close' in result.columns:
-            result['BB_Middle'] = result['Close'].rolling(window=20).mean()
-            bb_std = result['Close'].rolling(window=20).std()
-            result['BB_Upper'] = result['BB_Middle'] + (bb_std * 2)
-            result['BB_Lower'] = result['BB_Middle'] - (bb_std * 2)
-        
-        # Volume moyen
-        if 'Volume' in result.columns:
-            result['Volume_MA20'] = result['Volume'].rolling(window=20).mean()
-        
-        # Volatilité
-        if 'Close' in result.columns:
-            result['Volatility'] = result['Close'].pct_change().rolling(window=20).std() * np.sqrt(252)
-        
-        return result
+        # MA20 et BB_Middle partagent la même moyenne mobile, calculée une fois
+        return with_indicators(df, ['ma', 'rsi', 'bollinger', 'volume_ma', 'volatility'])
     
     @staticmethod
     def calculate_returns(df: pd.DataFrame) -> pd.DataFrame:
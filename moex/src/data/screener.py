@@ -0,0 +1,306 @@
+"""
+Screener technique sur tout un board : filtres déclaratifs et classement top-k
+"""
+import logging
+import operator
+import re
+import threading
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..api.async_client import fetch_candles_batch
+from ..indicators import compute_panel, latest_values
+from ..utils.cache_manager import cache
+from ..utils.singleflight import SingleFlight
+from ..utils.constants import MOEX_OPEN_TIME
+from ..utils.time_utils import get_moscow_time, is_trading_day
+from .board_snapshot import BoardSnapshot, get_board_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Historique journalier chargé pour les indicateurs (séances)
+HISTORY_DAYS = 120
+
+# Les bougies closes ne changent plus : l'historique est conservé toute la journée
+# (la clé porte la date de séance de Moscou)
+HISTORY_TTL = 24 * 3600
+
+SCREEN_INDICATORS = ('rsi', 'macd', 'bollinger', ('ma', {'windows': [20, 50]}), 'volume_ma', 'volume_ratio', 'volatility')
+
+# Résultats conservés par instantané (requêtes distinctes)
+MAX_CACHED_SCREENS = 64
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+_OPERAND = r'([A-Za-z_]\w*|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'
+_CONDITION = re.compile(rf'^\s*{_OPERAND}\s*(<=|>=|==|!=|<|>)\s*{_OPERAND}\s*$')
+
+HistoryLoader = Callable[[Sequence[str]], Mapping[str, pd.DataFrame]]
+
+
+class Condition(NamedTuple):
+    """Comparaison entre deux colonnes, ou une colonne et une constante"""
+    left: Union[str, float]
+    op: str
+    right: Union[str, float]
+
+    def __str__(self) -> str:
+        return f"{self.left} {self.op} {self.right}"
+
+
+def _operand(token: str) -> Union[str, float]:
+    return token if re.match(r'[A-Za-z_]', token) else float(token)
+
+
+def parse_condition(text: Union[str, Condition]) -> Condition:
+    """
+    Analyse un filtre de la forme « RSI < 30 » ou « close > BB_Upper »
+
+    Seuls des noms de colonnes, des nombres et les opérateurs <, <=, >, >=,
+    ==, != sont acceptés : aucune expression n'est évaluée.
+
+    Raises:
+        ValueError: Si le filtre est mal formé
+    """
+    if isinstance(text, Condition):
+        return text
+    match = _CONDITION.match(text)
+    if match is None:
+        raise ValueError(f"Filtre invalide: {text!r} (attendu: <colonne> <opérateur> <colonne ou nombre>)")
+    left, op, right = match.groups()
+    return Condition(_operand(left), op, _operand(right))
+
+
+def top_k(values: np.ndarray, k: int, ascending: bool = False) -> np.ndarray:
+    """
+    Positions des k meilleures valeurs, triées (NaN exclus)
+
+    Sélection partielle (argpartition) puis tri des seules k retenues :
+    O(n + k log k) au lieu d'un tri complet.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    keys = values[valid] if ascending else -values[valid]
+    if k <= 0 or len(keys) == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(keys):
+        selected = np.argpartition(keys, k - 1)[:k]
+    else:
+        selected = np.arange(len(keys))
+    return valid[selected[np.argsort(keys[selected], kind='stable')]]
+
+
+@cache(ttl=HISTORY_TTL, cacheable=lambda history: not history[1])
+def _closed_history(
+    secids: Tuple[str, ...], days: int, session: date
+) -> Tuple[Dict[str, pd.DataFrame], Tuple[str, ...]]:
+    """Bougies journalières antérieures à `session` et SECID en erreur (non mis en cache s'il y en a)"""
+    start = (session - timedelta(days=int(days * 1.5) + 7)).strftime('%Y-%m-%d')
+    till = (session - timedelta(days=1)).strftime('%Y-%m-%d')
+    errors = {}
+    history = fetch_candles_batch(list(secids), errors=errors, interval=24, from_date=start, to_date=till)
+    if errors:
+        logger.warning(f"Historique journalier indisponible pour {len(errors)} SECID: {', '.join(list(errors)[:10])}")
+    return history, tuple(errors)
+
+
+def load_daily_history(secids: Sequence[str], days: int = HISTORY_DAYS) -> Dict[str, pd.DataFrame]:
+    """
+    Bougies journalières closes des derniers `days` jours de séance, pour chaque SECID
+
+    Seules les séances antérieures à la date de Moscou sont chargées : le
+    résultat reste valable toute la journée. Les requêtes partent en parallèle
+    sous la limite de concurrence et le budget de débit du processus. Un SECID
+    sans bougies (valeur suspendue ou nouvelle) n'empêche pas la mise en cache ;
+    seule une erreur de requête l'empêche.
+    """
+    history, _ = _closed_history(tuple(secids), int(days), get_moscow_time().date())
+    return history
+
+
+class _Screens(NamedTuple):
+    frame: pd.DataFrame
+    table: pd.DataFrame
+    results: Dict[tuple, pd.DataFrame]
+
+
+class Screener:
+    """
+    Évalue des filtres techniques sur toutes les actions d'un board
+
+    Les indicateurs sont calculés en un seul appel sur le panel des
+    historiques journaliers, complété par la cotation courante de
+    l'instantané (dernier prix et volume du jour). La table des indicateurs
+    et les résultats sont conservés tant que l'instantané ne change pas.
+    """
+
+    def __init__(
+        self,
+        snapshot: Optional[BoardSnapshot] = None,
+        history_loader: Optional[HistoryLoader] = None,
+        indicators: Iterable = SCREEN_INDICATORS
+    ):
+        self.snapshot = snapshot or get_board_snapshot()
+        self.history_loader = history_loader or load_daily_history
+        self.indicators = list(indicators)
+        self._lock = threading.Lock()
+        self._screens: Optional[_Screens] = None
+        self._flights = SingleFlight()
+
+    def _panel(self, frame: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        Clôtures et volumes (dates x SECID)
+
+        Pendant un jour de séance ouverte (date de Moscou), la dernière ligne est
+        la cotation courante ; sinon (weekend, jour férié, avant l'ouverture)
+        l'historique clos est utilisé tel quel, sans barre fictive.
+        """
+        secids = list(frame.index)
+        try:
+            history = self.history_loader(secids)
+        except Exception as e:
+            logger.warning(f"Historique du screener indisponible: {e}")
+            history = {}
+
+        fields = {}
+        now = get_moscow_time()
+        today = pd.Timestamp(now.date())
+        live_bar = is_trading_day(now.date()) and now.time() >= MOEX_OPEN_TIME
+        for field, current in (('Close', 'LAST'), ('Volume', 'VOLTODAY')):
+            columns = {
+                secid: candles[field] for secid, candles in history.items()
+                if isinstance(candles, pd.DataFrame) and field in candles.columns and secid in frame.index
+            }
+            wide = pd.concat(columns, axis=1) if columns else pd.DataFrame(index=pd.DatetimeIndex([]))
+            wide.index = pd.DatetimeIndex(wide.index).normalize()
+            wide = wide[~wide.index.duplicated(keep='last')].reindex(columns=secids)
+            # La bougie du jour (en formation) est remplacée par l'instantané
+            wide = wide[wide.index < today]
+            if live_bar:
+                live = pd.to_numeric(frame[current], errors='coerce') if current in frame.columns else np.nan
+                wide.loc[today] = live
+            fields[field.lower()] = wide.astype(np.float64)
+        return fields
+
+    def _table(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Une ligne par SECID : champs de l'instantané et dernières valeurs des indicateurs"""
+        table = pd.DataFrame(index=frame.index)
+        if 'SHORTNAME' in frame.columns:
+            table['name'] = frame['SHORTNAME']
+        if frame.empty:
+            return table
+
+        fields = self._panel(frame)
+        for field in ('close', 'volume'):
+            wide = fields[field]
+            table[field] = wide.iloc[-1] if len(wide) else np.nan
+        if 'PREVPRICE' in frame.columns:
+            previous = pd.to_numeric(frame['PREVPRICE'], errors='coerce')
+            table['change'] = (table['close'] / previous - 1) * 100
+        return table.join(latest_values(compute_panel(fields, self.indicators)))
+
+    def table(self) -> pd.DataFrame:
+        """Table des indicateurs de l'instantané courant (recalculée quand il change)"""
+        return self._current().table
+
+    def _current(self) -> _Screens:
+        frame = self.snapshot.frame
+        with self._lock:
+            screens = self._screens
+        if screens is not None and screens.frame is frame:
+            return screens
+        # La table (historique réseau compris) est calculée hors du verrou ; les appels
+        # concurrents pour un même instantané attendent le calcul en cours
+        return self._flights.do(id(frame), self._build, frame)
+
+    def _build(self, frame: pd.DataFrame) -> _Screens:
+        with self._lock:
+            if self._screens is not None and self._screens.frame is frame:
+                return self._screens
+        screens = _Screens(frame, self._table(frame), {})
+        with self._lock:
+            self._screens = screens
+        return screens
+
+    @staticmethod
+    def _column(table: pd.DataFrame, name: str) -> np.ndarray:
+        columns = {str(column).lower(): column for column in table.columns}
+        if name.lower() not in columns:
+            raise ValueError(f"Colonne inconnue: {name} (disponibles: {', '.join(map(str, table.columns))})")
+        return pd.to_numeric(table[columns[name.lower()]], errors='coerce').to_numpy(dtype=np.float64)
+
+    def _operand(self, table: pd.DataFrame, operand: Union[str, float]):
+        return self._column(table, operand) if isinstance(operand, str) else operand
+
+    def screen(
+        self,
+        conditions: Iterable[Union[str, Condition]] = (),
+        sort_by: str = 'RSI',
+        k: int = 20,
+        ascending: bool = False
+    ) -> pd.DataFrame:
+        """
+        Actions vérifiant tous les filtres, classées par `sort_by`
+
+        Args:
+            conditions: Filtres (« RSI < 30 », « Volume_Ratio > 2 »...) ; une valeur
+                manquante ne vérifie aucun filtre
+            sort_by: Colonne de classement
+            k: Nombre de résultats
+            ascending: Classement croissant (les plus faibles d'abord)
+
+        Returns:
+            pd.DataFrame: Au plus k lignes de la table, dans l'ordre du classement
+
+        Raises:
+            ValueError: Filtre mal formé ou colonne inconnue
+        """
+        conditions = tuple(parse_condition(condition) for condition in conditions)
+        key = (conditions, sort_by.lower(), int(k), bool(ascending))
+        screens = self._current()
+        with self._lock:
+            cached = screens.results.get(key)
+        if cached is not None:
+            return cached
+
+        table = screens.table
+        if table.empty:
+            # Instantané indisponible : aucune action à filtrer
+            return table
+        mask = np.ones(len(table), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            for condition in conditions:
+                left = self._operand(table, condition.left)
+                right = self._operand(table, condition.right)
+                mask &= OPERATORS[condition.op](left, right)
+
+        keys = np.where(mask, self._column(table, sort_by), np.nan)
+        result = table.iloc[top_k(keys, k, ascending)]
+
+        with self._lock:
+            if len(screens.results) >= MAX_CACHED_SCREENS:
+                screens.results.clear()
+            screens.results[key] = result
+        return result
+
+
+_screeners: Dict[str, Screener] = {}
+_screeners_lock = threading.Lock()
+
+
+def get_screener(board: str = 'TQBR') -> Screener:
+    """Retourne le screener partagé par tout le processus pour un board"""
+    with _screeners_lock:
+        if board not in _screeners:
+            _screeners[board] = Screener(get_board_snapshot(board))
+        return _screeners[board]
@@ -0,0 +1,191 @@
+"""
+Générateur de marché synthétique (mouvement brownien géométrique multi-symboles)
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..utils.constants import MOEX_CLOSE_TIME, MOEX_OPEN_TIME, MOSCOW_TZ, RUSSIAN_HOLIDAYS_2024
+from .bar_buffer import BarBuffer
+from .columnar_cache import index_to_timestamps, timestamps_to_index
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Paramètres annualisés par défaut
+DEFAULT_DRIFT = 0.05
+DEFAULT_VOLATILITY = 0.30
+DEFAULT_VOLUME = 1_000_000
+
+
+@dataclass
+class MarketPanel:
+    """Panel OHLCV de N symboles sur T barres communes (tableaux (N, T))"""
+    symbols: List[str]
+    timestamps: np.ndarray
+    tz: Optional[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return timestamps_to_index(self.timestamps, self.tz)
+
+    def _row(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def bars(self, symbol: str) -> BarBuffer:
+        """Barres d'un symbole (vues sur les lignes du panel, sans copie)"""
+        i = self._row(symbol)
+        return BarBuffer.from_arrays(
+            self.timestamps, self.tz,
+            open=self.open[i], high=self.high[i], low=self.low[i], close=self.close[i], volume=self.volume[i]
+        )
+
+    def to_dataframe(self, symbol: str) -> pd.DataFrame:
+        """DataFrame OHLCV d'un symbole (vues sur le panel, sans copie)"""
+        return self.bars(symbol).to_dataframe(copy=False)
+
+
+def trading_timestamps(
+    periods: int,
+    end: Optional[datetime] = None,
+    freq: str = 'D',
+    holidays: Sequence[str] = RUSSIAN_HOLIDAYS_2024
+) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    Horodatages des `periods` dernières barres de séance jusqu'à `end`
+
+    Args:
+        periods: Nombre de barres
+        end: Dernière date (maintenant par défaut)
+        freq: 'D' pour des barres journalières, sinon fréquence intraday pandas (ex: '1min', '10min')
+        holidays: Jours fériés exclus
+
+    Returns:
+        Tuple[np.ndarray, Optional[str]]: (timestamps int64 en ns, fuseau horaire ou None)
+    """
+    end = pd.Timestamp(end or datetime.now())
+    days = pd.offsets.CustomBusinessDay(holidays=list(holidays))
+
+    if freq == 'D':
+        dates = pd.date_range(end=end.normalize(), periods=periods, freq=days)
+        return index_to_timestamps(dates)
+
+    # Barres intraday pendant la séance principale, heure de Moscou
+    step = pd.Timedelta(freq)
+    session = pd.Timedelta(hours=MOEX_CLOSE_TIME.hour - MOEX_OPEN_TIME.hour,
+                           minutes=MOEX_CLOSE_TIME.minute - MOEX_OPEN_TIME.minute)
+    per_day = max(1, int(session // step))
+    n_days = -(-periods // per_day)
+    sessions = pd.date_range(end=end.normalize(), periods=n_days, freq=days)
+    open_ns = pd.Timedelta(hours=MOEX_OPEN_TIME.hour, minutes=MOEX_OPEN_TIME.minute).value
+    offsets = open_ns + step.value * np.arange(per_day, dtype=np.int64)
+    local = (sessions.as_unit('ns').asi8[:, None] + offsets[None, :]).ravel()[-periods:]
+    index = pd.DatetimeIndex(local.view('datetime64[ns]')).tz_localize(MOSCOW_TZ)
+    return index_to_timestamps(index)
+
+
+def _correlated_normals(rng: np.random.Generator, n: int, t: int, correlation) -> np.ndarray:
+    """Chocs normaux (n, t) corrélés entre symboles"""
+    if np.ndim(correlation) == 0:
+        # Modèle à un facteur : évite la matrice (n, n) pour les grands univers
+        rho = float(correlation)
+        z = rng.standard_normal((n, t))
+        if rho:
+            z *= np.sqrt(1 - rho)
+            z += np.sqrt(rho) * rng.standard_normal(t)
+        return z
+
+    chol = np.linalg.cholesky(np.asarray(correlation, dtype=np.float64))
+    return chol @ rng.standard_normal((n, t))
+
+
+def simulate_panel(
+    symbols: Union[int, Sequence[str]],
+    periods: int,
+    start_prices: Union[float, Sequence[float], Dict[str, float]] = 100.0,
+    drift: Union[float, Sequence[float]] = DEFAULT_DRIFT,
+    volatility: Union[float, Sequence[float]] = DEFAULT_VOLATILITY,
+    correlation=0.3,
+    volume: Union[float, Sequence[float]] = DEFAULT_VOLUME,
+    freq: str = 'D',
+    end: Optional[datetime] = None,
+    seed: Optional[int] = None
+) -> MarketPanel:
+    """
+    Génère un panel OHLCV synthétique, vectorisé sur tous les symboles et toutes les barres
+
+    Args:
+        symbols: Liste de symboles ou nombre de symboles à générer
+        periods: Nombre de barres par symbole (jours de séance ou barres intraday)
+        start_prices: Prix initial (scalaire, séquence ou dict par symbole)
+        drift: Tendance annualisée
+        volatility: Volatilité annualisée
+        correlation: Corrélation commune (scalaire) ou matrice (N, N)
+        volume: Volume moyen par barre
+        freq: 'D' (journalier) ou fréquence intraday pandas
+        end: Date de la dernière barre
+        seed: Graine du générateur (résultat reproductible)
+
+    Returns:
+        MarketPanel: Panel (N, T)
+    """
+    if isinstance(symbols, int):
+        symbols = [f"SYM{i:04d}" for i in range(symbols)]
+    symbols = list(symbols)
+    n = len(symbols)
+    rng = np.random.default_rng(seed)
+
+    timestamps, tz = trading_timestamps(periods, end=end, freq=freq)
+    t = len(timestamps)
+
+    if freq == 'D':
+        dt = 1 / TRADING_DAYS_PER_YEAR
+    else:
+        session_minutes = (MOEX_CLOSE_TIME.hour - MOEX_OPEN_TIME.hour) * 60 + MOEX_CLOSE_TIME.minute - MOEX_OPEN_TIME.minute
+        dt = pd.Timedelta(freq) / pd.Timedelta(minutes=session_minutes) / TRADING_DAYS_PER_YEAR
+
+    if isinstance(start_prices, dict):
+        start_prices = [start_prices.get(symbol, 100.0) for symbol in symbols]
+    s0 = np.broadcast_to(np.asarray(start_prices, dtype=np.float64), (n,))[:, None]
+    mu = np.broadcast_to(np.asarray(drift, dtype=np.float64), (n,))[:, None]
+    sigma = np.broadcast_to(np.asarray(volatility, dtype=np.float64), (n,))[:, None]
+    mean_volume = np.broadcast_to(np.asarray(volume, dtype=np.float64), (n,))[:, None]
+
+    # Log-rendements puis clôtures (calculs en place pour limiter les temporaires)
+    returns = _correlated_normals(rng, n, t, correlation)
+    returns *= sigma * np.sqrt(dt)
+    returns += (mu - 0.5 * sigma ** 2) * dt
+    close = np.cumsum(returns, axis=1)
+    np.exp(close, out=close)
+    close *= s0
+
+    # Ouverture proche de la clôture précédente, extrêmes autour du corps de la barre
+    open_ = np.empty_like(close)
+    open_[:, 0] = s0[:, 0]
+    open_[:, 1:] = close[:, :-1]
+    open_ *= np.exp(rng.standard_normal((n, t)) * (0.1 * sigma * np.sqrt(dt)))
+
+    wick = sigma * np.sqrt(dt) * 0.5
+    high = np.maximum(open_, close)
+    high *= np.exp(np.abs(rng.standard_normal((n, t))) * wick)
+    low = np.minimum(open_, close)
+    low *= np.exp(-np.abs(rng.standard_normal((n, t))) * wick)
+
+    # Volume log-normal, plus élevé sur les barres agitées
+    activity = np.abs(returns) / (sigma * np.sqrt(dt))
+    volume_ = rng.lognormal(mean=-0.125, sigma=0.5, size=(n, t))
+    volume_ *= mean_volume * (0.5 + 0.5 * activity)
+    np.rint(volume_, out=volume_)
+
+    return MarketPanel(symbols, timestamps, tz, open_, high, low, close, volume_)
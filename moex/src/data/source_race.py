@@ -0,0 +1,93 @@
+"""
+Mise en concurrence de sources de données avec lancement différé (requêtes « hedged »)
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Délai avant de lancer la source suivante et budget total de la course (secondes)
+HEDGE_DELAY = 1.5
+RACE_DEADLINE = 8.0
+
+
+@dataclass
+class RaceResult:
+    """Résultat d'une course entre sources"""
+    source: Optional[str] = None
+    value: Any = None
+    latency: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def won(self) -> bool:
+        return self.source is not None
+
+
+def race_sources(
+    sources: List[Tuple[str, Callable[[float], Any]]],
+    hedge_delay: float = HEDGE_DELAY,
+    deadline: float = RACE_DEADLINE,
+    is_valid: Callable[[Any], bool] = lambda value: value is not None,
+    clock: Callable[[], float] = time.monotonic
+) -> RaceResult:
+    """
+    Lance les sources par ordre de priorité et retourne le premier résultat valide
+
+    La première source démarre immédiatement ; chaque source suivante démarre
+    après hedge_delay, ou dès que toutes les sources lancées ont échoué.
+    Les sources perdantes ne sont pas interrompues mais leur résultat est ignoré.
+
+    Args:
+        sources: Couples (nom, fonction) ; la fonction reçoit le budget restant en secondes
+        hedge_delay: Délai avant le lancement de la source suivante
+        deadline: Budget total de la course
+        is_valid: Prédicat de validité d'un résultat
+
+    Returns:
+        RaceResult: Source gagnante, valeur et latence (source None si aucune)
+    """
+    start = clock()
+    end = start + deadline
+    result = RaceResult()
+    pending: Dict[Any, str] = {}
+    queue = list(sources)
+    next_launch = start
+
+    executor = ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix='source-race')
+    try:
+        while queue or pending:
+            now = clock()
+            if now >= end:
+                break
+
+            if queue and (now >= next_launch or not pending):
+                name, fn = queue.pop(0)
+                pending[executor.submit(fn, end - now)] = name
+                next_launch = now + hedge_delay
+
+            timeout = end - now
+            if queue:
+                timeout = min(timeout, max(0.0, next_launch - now))
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    result.errors[name] = str(e)
+                    continue
+                if is_valid(value):
+                    result.source = name
+                    result.value = value
+                    result.latency = clock() - start
+                    return result
+                result.errors[name] = "résultat invalide"
+
+        for name in pending.values():
+            result.errors.setdefault(name, "délai dépassé")
+        result.latency = clock() - start
+        return result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
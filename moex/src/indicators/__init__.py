@@ -0,0 +1,13 @@
+"""Package des indicateurs techniques"""
+from .engine import ALL_INDICATORS, INDICATORS, IndicatorEngine, compute_indicators, with_indicators
+from .levels import cluster_prices, price_levels
+from .panel import compute_panel, latest_values
+from .streaming import (
+    IndicatorStream, RollingStats, SlidingExtreme, StreamingBollinger, StreamingEMA, StreamingMACD, StreamingPivots,
+    StreamingRSI, StreamingSupportResistance, StreamingVWAP
+)
+
+__all__ = ['ALL_INDICATORS', 'INDICATORS', 'IndicatorEngine', 'compute_indicators', 'with_indicators',
+           'cluster_prices', 'price_levels', 'compute_panel', 'latest_values',
+           'IndicatorStream', 'RollingStats', 'SlidingExtreme', 'StreamingBollinger', 'StreamingEMA', 'StreamingMACD',
+           'StreamingPivots', 'StreamingRSI', 'StreamingSupportResistance', 'StreamingVWAP']
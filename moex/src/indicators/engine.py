@@ -0,0 +1,465 @@
+"""
+Moteur d'indicateurs techniques : graphe de dépendances et calculs intermédiaires partagés
+
+Chaque indicateur est décrit par des nœuds (moyenne mobile, écart-type,
+variation...) qui référencent leurs entrées. Les nœuds identiques de deux
+indicateurs (la moyenne 20 de MA20 et de BB_Middle, les rendements de la
+volatilité...) ne sont calculés qu'une fois, et tous les résultats sont
+écrits dans un seul tableau préalloué.
+"""
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+TRADING_DAYS = 252
+
+
+class Node(NamedTuple):
+    """Calcul intermédiaire : opération, nœuds d'entrée et paramètres"""
+    op: str
+    inputs: Tuple['Node', ...] = ()
+    params: tuple = ()
+
+
+def field(name: str) -> Node:
+    """Colonne d'entrée (open, high, low, close ou volume)"""
+    return Node('field', (), (name,))
+
+
+def sma(source: Node, window: int) -> Node:
+    return Node('sma', (source,), (int(window),))
+
+
+def rolling_std(source: Node, window: int) -> Node:
+    return Node('std', (source,), (int(window),))
+
+
+def ema(source: Node, span: int) -> Node:
+    return Node('ema', (source,), (int(span),))
+
+
+def diff(source: Node) -> Node:
+    return Node('diff', (source,))
+
+
+def returns(source: Node) -> Node:
+    return Node('returns', (source,))
+
+
+# Opérations : tableaux d'entrée (dans l'ordre de Node.inputs) et paramètres -> tableau float64.
+# Le temps est l'axe 0 : une série (T,) ou un panel (T, N) d'un symbole par colonne.
+# Les colonnes d'entrée ('field') sont lues par le moteur.
+def _rolling(values: np.ndarray) -> Union[pd.Series, pd.DataFrame]:
+    return pd.Series(values, copy=False) if values.ndim == 1 else pd.DataFrame(values, copy=False)
+
+
+def _starts(values: np.ndarray) -> np.ndarray:
+    """Première ligne valide de chaque colonne (len(values) si aucune)"""
+    finite = ~np.isnan(values)
+    return np.where(finite.any(axis=0), finite.argmax(axis=0), len(values))
+
+
+def _rows(values: np.ndarray) -> np.ndarray:
+    return np.arange(len(values)).reshape((-1,) + (1,) * (values.ndim - 1))
+
+
+def _sma(values, window):
+    return _rolling(values).rolling(window=window).mean().to_numpy()
+
+
+def _std(values, window):
+    return _rolling(values).rolling(window=window).std().to_numpy()
+
+
+def _ema(values, span):
+    return _rolling(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def _diff(values):
+    result = np.empty_like(values)
+    result[0:1] = np.nan
+    np.subtract(values[1:], values[:-1], out=result[1:])
+    return result
+
+
+def _returns(values):
+    result = np.empty_like(values)
+    result[0:1] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(values[1:], values[:-1], out=result[1:])
+    result[1:] -= 1
+    return result
+
+
+def _from_start(values, prices):
+    # Variation inconnue comptée comme nulle, comme delta.where(delta > 0, 0), mais seulement
+    # à partir du premier cours de chaque historique (symboles cotés plus tard dans un panel)
+    values[_rows(prices) < _starts(prices)] = np.nan
+    return values
+
+
+def _gain(delta, prices):
+    return _from_start(np.where(delta > 0, delta, 0.0), prices)
+
+
+def _loss(delta, prices):
+    return _from_start(np.where(delta < 0, -delta, 0.0), prices)
+
+
+def _wilder(values, period):
+    # Lissage de Wilder amorcé par la moyenne simple des `period` premières variations
+    # (la première valeur de chaque historique correspond à une variation inconnue)
+    if values.ndim == 1:
+        return _wilder(values[:, None], period)[:, 0]
+    start = _starts(values)
+    seed_row = start + period
+    sums = np.zeros((len(values) + 1, values.shape[1]))
+    np.cumsum(np.nan_to_num(values), axis=0, out=sums[1:])
+    seeded = np.where(_rows(values) > seed_row, values, np.nan)
+    columns = np.flatnonzero(seed_row < len(values))
+    rows = seed_row[columns]
+    seeded[rows, columns] = (sums[rows + 1, columns] - sums[start[columns] + 1, columns]) / period
+    return _rolling(seeded).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+
+
+def _rsi(gain, loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + gain / loss)
+
+
+def _subtract(a, b):
+    return a - b
+
+
+def _ratio(a, b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return a / b
+
+
+def _band(middle, deviation, width):
+    return middle + deviation * width
+
+
+def _scale(values, factor):
+    return values * factor
+
+
+def _sliding_max(values, window):
+    """
+    Maximum sur les `window` dernières lignes (NaN si la fenêtre contient un NaN)
+
+    Algorithme de van Herk/Gil-Werman : maxima cumulés vers l'avant et vers
+    l'arrière dans des blocs de `window` lignes, puis un maximum par ligne.
+    Trois comparaisons par valeur quelle que soit la fenêtre, en O(n)
+    vectorisé, sans jamais lire de ligne postérieure au résultat.
+    """
+    if window < 1:
+        raise ValueError(f"Fenêtre invalide: {window}")
+    length = len(values)
+    result = np.full(values.shape, np.nan)
+    if window > length:
+        return result
+    missing = np.isnan(values)
+    blocks = -(-length // window)
+    padded = np.full((blocks * window,) + values.shape[1:], -np.inf)
+    padded[:length] = np.where(missing, -np.inf, values)
+    shaped = padded.reshape((blocks, window) + values.shape[1:])
+    prefix = np.maximum.accumulate(shaped, axis=1).reshape(padded.shape)
+    suffix = np.maximum.accumulate(shaped[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+    np.maximum(suffix[:length - window + 1], prefix[window - 1:length], out=result[window - 1:])
+    counts = np.zeros((length + 1,) + values.shape[1:], dtype=np.intp)
+    np.cumsum(missing, axis=0, out=counts[1:])
+    result[window - 1:][counts[window:] > counts[:length - window + 1]] = np.nan
+    return result
+
+
+def _sliding(values, window, center, kind):
+    result = _sliding_max(values, window) if kind == 'max' else -_sliding_max(-values, window)
+    if not center:
+        return result
+    # Fenêtre centrée (rolling(center=True)) : résultat avancé de (window - 1) // 2 lignes
+    offset = (window - 1) // 2
+    centered = np.full(values.shape, np.nan)
+    centered[:len(values) - offset] = result[offset:]
+    return centered
+
+
+def _rolling_max(values, window, center):
+    return _sliding(values, window, center, 'max')
+
+
+def _rolling_min(values, window, center):
+    return _sliding(values, window, center, 'min')
+
+
+def _pivot(values, left, right, causal, kind):
+    # Pivot : extrême des `left` barres précédentes et des `right` suivantes. En mode causal,
+    # il n'est connu qu'à la barre de confirmation (`right` barres plus tard) et y est reporté.
+    extreme = _sliding(values, left + right + 1, False, kind)
+    candidate = np.full(values.shape, np.nan)
+    candidate[right:] = values[:len(values) - right]
+    confirmed = np.where(extreme == candidate, candidate, np.nan)
+    if causal:
+        return confirmed
+    result = np.full(values.shape, np.nan)
+    result[:len(values) - right] = confirmed[right:]
+    return result
+
+
+def _money_flow(close, high, low, volume):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((close - low) - (high - close)) / (high - low) * volume
+
+
+def _vwap(high, low, close, volume):
+    typical = (high + low + close) / 3
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nancumsum(typical * volume, axis=0) / np.nancumsum(volume, axis=0)
+
+
+OPERATIONS: Dict[str, Callable[..., np.ndarray]] = {
+    'sma': _sma,
+    'std': _std,
+    'ema': _ema,
+    'diff': _diff,
+    'returns': _returns,
+    'gain': _gain,
+    'loss': _loss,
+    'wilder': _wilder,
+    'rsi': _rsi,
+    'subtract': _subtract,
+    'ratio': _ratio,
+    'band': _band,
+    'scale': _scale,
+    'rolling_max': _rolling_max,
+    'rolling_min': _rolling_min,
+    'pivot': _pivot,
+    'money_flow': _money_flow,
+    'vwap': _vwap,
+}
+
+
+# Indicateurs : paramètres -> {colonne de sortie: nœud}
+def _moving_averages(windows: Iterable[int] = (20, 50, 200)) -> Dict[str, Node]:
+    return {f'MA{window}': sma(field('close'), window) for window in windows}
+
+
+def _rsi_indicator(period: int = 14, smoothing: str = 'sma') -> Dict[str, Node]:
+    if smoothing not in ('sma', 'wilder'):
+        raise ValueError(f"Lissage inconnu: {smoothing}")
+    delta = diff(field('close'))
+    gain, loss = Node('gain', (delta, field('close'))), Node('loss', (delta, field('close')))
+    if smoothing == 'wilder':
+        return {'RSI': Node('rsi', (Node('wilder', (gain,), (int(period),)), Node('wilder', (loss,), (int(period),))))}
+    return {'RSI': Node('rsi', (sma(gain, period), sma(loss, period)))}
+
+
+def _bollinger(period: int = 20, std: float = 2) -> Dict[str, Node]:
+    middle = sma(field('close'), period)
+    deviation = rolling_std(field('close'), period)
+    return {
+        'BB_Middle': middle,
+        'BB_Upper': Node('band', (middle, deviation), (std,)),
+        'BB_Lower': Node('band', (middle, deviation), (-std,))
+    }
+
+
+def _macd(fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, Node]:
+    macd = Node('subtract', (ema(field('close'), fast), ema(field('close'), slow)))
+    signal_line = ema(macd, signal)
+    return {'MACD': macd, 'MACD_Signal': signal_line, 'MACD_Histogram': Node('subtract', (macd, signal_line))}
+
+
+def _volume_ma(window: int = 20) -> Dict[str, Node]:
+    return {'Volume_MA20' if window == 20 else f'Volume_MA{window}': sma(field('volume'), window)}
+
+
+def _volume_ratio(window: int = 20) -> Dict[str, Node]:
+    return {'Volume_Ratio': Node('ratio', (field('volume'), sma(field('volume'), window)))}
+
+
+def _accumulation_distribution(window: int = 20) -> Dict[str, Node]:
+    flow = Node('money_flow', tuple(field(name) for name in ('close', 'high', 'low', 'volume')))
+    return {'AD': flow, 'AD_MA': sma(flow, window)}
+
+
+def _volatility(window: int = 20, periods: int = TRADING_DAYS) -> Dict[str, Node]:
+    return {'Volatility': Node('scale', (rolling_std(returns(field('close')), window),), (float(np.sqrt(periods)),))}
+
+
+def _support_resistance(window: int = 20, causal: bool = True) -> Dict[str, Node]:
+    # causal=False : fenêtre centrée, qui lit (window - 1) // 2 barres futures (affichage a posteriori)
+    return {
+        'Resistance': Node('rolling_max', (field('high'),), (int(window), not causal)),
+        'Support': Node('rolling_min', (field('low'),), (int(window), not causal))
+    }
+
+
+def _pivots(left: int = 5, right: int = 5, causal: bool = True) -> Dict[str, Node]:
+    return {
+        'Pivot_High': Node('pivot', (field('high'),), (int(left), int(right), bool(causal), 'max')),
+        'Pivot_Low': Node('pivot', (field('low'),), (int(left), int(right), bool(causal), 'min'))
+    }
+
+
+def _vwap_indicator() -> Dict[str, Node]:
+    return {'VWAP': Node('vwap', tuple(field(name) for name in ('high', 'low', 'close', 'volume')))}
+
+
+INDICATORS: Dict[str, Callable[..., Dict[str, Node]]] = {
+    'ma': _moving_averages,
+    'rsi': _rsi_indicator,
+    'bollinger': _bollinger,
+    'macd': _macd,
+    'volume_ma': _volume_ma,
+    'volume_ratio': _volume_ratio,
+    'ad': _accumulation_distribution,
+    'volatility': _volatility,
+    'support_resistance': _support_resistance,
+    'pivots': _pivots,
+    'vwap': _vwap_indicator,
+}
+
+# Jeu complet, dans l'ordre historique des colonnes de get_all_indicators
+ALL_INDICATORS = ('ma', 'rsi', 'bollinger', 'macd', 'volume_ma', 'volume_ratio', 'ad', 'volatility', 'support_resistance')
+
+IndicatorRequest = Union[str, Tuple[str, Mapping]]
+
+
+def _fields(node: Node) -> set:
+    if node.op == 'field':
+        return {node.params[0]}
+    return set().union(*(_fields(source) for source in node.inputs)) if node.inputs else set()
+
+
+class IndicatorEngine:
+    """
+    Calcule un ensemble d'indicateurs en une passe sur le graphe de leurs dépendances
+
+    Les demandes sont des noms d'INDICATORS ('rsi') ou des couples
+    (nom, paramètres), par exemple ('ma', {'windows': [10, 20]}).
+    """
+
+    def __init__(self, fields: Optional[Mapping[str, str]] = None):
+        """
+        Args:
+            fields: Colonnes du DataFrame pour open/high/low/close/volume ; à défaut,
+                'Close' ou 'close' (etc.) selon celles présentes
+        """
+        self.fields = dict(fields or {})
+
+    @staticmethod
+    def outputs(requests: Iterable[IndicatorRequest]) -> Dict[str, Node]:
+        """
+        Colonnes de sortie demandées et leur nœud
+
+        Raises:
+            ValueError: Si un indicateur est inconnu
+        """
+        outputs: Dict[str, Node] = {}
+        for request in requests:
+            name, params = (request, {}) if isinstance(request, str) else request
+            if name not in INDICATORS:
+                raise ValueError(f"Indicateur inconnu: {name}")
+            outputs.update(INDICATORS[name](**params))
+        return outputs
+
+    @staticmethod
+    def plan(outputs: Iterable[Node]) -> List[Node]:
+        """Nœuds à calculer, chacun une seule fois, dans un ordre respectant les dépendances"""
+        order: List[Node] = []
+        seen = set()
+        for root in outputs:
+            stack = [(root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if node in seen:
+                    continue
+                if expanded:
+                    seen.add(node)
+                    order.append(node)
+                    continue
+                stack.append((node, True))
+                stack.extend((source, False) for source in reversed(node.inputs) if source not in seen)
+        return order
+
+    def _columns(self, df: pd.DataFrame) -> Dict[str, str]:
+        columns = {}
+        for name in FIELDS:
+            candidates = [self.fields[name]] if name in self.fields else [name.capitalize(), name]
+            for column in candidates:
+                if column in df.columns:
+                    columns[name] = column
+                    break
+        return columns
+
+    def compute(self, df: pd.DataFrame, requests: Iterable[IndicatorRequest] = ALL_INDICATORS) -> pd.DataFrame:
+        """
+        Calcule les indicateurs demandés
+
+        Les indicateurs dont une colonne d'entrée manque sont ignorés.
+
+        Args:
+            df: DataFrame OHLCV
+            requests: Indicateurs demandés (tous par défaut)
+
+        Returns:
+            pd.DataFrame: Indicateurs seuls (float64), même index que df
+        """
+        columns = self._columns(df)
+        fields = {name: df[column].to_numpy(dtype=np.float64, na_value=np.nan) for name, column in columns.items()}
+        outputs = self.available(requests, fields)
+
+        result = np.empty((len(df), len(outputs)), dtype=np.float64, order='F')
+        for j, values in enumerate(self.evaluate(outputs, fields)):
+            result[:, j] = values
+        return pd.DataFrame(result, index=df.index, columns=list(outputs), copy=False)
+
+    def available(self, requests: Iterable[IndicatorRequest], fields: Mapping[str, np.ndarray]) -> Dict[str, Node]:
+        """Colonnes demandées dont toutes les entrées sont disponibles"""
+        return {name: node for name, node in self.outputs(requests).items() if _fields(node) <= fields.keys()}
+
+    def evaluate(self, outputs: Mapping[str, Node], fields: Mapping[str, np.ndarray]) -> Iterable[np.ndarray]:
+        """
+        Exécute le plan des sorties sur des tableaux float64 (T,) ou (T, N)
+
+        Returns:
+            Iterable[np.ndarray]: Valeurs de chaque sortie, dans l'ordre de `outputs`
+        """
+        values: Dict[Node, np.ndarray] = {}
+        for node in self.plan(outputs.values()):
+            if node.op == 'field':
+                values[node] = fields[node.params[0]]
+            else:
+                values[node] = OPERATIONS[node.op](*(values[source] for source in node.inputs), *node.params)
+        return [values[node] for node in outputs.values()]
+
+
+def compute_indicators(
+    df: pd.DataFrame,
+    requests: Iterable[IndicatorRequest] = ALL_INDICATORS,
+    fields: Optional[Mapping[str, str]] = None
+) -> pd.DataFrame:
+    """
+    Calcule des indicateurs (voir IndicatorEngine.compute)
+
+    Returns:
+        pd.DataFrame: Indicateurs seuls, même index que df
+    """
+    return IndicatorEngine(fields).compute(df, requests)
+
+
+def with_indicators(
+    df: pd.DataFrame,
+    requests: Iterable[IndicatorRequest] = ALL_INDICATORS,
+    fields: Optional[Mapping[str, str]] = None
+) -> pd.DataFrame:
+    """
+    Retourne df complété par les indicateurs demandés (une seule copie)
+
+    Les colonnes de df portant le nom d'un indicateur sont remplacées.
+    """
+    indicators = compute_indicators(df, requests, fields)
+    return pd.concat([df.drop(columns=df.columns.intersection(indicators.columns)), indicators], axis=1)
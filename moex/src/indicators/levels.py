@@ -0,0 +1,105 @@
+"""
+Niveaux de prix : pivots regroupés en supports et résistances
+
+Les pivots (plus hauts et plus bas locaux) sont détectés par le moteur en
+O(n). Leurs prix sont ensuite triés et regroupés en niveaux : un niveau
+réunit les pivots situés à moins de `tolerance` (relative) du plus bas
+d'entre eux, et son nombre de touches est le nombre de pivots réunis.
+"""
+import numpy as np
+import pandas as pd
+
+from .engine import compute_indicators
+
+LEVEL_COLUMNS = ['Level', 'Low', 'High', 'Touches', 'Pivot_Highs', 'Pivot_Lows', 'First', 'Last']
+
+
+def cluster_prices(prices: np.ndarray, tolerance: float = 0.005) -> np.ndarray:
+    """
+    Regroupe des prix en niveaux
+
+    Args:
+        prices: Prix des pivots
+        tolerance: Écart relatif maximal entre le plus bas et le plus haut prix d'un niveau
+
+    Returns:
+        np.ndarray: Numéro de niveau de chaque prix (niveaux numérotés par prix croissant)
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    order = np.argsort(prices, kind='stable')
+    ordered = prices[order]
+    starts = []
+    start = 0
+    # Un saut par niveau (et non par pivot) : le niveau s'arrête au premier prix hors tolérance
+    while start < len(ordered):
+        starts.append(start)
+        start = int(np.searchsorted(ordered, ordered[start] * (1 + tolerance), side='right'))
+    sorted_labels = np.zeros(len(ordered), dtype=np.intp)
+    sorted_labels[starts[1:]] = 1
+    labels = np.empty(len(ordered), dtype=np.intp)
+    labels[order] = np.cumsum(sorted_labels)
+    return labels
+
+
+def price_levels(
+    df: pd.DataFrame,
+    left: int = 5,
+    right: int = 5,
+    tolerance: float = 0.005,
+    min_touches: int = 2,
+    causal: bool = True
+) -> pd.DataFrame:
+    """
+    Niveaux de support et résistance formés par les pivots d'un historique
+
+    Args:
+        df: DataFrame avec colonnes 'High' et 'Low'
+        left: Barres précédentes qu'un pivot doit dominer
+        right: Barres suivantes qu'un pivot doit dominer
+        tolerance: Écart relatif maximal des prix d'un même niveau
+        min_touches: Nombre minimal de pivots pour retenir un niveau
+        causal: Dater chaque pivot à sa barre de confirmation (`right` barres
+            après le pivot), comme il serait connu en direct ; sinon à sa propre barre
+
+    Returns:
+        pd.DataFrame: Un niveau par ligne (prix moyen, bornes, touches, pivots hauts et bas,
+        première et dernière touche), du plus touché au moins touché
+    """
+    pivots = compute_indicators(df, [('pivots', {'left': left, 'right': right, 'causal': causal})])
+    highs = pivots['Pivot_High'].to_numpy() if 'Pivot_High' in pivots else np.empty(0)
+    lows = pivots['Pivot_Low'].to_numpy() if 'Pivot_Low' in pivots else np.empty(0)
+    high_rows, = np.nonzero(~np.isnan(highs))
+    low_rows, = np.nonzero(~np.isnan(lows))
+    if not len(high_rows) and not len(low_rows):
+        return pd.DataFrame(columns=LEVEL_COLUMNS)
+
+    prices = np.concatenate([highs[high_rows], lows[low_rows]])
+    rows = np.concatenate([high_rows, low_rows])
+    is_high = np.concatenate([np.ones(len(high_rows), dtype=np.intp), np.zeros(len(low_rows), dtype=np.intp)])
+
+    labels = cluster_prices(prices, tolerance)
+    count = labels.max() + 1
+    touches = np.bincount(labels, minlength=count)
+    low = np.full(count, np.inf)
+    high = np.full(count, -np.inf)
+    first = np.full(count, len(df))
+    last = np.full(count, -1)
+    np.minimum.at(low, labels, prices)
+    np.maximum.at(high, labels, prices)
+    np.minimum.at(first, labels, rows)
+    np.maximum.at(last, labels, rows)
+    pivot_highs = np.bincount(labels, weights=is_high, minlength=count).astype(np.intp)
+
+    levels = pd.DataFrame({
+        'Level': np.bincount(labels, weights=prices, minlength=count) / touches,
+        'Low': low,
+        'High': high,
+        'Touches': touches,
+        'Pivot_Highs': pivot_highs,
+        'Pivot_Lows': touches - pivot_highs,
+        'First': df.index[first],
+        'Last': df.index[last],
+    })
+    levels = levels[levels['Touches'] >= min_touches]
+    return levels.sort_values(['Touches', 'Last'], ascending=False, kind='stable').reset_index(drop=True)
+
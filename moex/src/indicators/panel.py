@@ -0,0 +1,111 @@
+"""
+Indicateurs sur un panel multi-symboles, en un seul appel vectorisé
+
+Les mêmes indicateurs que le moteur par lots, calculés sur des tableaux
+(temps x symboles) : chaque moyenne, écart-type ou EMA glissant traite
+toutes les colonnes d'un coup au lieu d'une boucle Python par symbole.
+Les historiques de longueurs différentes (symboles cotés plus tard,
+NaN en tête) donnent pour chaque symbole le même résultat que le moteur
+appliqué à son seul historique.
+"""
+from typing import TYPE_CHECKING, Dict, Iterable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .engine import FIELDS, IndicatorEngine, IndicatorRequest
+
+if TYPE_CHECKING:
+    from ..data.simulator import MarketPanel
+
+PanelInput = Union['MarketPanel', pd.DataFrame, np.ndarray, Mapping[str, Union[pd.DataFrame, np.ndarray]]]
+
+DEFAULT_PANEL_INDICATORS = ('rsi', 'macd', 'bollinger')
+
+
+def _as_block(values, transpose: bool) -> np.ndarray:
+    if isinstance(values, pd.DataFrame):
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 2:
+        raise ValueError(f"Tableau 2-D attendu, reçu {values.ndim}-D")
+    return values.T if transpose else values
+
+
+def compute_panel(
+    data: PanelInput,
+    requests: Iterable[IndicatorRequest] = DEFAULT_PANEL_INDICATORS,
+    symbols: Optional[Sequence[str]] = None
+) -> Dict[str, Union[pd.DataFrame, np.ndarray]]:
+    """
+    Calcule des indicateurs pour tous les symboles d'un panel
+
+    Args:
+        data: MarketPanel ; DataFrame large des clôtures (index temps, une colonne
+            par symbole) ; tableau (symboles x temps) des clôtures ; ou mapping
+            open/high/low/close/volume vers de tels DataFrames ou tableaux
+        requests: Indicateurs demandés (syntaxe de IndicatorEngine)
+        symbols: Noms des lignes pour un tableau numpy (les résultats sont alors
+            des DataFrames larges sans index temporel)
+
+    Returns:
+        Dict[str, Union[pd.DataFrame, np.ndarray]]: Par colonne d'indicateur, un
+        DataFrame large (temps x symboles) ou, pour des tableaux numpy sans
+        `symbols`, un tableau (symboles x temps). Tous partagent un seul bloc.
+    """
+    index = columns = None
+    if hasattr(data, 'symbols') and hasattr(data, 'timestamps'):
+        # MarketPanel : tableaux (symboles x temps)
+        fields = {name: _as_block(getattr(data, name), True) for name in FIELDS}
+        index, columns = data.index, list(data.symbols)
+    else:
+        if not isinstance(data, Mapping):
+            data = {'close': data}
+        fields = {}
+        for name, values in data.items():
+            name = name.lower()
+            if name not in FIELDS:
+                raise ValueError(f"Champ inconnu: {name}")
+            if isinstance(values, pd.DataFrame):
+                index, columns = values.index, list(values.columns)
+                fields[name] = _as_block(values, False)
+            else:
+                # Tableaux numpy : une ligne par symbole
+                fields[name] = _as_block(values, True)
+        if symbols is not None:
+            columns = list(symbols)
+
+    shapes = {block.shape for block in fields.values()}
+    if not shapes:
+        raise ValueError("Aucun champ de prix fourni")
+    if len(shapes) > 1:
+        raise ValueError(f"Champs de formes différentes: {sorted(shapes)}")
+
+    engine = IndicatorEngine()
+    outputs = engine.available(requests, fields)
+    (length, width), = shapes
+    block = np.empty((len(outputs), length, width), dtype=np.float64)
+    for k, values in enumerate(engine.evaluate(outputs, fields)):
+        block[k] = values
+
+    if columns is None:
+        return {name: block[k].T for k, name in enumerate(outputs)}
+    return {
+        name: pd.DataFrame(block[k], index=index, columns=columns, copy=False)
+        for k, name in enumerate(outputs)
+    }
+
+
+def latest_values(indicators: Mapping[str, Union[pd.DataFrame, np.ndarray]]) -> pd.DataFrame:
+    """
+    Dernière valeur connue de chaque indicateur, par symbole
+
+    Returns:
+        pd.DataFrame: Une ligne par symbole, une colonne par indicateur
+    """
+    values = {}
+    for name, frame in indicators.items():
+        if isinstance(frame, np.ndarray):
+            frame = pd.DataFrame(frame.T)
+        values[name] = frame.ffill().iloc[-1] if len(frame) else pd.Series(np.nan, index=frame.columns)
+    return pd.DataFrame(values)
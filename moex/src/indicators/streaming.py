@@ -0,0 +1,493 @@
+"""
+Indicateurs incrémentaux : O(1) par nouvelle barre, état sérialisable
+
+Chaque indicateur reçoit les barres une à une via update(bar) et retourne
+la même valeur que le moteur par lots (src.indicators.engine) sur
+l'historique complet. Une barre est un mapping open/high/low/close/volume
+ou, pour les indicateurs de prix, directement le cours de clôture.
+
+L'état (state()) ne contient que des nombres et des listes : il se
+sérialise en JSON et se restaure avec from_state().
+"""
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .engine import IndicatorEngine, IndicatorRequest
+
+NAN = float('nan')
+
+Bar = Union[Mapping[str, float], float]
+
+
+def _value(bar: Bar, name: str = 'close') -> float:
+    if isinstance(bar, (float, int)):
+        return float(bar)
+    value = bar.get(name)
+    return NAN if value is None else float(value)
+
+
+class StreamingIndicator:
+    """Base des indicateurs incrémentaux : état sérialisable"""
+
+    __slots__ = ()
+
+    def update(self, bar: Bar):
+        raise NotImplementedError
+
+    def state(self) -> Dict[str, Any]:
+        """État complet de l'indicateur (sérialisable en JSON)"""
+        return {name: _dump(getattr(self, name)) for name in self.__slots__}
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> 'StreamingIndicator':
+        """Restaure un indicateur depuis state()"""
+        indicator = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(indicator, name, _load(state[name]))
+        return indicator
+
+
+def _dump(value):
+    if isinstance(value, StreamingIndicator):
+        return {'type': type(value).__name__, 'state': value.state()}
+    return list(value) if isinstance(value, (list, deque)) else value
+
+
+def _load(value):
+    if isinstance(value, dict):
+        return _TYPES[value['type']].from_state(value['state'])
+    return list(value) if isinstance(value, list) else value
+
+
+class StreamingEMA(StreamingIndicator):
+    """
+    Moyenne mobile exponentielle, comme ewm(span, adjust=False)
+
+    Une valeur NaN laisse la moyenne inchangée mais, comme pandas, réduit
+    le poids de l'historique lors de la valeur suivante.
+    """
+
+    __slots__ = ('span', 'alpha', 'value', 'weight')
+
+    def __init__(self, span: int):
+        self.span = int(span)
+        self.alpha = 2.0 / (span + 1)
+        self.value = NAN
+        self.weight = 1.0
+
+    def update(self, bar: Bar) -> float:
+        x = _value(bar)
+        value = self.value
+        if x == x:
+            if value != value:
+                self.value = x
+            elif value != x:
+                weight = self.weight * (1 - self.alpha)
+                self.value = (weight * value + self.alpha * x) / (weight + self.alpha)
+            self.weight = 1.0
+        elif value == value:
+            self.weight *= 1 - self.alpha
+        return self.value
+
+
+class RollingStats(StreamingIndicator):
+    """
+    Moyenne et écart-type glissants (ddof=1) sur `window` valeurs
+
+    Les sommes des écarts à un pivot (et de leurs carrés) sont tenues à jour
+    à chaque barre. À chaque tour complet du tampon circulaire, le pivot est
+    replacé sur la moyenne et les sommes sont recalculées exactement : la
+    dérive des arrondis reste bornée, pour un coût amorti O(1), et la variance
+    reste précise même pour des cours élevés.
+    Tant que la fenêtre n'est pas pleine (ou contient un NaN), le résultat est NaN.
+    """
+
+    __slots__ = ('window', 'field', 'values', 'position', 'count', 'pivot', 'total', 'squares', 'missing')
+
+    def __init__(self, window: int, field: str = 'close'):
+        self.window = int(window)
+        self.field = field
+        self.values: List[float] = [0.0] * self.window
+        self.position = 0
+        self.count = 0
+        self.pivot = NAN
+        self.total = 0.0
+        self.squares = 0.0
+        self.missing = 0
+
+    def push(self, x: float):
+        """Ajoute une valeur (la plus ancienne sort de la fenêtre)"""
+        if self.pivot != self.pivot and x == x:
+            self.pivot = x
+        old = self.values[self.position]
+        if self.count >= self.window:
+            if old != old:
+                self.missing -= 1
+            else:
+                old -= self.pivot
+                self.total -= old
+                self.squares -= old * old
+        else:
+            self.count += 1
+        self.values[self.position] = x
+        if x != x:
+            self.missing += 1
+        else:
+            y = x - self.pivot
+            self.total += y
+            self.squares += y * y
+        self.position += 1
+        if self.position == self.window:
+            self.position = 0
+            self._resync()
+
+    def _resync(self):
+        # Correction de dérive : pivot sur la moyenne courante, sommes exactes
+        finite = [v for v in self.values if v == v]
+        if not finite:
+            return
+        self.pivot = math.fsum(finite) / len(finite)
+        deviations = [v - self.pivot for v in finite]
+        self.total = math.fsum(deviations)
+        self.squares = math.fsum(d * d for d in deviations)
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.window and not self.missing
+
+    @property
+    def mean(self) -> float:
+        return self.pivot + self.total / self.window if self.ready else NAN
+
+    @property
+    def std(self) -> float:
+        if not self.ready or self.window < 2:
+            return NAN
+        variance = (self.squares - self.total * self.total / self.window) / (self.window - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+    def update(self, bar: Bar) -> float:
+        self.push(_value(bar, self.field))
+        return self.mean
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD, ligne de signal et histogramme"""
+
+    __slots__ = ('fast', 'slow', 'signal')
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+
+    def update(self, bar: Bar) -> Dict[str, float]:
+        x = _value(bar)
+        macd = self.fast.update(x) - self.slow.update(x)
+        signal = self.signal.update(macd)
+        return {'MACD': macd, 'MACD_Signal': signal, 'MACD_Histogram': macd - signal}
+
+
+class StreamingRSI(StreamingIndicator):
+    """
+    RSI sur `period` variations
+
+    smoothing='sma' : moyennes simples des hausses et baisses (comme le moteur
+    par défaut) ; smoothing='wilder' : lissage de Wilder (alpha = 1/period),
+    amorcé par la moyenne simple des `period` premières variations.
+    """
+
+    __slots__ = ('period', 'smoothing', 'previous', 'gains', 'losses', 'seen', 'avg_gain', 'avg_loss')
+
+    def __init__(self, period: int = 14, smoothing: str = 'sma'):
+        if smoothing not in ('sma', 'wilder'):
+            raise ValueError(f"Lissage inconnu: {smoothing}")
+        self.period = int(period)
+        self.smoothing = smoothing
+        self.previous = NAN
+        self.gains = RollingStats(period)
+        self.losses = RollingStats(period)
+        self.seen = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    @staticmethod
+    def _rsi(gain: float, loss: float) -> float:
+        if loss == 0:
+            return 100.0 if gain > 0 else NAN
+        return 100 - 100 / (1 + gain / loss)
+
+    def update(self, bar: Bar) -> float:
+        x = _value(bar)
+        if x != x and self.seen == 0:
+            # Pas encore de cotation : l'historique commence au premier cours
+            return NAN
+        self.seen += 1
+        delta = x - self.previous
+        self.previous = x
+        # Variation inconnue (première barre, NaN) comptée comme nulle, comme delta.where(delta > 0, 0)
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if self.smoothing == 'wilder':
+            if self.seen <= self.period + 1:
+                if self.seen > 1:
+                    self.avg_gain += gain / self.period
+                    self.avg_loss += loss / self.period
+                if self.seen <= self.period:
+                    return NAN
+            else:
+                self.avg_gain += (gain - self.avg_gain) / self.period
+                self.avg_loss += (loss - self.avg_loss) / self.period
+            return self._rsi(self.avg_gain, self.avg_loss)
+
+        self.gains.push(gain)
+        self.losses.push(loss)
+        return self._rsi(self.gains.mean, self.losses.mean)
+
+
+class StreamingBollinger(StreamingIndicator):
+    """Bandes de Bollinger (moyenne et écart-type glissants du cours)"""
+
+    __slots__ = ('width', 'stats')
+
+    def __init__(self, period: int = 20, std: float = 2):
+        self.width = float(std)
+        self.stats = RollingStats(period)
+
+    def update(self, bar: Bar) -> Dict[str, float]:
+        stats = self.stats
+        stats.push(_value(bar))
+        middle = stats.mean
+        deviation = stats.std * self.width
+        return {'BB_Middle': middle, 'BB_Upper': middle + deviation, 'BB_Lower': middle - deviation}
+
+
+class StreamingVWAP(StreamingIndicator):
+    """VWAP cumulé depuis le début (ou le dernier reset()) ; les barres sans volume sont ignorées"""
+
+    __slots__ = ('notional', 'volume')
+
+    def __init__(self):
+        self.notional = 0.0
+        self.volume = 0.0
+
+    def reset(self):
+        """Repart de zéro (nouvelle séance)"""
+        self.notional = self.volume = 0.0
+
+    def update(self, bar: Mapping[str, float]) -> float:
+        volume = _value(bar, 'volume')
+        typical = (_value(bar, 'high') + _value(bar, 'low') + _value(bar, 'close')) / 3
+        flow = typical * volume
+        if flow == flow:
+            self.notional += flow
+        if volume == volume:
+            self.volume += volume
+        return self.notional / self.volume if self.volume else NAN
+
+
+class SlidingExtreme(StreamingIndicator):
+    """
+    Maximum (ou minimum) des `window` dernières valeurs, comme rolling(window).max()
+
+    File monotone : seules les valeurs qui peuvent encore devenir l'extrême
+    de la fenêtre sont conservées (décroissantes pour un maximum), avec leur
+    rang. Chaque valeur entre et sort au plus une fois : O(1) amorti par
+    barre. Tant que la fenêtre n'est pas pleine (ou contient un NaN), le
+    résultat est NaN.
+    """
+
+    __slots__ = ('window', 'field', 'sign', 'count', 'last_missing', 'ranks', 'values')
+
+    def __init__(self, window: int, field: str = 'close', kind: str = 'max'):
+        if kind not in ('max', 'min'):
+            raise ValueError(f"Extrême inconnu: {kind}")
+        self.window = int(window)
+        self.field = field
+        # Un minimum est le maximum des valeurs opposées
+        self.sign = 1.0 if kind == 'max' else -1.0
+        self.count = 0
+        self.last_missing = -1
+        self.ranks = deque()
+        self.values = deque()
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> 'SlidingExtreme':
+        indicator = super().from_state(state)
+        indicator.ranks = deque(indicator.ranks)
+        indicator.values = deque(indicator.values)
+        return indicator
+
+    def push(self, x: float) -> float:
+        """Ajoute une valeur et retourne l'extrême de la fenêtre"""
+        rank = self.count
+        self.count += 1
+        ranks, values = self.ranks, self.values
+        if x != x:
+            self.last_missing = rank
+        else:
+            x *= self.sign
+            while values and values[-1] <= x:
+                values.pop()
+                ranks.pop()
+            values.append(x)
+            ranks.append(rank)
+        oldest = rank - self.window
+        while ranks and ranks[0] <= oldest:
+            ranks.popleft()
+            values.popleft()
+        if rank < self.window - 1 or self.last_missing > oldest:
+            return NAN
+        return values[0] * self.sign
+
+    def update(self, bar: Bar) -> float:
+        return self.push(_value(bar, self.field))
+
+
+class StreamingSupportResistance(StreamingIndicator):
+    """Résistance (plus haut) et support (plus bas) des `window` dernières barres, sans lecture du futur"""
+
+    __slots__ = ('resistance', 'support')
+
+    def __init__(self, window: int = 20):
+        self.resistance = SlidingExtreme(window, 'high', 'max')
+        self.support = SlidingExtreme(window, 'low', 'min')
+
+    def update(self, bar: Mapping[str, float]) -> Dict[str, float]:
+        return {'Resistance': self.resistance.update(bar), 'Support': self.support.update(bar)}
+
+
+class StreamingPivots(StreamingIndicator):
+    """
+    Pivots hauts et bas, reportés à leur barre de confirmation
+
+    Un plus haut est un pivot s'il domine les `left` barres précédentes et
+    les `right` suivantes : il est donc connu `right` barres plus tard, et
+    retourné à ce moment (NaN sinon), comme le moteur en mode causal.
+    """
+
+    __slots__ = ('right', 'highs', 'lows', 'recent_highs', 'recent_lows', 'position')
+
+    def __init__(self, left: int = 5, right: int = 5):
+        self.right = int(right)
+        self.highs = SlidingExtreme(left + right + 1, 'high', 'max')
+        self.lows = SlidingExtreme(left + right + 1, 'low', 'min')
+        # Les right + 1 dernières barres : la plus ancienne est le pivot candidat
+        self.recent_highs: List[float] = [NAN] * (self.right + 1)
+        self.recent_lows: List[float] = [NAN] * (self.right + 1)
+        self.position = 0
+
+    def update(self, bar: Mapping[str, float]) -> Dict[str, float]:
+        high, low = _value(bar, 'high'), _value(bar, 'low')
+        position = self.position
+        self.recent_highs[position] = high
+        self.recent_lows[position] = low
+        self.position = (position + 1) % (self.right + 1)
+        candidate_high = self.recent_highs[self.position]
+        candidate_low = self.recent_lows[self.position]
+        highest = self.highs.push(high)
+        lowest = self.lows.push(low)
+        return {
+            'Pivot_High': candidate_high if highest == candidate_high else NAN,
+            'Pivot_Low': candidate_low if lowest == candidate_low else NAN,
+        }
+
+
+def _support_resistance(window: int = 20, causal: bool = True):
+    if not causal:
+        raise ValueError("La fenêtre centrée lit des barres futures : seul le mode causal est disponible en continu")
+    return {'support_resistance': StreamingSupportResistance(window)}
+
+
+def _pivots(left: int = 5, right: int = 5, causal: bool = True):
+    if not causal:
+        raise ValueError("Les pivots non causaux lisent des barres futures : seul le mode causal est disponible en continu")
+    return {'pivots': StreamingPivots(left, right)}
+
+
+def _ma(windows: Iterable[int] = (20, 50, 200)):
+    return {f'MA{window}': RollingStats(window) for window in windows}
+
+
+def _volume_ma(window: int = 20):
+    return {'Volume_MA20' if window == 20 else f'Volume_MA{window}': RollingStats(window, 'volume')}
+
+
+# Indicateurs du moteur disponibles en continu : paramètres -> {nom: indicateur}
+STREAMING_INDICATORS = {
+    'ma': _ma,
+    'rsi': lambda period=14, smoothing='sma': {'RSI': StreamingRSI(period, smoothing)},
+    'bollinger': lambda period=20, std=2: {'bollinger': StreamingBollinger(period, std)},
+    'macd': lambda fast=12, slow=26, signal=9: {'macd': StreamingMACD(fast, slow, signal)},
+    'volume_ma': _volume_ma,
+    'vwap': lambda: {'VWAP': StreamingVWAP()},
+    'support_resistance': _support_resistance,
+    'pivots': _pivots,
+}
+
+_TYPES = {cls.__name__: cls for cls in (StreamingEMA, RollingStats, StreamingMACD, StreamingRSI,
+                                        StreamingBollinger, StreamingVWAP, SlidingExtreme,
+                                        StreamingSupportResistance, StreamingPivots)}
+
+
+class IndicatorStream:
+    """
+    Ensemble d'indicateurs incrémentaux d'un symbole
+
+    Accepte les mêmes demandes que IndicatorEngine (parmi STREAMING_INDICATORS)
+    et produit les mêmes colonnes, une barre à la fois.
+    """
+
+    def __init__(self, requests: Iterable[IndicatorRequest] = ('ma', 'rsi', 'bollinger', 'macd', 'volume_ma')):
+        self.indicators: Dict[str, StreamingIndicator] = {}
+        for request in requests:
+            name, params = (request, {}) if isinstance(request, str) else request
+            if name not in STREAMING_INDICATORS:
+                raise ValueError(f"Indicateur non disponible en continu: {name}")
+            self.indicators.update(STREAMING_INDICATORS[name](**params))
+
+    def update(self, bar: Mapping[str, float]) -> Dict[str, float]:
+        """
+        Intègre une nouvelle barre
+
+        Returns:
+            Dict[str, float]: Valeur de chaque colonne après cette barre
+        """
+        values = {}
+        for name, indicator in self.indicators.items():
+            result = indicator.update(bar)
+            if isinstance(result, dict):
+                values.update(result)
+            else:
+                values[name] = result
+        return values
+
+    def warm_up(self, df: pd.DataFrame) -> Optional[Dict[str, float]]:
+        """
+        Rejoue un historique (colonnes Close/close, etc.) pour amorcer les indicateurs
+
+        Returns:
+            Optional[Dict[str, float]]: Valeurs après la dernière barre (None si df est vide)
+        """
+        columns = IndicatorEngine()._columns(df)
+        arrays = {name: df[column].to_numpy(dtype=np.float64, na_value=np.nan) for name, column in columns.items()}
+        values = None
+        for i in range(len(df)):
+            values = self.update({name: array[i] for name, array in arrays.items()})
+        return values
+
+    def state(self) -> Dict[str, Any]:
+        """État de tous les indicateurs (sérialisable en JSON)"""
+        return {name: _dump(indicator) for name, indicator in self.indicators.items()}
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> 'IndicatorStream':
+        """Restaure un ensemble depuis state()"""
+        stream = cls(())
+        stream.indicators = {name: _load(entry) for name, entry in state.items()}
+        return stream
@@ -0,0 +1,298 @@
+"""
+Sérialisation sûre des entrées du cache fichier (sans pickle)
+
+Disposition d'un fichier :
+    MAGIC (8 octets) | version du schéma (uint16 LE) | taille de l'en-tête (uint32 LE)
+    | en-tête JSON | tampons | empreinte blake2b de tout ce qui précède (16 octets)
+
+L'en-tête décrit la valeur sous forme d'arbre JSON ; les tableaux numpy (et
+les colonnes des DataFrames) y sont référencés par leur position dans les
+tampons, alignés sur 64 octets et relus sans conversion. Seuls des types de
+données sont reconstruits : aucun code n'est exécuté au décodage.
+"""
+import hashlib
+import json
+import struct
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'MOEXENT1'
+SCHEMA_VERSION = 1
+ALIGNMENT = 64
+CHECKSUM_SIZE = 16
+
+_PREFIX = struct.Struct('<HI')
+
+
+class CacheFormatError(ValueError):
+    """Fichier de cache illisible : format inconnu, version différente ou contenu corrompu"""
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class _Encoder:
+    """Convertit une valeur en arbre JSON et liste de tampons"""
+
+    def __init__(self):
+        self.buffers: List[np.ndarray] = []
+
+    def array(self, values: np.ndarray) -> dict:
+        if values.dtype.kind == 'O':
+            return {'t': 'objects', 'shape': list(values.shape), 'v': [self.encode(v) for v in values.ravel()]}
+        if values.dtype.kind not in 'biufcmMSU' or values.dtype.hasobject:
+            raise TypeError(f"dtype non sérialisable: {values.dtype}")
+        self.buffers.append(np.ascontiguousarray(values))
+        return {'t': 'array', 'dtype': values.dtype.str, 'shape': list(values.shape), 'buf': len(self.buffers) - 1}
+
+    def index(self, index: pd.Index) -> dict:
+        name = self.encode(index.name) if not isinstance(index, pd.MultiIndex) else None
+        if isinstance(index, pd.RangeIndex):
+            return {'t': 'range', 'start': index.start, 'stop': index.stop, 'step': index.step, 'name': name}
+        if isinstance(index, pd.MultiIndex):
+            return {'t': 'multi', 'levels': [self.index(index.get_level_values(i)) for i in range(index.nlevels)],
+                    'names': [self.encode(n) for n in index.names]}
+        node = {'t': 'index', 'values': self.series_values(index), 'name': name}
+        if getattr(index, 'freqstr', None):
+            node['freq'] = index.freqstr
+        return node
+
+    def series_values(self, values) -> dict:
+        """Valeurs d'une colonne ou d'un index, type pandas compris"""
+        dtype = values.dtype
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            naive = pd.DatetimeIndex(values).tz_convert('UTC').tz_localize(None).as_unit('ns')
+            return {'t': 'datetimetz', 'tz': str(dtype.tz), 'unit': dtype.unit, 'values': self.array(naive.asi8)}
+        if isinstance(dtype, pd.CategoricalDtype):
+            categorical = pd.Categorical(values)
+            return {'t': 'categorical', 'codes': self.array(categorical.codes),
+                    'categories': self.index(categorical.categories), 'ordered': bool(dtype.ordered)}
+        if isinstance(dtype, np.dtype) and dtype.kind != 'O':
+            return self.array(np.asarray(values))
+        # Types d'extension (chaînes, entiers nullables...) : valeurs Python puis dtype restauré
+        return {'t': 'extension', 'dtype': str(dtype), 'values': self.array(np.asarray(values, dtype=object))}
+
+    def encode(self, value: Any):
+        if value is None or isinstance(value, (bool, str)):
+            return value
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value if abs(value) < 2 ** 53 else {'t': 'bigint', 'v': str(value)}
+        if isinstance(value, float):
+            return value if np.isfinite(value) else {'t': 'float', 'v': repr(value)}
+        if isinstance(value, np.ndarray):
+            return self.array(value)
+        if isinstance(value, np.generic):
+            return {'t': 'scalar', 'v': self.array(np.asarray(value).reshape(1))}
+        if isinstance(value, pd.DataFrame):
+            return {'t': 'frame', 'columns': self.index(value.columns), 'index': self.index(value.index),
+                    'data': [self.series_values(value.iloc[:, i]) for i in range(value.shape[1])]}
+        if isinstance(value, pd.Series):
+            return {'t': 'series', 'name': self.encode(value.name), 'index': self.index(value.index),
+                    'values': self.series_values(value)}
+        if isinstance(value, pd.Index):
+            return self.index(value)
+        if value is pd.NaT:
+            return {'t': 'nat'}
+        if value is pd.NA:
+            return {'t': 'na'}
+        if isinstance(value, pd.Timestamp):
+            return {'t': 'timestamp', 'v': value.isoformat()}
+        if isinstance(value, datetime):
+            return {'t': 'datetime', 'v': value.isoformat()}
+        if isinstance(value, date):
+            return {'t': 'date', 'v': value.isoformat()}
+        if isinstance(value, time):
+            return {'t': 'time', 'v': value.isoformat()}
+        if isinstance(value, (pd.Timedelta, timedelta)):
+            return {'t': 'timedelta', 'v': pd.Timedelta(value).as_unit('ns').value}
+        if isinstance(value, Decimal):
+            return {'t': 'decimal', 'v': str(value)}
+        if isinstance(value, complex):
+            return {'t': 'complex', 'v': [self.encode(value.real), self.encode(value.imag)]}
+        if isinstance(value, bytes):
+            return {'t': 'bytes', 'v': self.array(np.frombuffer(value, dtype=np.uint8))}
+        if isinstance(value, list):
+            return {'t': 'list', 'v': [self.encode(v) for v in value]}
+        if isinstance(value, tuple):
+            return {'t': 'tuple', 'v': [self.encode(v) for v in value]}
+        if isinstance(value, (set, frozenset)):
+            return {'t': 'set' if isinstance(value, set) else 'frozenset', 'v': [self.encode(v) for v in value]}
+        if isinstance(value, dict):
+            return {'t': 'dict', 'v': [[self.encode(k), self.encode(v)] for k, v in value.items()]}
+        raise TypeError(f"Type non sérialisable dans le cache: {type(value).__name__}")
+
+
+class _Decoder:
+    """Reconstruit une valeur depuis l'arbre JSON et les tampons du fichier"""
+
+    def __init__(self, data: bytearray, buffers: List[dict]):
+        self.data = data
+        self.buffers = buffers
+
+    def array(self, node: dict) -> np.ndarray:
+        if node['t'] == 'objects':
+            values = np.empty(len(node['v']), dtype=object)
+            values[:] = [self.decode(v) for v in node['v']]
+            return values.reshape(node['shape'])
+        descriptor = self.buffers[node['buf']]
+        dtype = np.dtype(node['dtype'])
+        count = int(np.prod(node['shape'], dtype=np.int64))
+        values = np.frombuffer(self.data, dtype=dtype, count=count, offset=descriptor['offset'])
+        return values.reshape(node['shape'])
+
+    def index(self, node: dict) -> pd.Index:
+        if node['t'] == 'range':
+            return pd.RangeIndex(node['start'], node['stop'], node['step'], name=self.decode(node['name']))
+        if node['t'] == 'multi':
+            levels = [self.index(level) for level in node['levels']]
+            return pd.MultiIndex.from_arrays(levels, names=[self.decode(n) for n in node['names']])
+        index = pd.Index(self.series_values(node['values']), name=self.decode(node['name']), copy=False)
+        if 'freq' in node:
+            index = type(index)(index, freq=node['freq'])
+        return index
+
+    def series_values(self, node: dict):
+        kind = node['t']
+        if kind == 'datetimetz':
+            values = self.array(node['values']).view('datetime64[ns]')
+            return pd.DatetimeIndex(values).tz_localize('UTC').tz_convert(node['tz']).as_unit(node['unit'])
+        if kind == 'categorical':
+            return pd.Categorical.from_codes(self.array(node['codes']), self.index(node['categories']),
+                                             ordered=node['ordered'])
+        if kind == 'extension':
+            return pd.array(self.array(node['values']), dtype=node['dtype'])
+        return self.array(node)
+
+    def decode(self, node):
+        if not isinstance(node, dict):
+            return node
+        kind = node['t']
+        if kind in ('array', 'objects'):
+            return self.array(node)
+        if kind == 'frame':
+            columns = self.index(node['columns'])
+            index = self.index(node['index'])
+            data = {i: self.series_values(values) for i, values in enumerate(node['data'])}
+            frame = pd.DataFrame(data, index=index, copy=False)
+            frame.columns = columns
+            return frame
+        if kind == 'series':
+            return pd.Series(self.series_values(node['values']), index=self.index(node['index']),
+                             name=self.decode(node['name']), copy=False)
+        if kind in ('range', 'multi', 'index'):
+            return self.index(node)
+        if kind == 'scalar':
+            return self.array(node['v'])[0]
+        if kind == 'bigint':
+            return int(node['v'])
+        if kind == 'float':
+            return float(node['v'])
+        if kind == 'nat':
+            return pd.NaT
+        if kind == 'na':
+            return pd.NA
+        if kind == 'timestamp':
+            return pd.Timestamp(node['v'])
+        if kind == 'datetime':
+            return datetime.fromisoformat(node['v'])
+        if kind == 'date':
+            return date.fromisoformat(node['v'])
+        if kind == 'time':
+            return time.fromisoformat(node['v'])
+        if kind == 'timedelta':
+            return pd.Timedelta(node['v'], unit='ns')
+        if kind == 'decimal':
+            return Decimal(node['v'])
+        if kind == 'complex':
+            return complex(self.decode(node['v'][0]), self.decode(node['v'][1]))
+        if kind == 'bytes':
+            return self.array(node['v']).tobytes()
+        if kind == 'list':
+            return [self.decode(v) for v in node['v']]
+        if kind == 'tuple':
+            return tuple(self.decode(v) for v in node['v'])
+        if kind == 'set':
+            return {self.decode(v) for v in node['v']}
+        if kind == 'frozenset':
+            return frozenset(self.decode(v) for v in node['v'])
+        if kind == 'dict':
+            return {self.decode(k): self.decode(v) for k, v in node['v']}
+        raise CacheFormatError(f"Type inconnu dans l'entrée de cache: {kind}")
+
+
+def encode_entry(value: Any, meta: Dict[str, Any]) -> List[bytes]:
+    """
+    Sérialise une valeur et ses métadonnées
+
+    Returns:
+        List[bytes]: Morceaux du fichier, à écrire dans l'ordre
+
+    Raises:
+        TypeError: Si la valeur contient un type non pris en charge
+    """
+    encoder = _Encoder()
+    tree = encoder.encode(value)
+
+    # Les décalages dépendent de la taille de l'en-tête qui les contient : itérer jusqu'à stabilité
+    descriptors = [{'offset': 0, 'nbytes': values.nbytes} for values in encoder.buffers]
+    header = {'meta': meta, 'value': tree, 'buffers': descriptors}
+    while True:
+        header_bytes = json.dumps(header, ensure_ascii=False, allow_nan=False).encode('utf-8')
+        offsets = []
+        offset = _align(len(MAGIC) + _PREFIX.size + len(header_bytes))
+        for values in encoder.buffers:
+            offsets.append(offset)
+            offset = _align(offset + values.nbytes)
+        if offsets == [d['offset'] for d in descriptors]:
+            break
+        for descriptor, value in zip(descriptors, offsets):
+            descriptor['offset'] = value
+
+    chunks = [MAGIC, _PREFIX.pack(SCHEMA_VERSION, len(header_bytes)), header_bytes]
+    position = len(MAGIC) + _PREFIX.size + len(header_bytes)
+    for descriptor, values in zip(descriptors, encoder.buffers):
+        chunks.append(b'\0' * (descriptor['offset'] - position))
+        chunks.append(values.tobytes())
+        position = descriptor['offset'] + values.nbytes
+
+    digest = hashlib.blake2b(digest_size=CHECKSUM_SIZE)
+    for chunk in chunks:
+        digest.update(chunk)
+    chunks.append(digest.digest())
+    return chunks
+
+
+def read_meta(data: bytearray) -> Tuple[Dict[str, Any], dict]:
+    """
+    Vérifie un fichier lu en mémoire et retourne (métadonnées, en-tête)
+
+    Raises:
+        CacheFormatError: Si le format, la version ou l'empreinte ne correspondent pas
+    """
+    body = memoryview(data)[:-CHECKSUM_SIZE]
+    if len(data) < len(MAGIC) + _PREFIX.size + CHECKSUM_SIZE or bytes(body[:len(MAGIC)]) != MAGIC:
+        raise CacheFormatError("Format d'entrée de cache inconnu")
+    version, header_size = _PREFIX.unpack_from(data, len(MAGIC))
+    if version != SCHEMA_VERSION:
+        raise CacheFormatError(f"Version de schéma non supportée: {version}")
+    if hashlib.blake2b(body, digest_size=CHECKSUM_SIZE).digest() != bytes(data[-CHECKSUM_SIZE:]):
+        raise CacheFormatError("Empreinte invalide (fichier tronqué ou corrompu)")
+    start = len(MAGIC) + _PREFIX.size
+    try:
+        header = json.loads(bytes(data[start:start + header_size]).decode('utf-8'))
+        return dict(header['meta']), header
+    except (UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise CacheFormatError(f"En-tête illisible: {e}") from e
+
+
+def decode_entry(data: bytearray, header: dict) -> Any:
+    """Reconstruit la valeur d'un fichier vérifié par read_meta (tableaux partagés avec `data`)"""
+    try:
+        return _Decoder(data, header['buffers']).decode(header['value'])
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise CacheFormatError(f"Entrée de cache invalide: {e}") from e
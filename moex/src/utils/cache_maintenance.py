@@ -0,0 +1,230 @@
+"""
+Maintenance des répertoires de cache : budget disque, éviction LRU/TTL et balayage périodique
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .constants import CACHE_SWEEP_INTERVAL
+
+# Fichiers temporaires d'écritures atomiques abandonnées, supprimés au-delà de cet âge
+TMP_MAX_AGE = 3600
+
+
+class CacheDirectory:
+    """
+    Répertoire de cache borné en taille
+
+    Chaque balayage supprime d'abord les entrées expirées, puis les moins
+    récemment utilisées jusqu'à repasser sous le budget. L'usage d'une entrée
+    est lu dans sa date d'accès (à défaut de modification) : les propriétaires
+    du cache la mettent à jour via touch() à chaque lecture.
+
+    Avec mtime_is_expiry, la date de modification d'un fichier porte sa date
+    d'expiration (TTL propre à chaque entrée, sans ouvrir le fichier).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        max_age: Optional[float] = None,
+        mtime_is_expiry: bool = False,
+        recursive: bool = True,
+        name: Optional[str] = None
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.mtime_is_expiry = mtime_is_expiry
+        self.recursive = recursive
+        self.name = name or os.path.basename(os.path.normpath(path))
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'corrupt': 0,
+            'evictions': 0,
+            'expired': 0,
+            'sweeps': 0,
+            'entries': 0,
+            'bytes': 0,
+            'last_sweep': None
+        }
+        os.makedirs(path, exist_ok=True)
+
+    def _scan(self) -> List[Tuple[str, os.stat_result]]:
+        """Liste les fichiers du répertoire avec leurs métadonnées"""
+        entries = []
+        stack = [self.path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.recursive:
+                                    stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                entries.append((entry.path, entry.stat(follow_symlinks=False)))
+                        except FileNotFoundError:
+                            continue
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def _is_expired(self, path: str, st: os.stat_result, now: float) -> bool:
+        if path.endswith('.tmp'):
+            return now - st.st_mtime > TMP_MAX_AGE
+        if self.mtime_is_expiry:
+            return st.st_mtime <= now
+        return self.max_age is not None and now - st.st_mtime > self.max_age
+
+    def _last_used(self, st: os.stat_result) -> float:
+        if self.mtime_is_expiry:
+            return st.st_atime
+        return max(st.st_atime, st.st_mtime)
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Supprime les entrées expirées puis les plus anciennes au-delà du budget
+
+        Returns:
+            Dict[str, int]: Nombre d'entrées expirées et évincées par ce balayage
+        """
+        now = time.time() if now is None else now
+        expired = evicted = 0
+        live = []
+        for path, st in self._scan():
+            if self._is_expired(path, st, now):
+                expired += self._remove(path)
+            else:
+                live.append((self._last_used(st), st.st_size, path))
+
+        total = sum(size for _, size, _ in live)
+        entries = len(live)
+        if total > self.max_bytes:
+            live.sort()
+            for _, size, path in live:
+                if total <= self.max_bytes:
+                    break
+                if self._remove(path):
+                    evicted += 1
+                total -= size
+                entries -= 1
+
+        with self._lock:
+            self._counters['expired'] += expired
+            self._counters['evictions'] += evicted
+            self._counters['sweeps'] += 1
+            self._counters['entries'] = entries
+            self._counters['bytes'] = total
+            self._counters['last_sweep'] = now
+        return {'expired': expired, 'evicted': evicted}
+
+    @staticmethod
+    def touch(path: str):
+        """Enregistre un accès à une entrée (date d'accès, date de modification conservée)"""
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+
+    def record_hit(self):
+        with self._lock:
+            self._counters['hits'] += 1
+
+    def record_miss(self):
+        with self._lock:
+            self._counters['misses'] += 1
+
+    def record_corrupt(self):
+        """Compte une entrée illisible (tronquée, corrompue ou d'un autre format), écartée à la lecture"""
+        with self._lock:
+            self._counters['corrupt'] += 1
+
+    def stats(self) -> dict:
+        """Compteurs du répertoire (entrées et octets au dernier balayage)"""
+        with self._lock:
+            stats = dict(self._counters, max_bytes=self.max_bytes, path=self.path)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+class CacheJanitor:
+    """Balaye périodiquement les répertoires de cache enregistrés (thread démon)"""
+
+    def __init__(self, interval: float = CACHE_SWEEP_INTERVAL):
+        self.interval = interval
+        self._directories: Dict[str, CacheDirectory] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, directory: CacheDirectory) -> CacheDirectory:
+        """Enregistre un répertoire (celui déjà enregistré pour le même chemin est retourné)"""
+        key = os.path.abspath(directory.path)
+        with self._lock:
+            return self._directories.setdefault(key, directory)
+
+    def sweep_all(self) -> Dict[str, Dict[str, int]]:
+        """Balaye tous les répertoires enregistrés"""
+        with self._lock:
+            directories = list(self._directories.values())
+        results = {}
+        for directory in directories:
+            try:
+                results[directory.name] = directory.sweep()
+            except Exception as e:
+                print(f"Erreur maintenance cache {directory.path}: {e}")
+        return results
+
+    def start(self):
+        """Démarre le balayage périodique (sans effet s'il tourne déjà)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='cache-janitor', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Arrête le balayage périodique"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        self.sweep_all()
+        while not self._stop.wait(self.interval):
+            self.sweep_all()
+
+    def stats(self) -> Dict[str, dict]:
+        """Statistiques de chaque répertoire enregistré"""
+        with self._lock:
+            directories = list(self._directories.values())
+        return {directory.name: directory.stats() for directory in directories}
+
+
+_janitor: Optional[CacheJanitor] = None
+_janitor_lock = threading.Lock()
+
+
+def get_cache_janitor() -> CacheJanitor:
+    """Retourne le balayeur partagé par tout le processus"""
+    global _janitor
+    if _janitor is None:
+        with _janitor_lock:
+            if _janitor is None:
+                _janitor = CacheJanitor()
+    return _janitor
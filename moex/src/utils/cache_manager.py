@@ -1,126 +1,300 @@
 """
 Gestionnaire de cache avec persistance fichier
 """
-import pickle
-import hashlib
-import json
 import os
-from datetime import datetime, timedelta
+import tempfile
+import threading
+import time
 from functools import wraps
-from typing import Any, Callable, Optional
-import streamlit as st
+from typing import Any, Callable, Optional, Union
+
+from .singleflight import SingleFlight
+from .cache_codec import CacheFormatError, decode_entry, encode_entry, read_meta
+from .cache_maintenance import CacheDirectory, CacheJanitor, get_cache_janitor
+from .constants import CACHE_DISK_LIMITS, CACHE_MEMORY_LIMITS
+from .fingerprint import fingerprint, function_identity
+from .memory_cache import MemoryCache
+from .revalidation import get_revalidator
+from .time_utils import get_cache_ttl
 
 CACHE_DIR = "cache"
+_MISSING = object()
+
+def _discard(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
 
 class CacheManager:
     """Gestionnaire de cache avec support fichier et mémoire"""
     
-    def __init__(self, cache_dir: str = CACHE_DIR):
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        max_bytes: int = CACHE_DISK_LIMITS['cache'],
+        janitor: Optional[CacheJanitor] = None,
+        max_memory_entries: int = CACHE_MEMORY_LIMITS['entries'],
+        max_memory_bytes: int = CACHE_MEMORY_LIMITS['bytes']
+    ):
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
-        self.memory_cache = {}
+        self.memory_cache = MemoryCache(max_memory_entries, max_memory_bytes)
+        # Un seul calcul par clé manquante, quel que soit le nombre de sessions qui la demandent
+        self.flights = SingleFlight()
+        
+        # Répertoire borné : la date de modification de chaque fichier porte son expiration
+        self.directory = CacheDirectory(cache_dir, max_bytes, mtime_is_expiry=True)
+        self.janitor = janitor or get_cache_janitor()
+        self.directory = self.janitor.register(self.directory)
+        self.janitor.start()
     
     def _get_file_path(self, key: str) -> str:
-        """Retourne le chemin du fichier cache"""
-        return os.path.join(self.cache_dir, f"{key}.pkl")
+        """
+        Retourne le chemin du fichier cache
+        
+        Les entrées sont réparties dans 256 sous-répertoires selon l'empreinte
+        de la clé, pour garder des répertoires courts à lister.
+        """
+        name = fingerprint(key)
+        return os.path.join(self.cache_dir, name[:2], f"{name}.ent")
     
     def _generate_key(self, func_name: str, args: tuple, kwargs: dict) -> str:
-        """Génère une clé unique pour la fonction et ses arguments"""
-        key_data = {
-            'function': func_name,
-            'args': args,
-            'kwargs': kwargs
-        }
-        key_str = json.dumps(key_data, sort_keys=True, default=str)
-        return hashlib.md5(key_str.encode()).hexdigest()
+        """Génère une clé unique, stable d'un processus à l'autre, pour la fonction et ses arguments"""
+        return fingerprint(func_name, args, kwargs)
     
-    def get(self, key: str, default: Any = None) -> Any:
+    def get(self, key: str, default: Any = None, namespace: str = 'default') -> Any:
         """Récupère une valeur du cache"""
         # Essayer le cache mémoire d'abord
-        if key in self.memory_cache:
-            cached = self.memory_cache[key]
-            if cached['expires'] > datetime.now():
-                return cached['value']
-            else:
-                del self.memory_cache[key]
-        
-        # Essayer le cache fichier
+        cached = self.memory_cache.get(key, _MISSING, namespace)
+        if cached is _MISSING:
+            cached = self._load_file(key, namespace)
+        return default if cached is _MISSING else cached
+    
+    def _load_file(self, key: str, namespace: str) -> Any:
+        """Lit une entrée du cache fichier et la remet en mémoire (_MISSING si absente ou expirée)"""
         file_path = self._get_file_path(key)
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'rb') as f:
-                    cached = pickle.load(f)
-                    if cached['expires'] > datetime.now():
-                        # Restaurer dans le cache mémoire
-                        self.memory_cache[key] = cached
-                        return cached['value']
-                    else:
-                        os.remove(file_path)
-            except:
-                pass
+        try:
+            # Les fichiers sont remplacés par renommage, jamais réécrits : la taille lue est celle du fichier ouvert
+            with open(file_path, 'rb') as f:
+                data = bytearray(os.fstat(f.fileno()).st_size)
+                size = f.readinto(data)
+            if size != len(data):
+                raise CacheFormatError("Lecture incomplète")
+            meta, header = read_meta(data)
+            remaining = meta.get('expires', 0) - time.time()
+            if meta.get('key') == key and remaining > 0:
+                value = decode_entry(data, header)
+                # Restaurer dans le cache mémoire pour la durée restante
+                self.memory_cache.set(key, value, remaining, namespace)
+                self.directory.touch(file_path)
+                self.directory.record_hit()
+                return value
+            if remaining <= 0:
+                _discard(file_path)
+        except FileNotFoundError:
+            pass
+        except (OSError, CacheFormatError) as e:
+            print(f"Entrée de cache illisible {file_path}: {e}")
+            self.directory.record_corrupt()
+            _discard(file_path)
         
-        return default
+        self.directory.record_miss()
+        return _MISSING
+    
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: int = 300,
+        namespace: str = 'default',
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Retourne la valeur en cache ou la calcule une seule fois pour tous les appelants
+        
+        Les appelants concurrents d'une même clé manquante attendent le calcul
+        en cours au lieu de le relancer. La valeur retournée est partagée :
+        elle ne doit pas être modifiée.
+        
+        Args:
+            key: Clé du cache
+            compute: Fonction sans argument produisant la valeur
+            ttl: Durée de vie en secondes
+            namespace: Espace de noms des compteurs
+            cacheable: Si fourni, une valeur pour laquelle il retourne False est
+                retournée sans être mise en cache (ex: résultat partiel)
+        """
+        cached = self.memory_cache.get(key, _MISSING, namespace)
+        if cached is not _MISSING:
+            return cached
+        return self.flights.do(key, self._load_or_compute, key, compute, ttl, namespace, cacheable)
+    
+    def get_or_revalidate(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: int = 300,
+        stale_ttl: int = 300,
+        namespace: str = 'default',
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Comme get_or_compute(), mais sert une valeur périmée sans attendre
+        
+        Pendant `stale_ttl` secondes après son expiration, la dernière valeur
+        est retournée immédiatement et recalculée en arrière-plan ; seul un
+        appel sans aucune valeur disponible attend le calcul.
+        
+        Args:
+            key: Clé du cache
+            compute: Fonction sans argument produisant la valeur
+            ttl: Durée pendant laquelle la valeur est fraîche (secondes)
+            stale_ttl: Durée supplémentaire pendant laquelle elle peut être servie périmée
+            namespace: Espace de noms des compteurs
+            cacheable: Voir get_or_compute()
+        """
+        def load():
+            return time.time() + ttl, compute()
+        
+        keep = None if cacheable is None else lambda entry: cacheable(entry[1])
+        fresh_until, value = self.get_or_compute(key, load, ttl + stale_ttl, namespace, keep)
+        if time.time() >= fresh_until:
+            get_revalidator().submit(
+                ('cache', self.cache_dir, key), self._revalidate, key, load, ttl + stale_ttl, namespace, keep
+            )
+        return value
+    
+    def _revalidate(self, key: str, load: Callable[[], Any], ttl: int, namespace: str, cacheable=None):
+        entry = load()
+        if cacheable is None or cacheable(entry):
+            self.set(key, entry, ttl, namespace)
     
-    def set(self, key: str, value: Any, ttl: int = 300):
-        """Stocke une valeur dans le cache"""
-        expires = datetime.now() + timedelta(seconds=ttl)
-        cached_data = {
-            'value': value,
-            'expires': expires,
-            'created': datetime.now()
-        }
+    def _load_or_compute(
+        self, key: str, compute: Callable[[], Any], ttl: int, namespace: str, cacheable=None
+    ) -> Any:
+        # Le calcul précédent a pu se terminer entre la lecture et la prise du verrou
+        cached = self.memory_cache.peek(key, _MISSING)
+        if cached is _MISSING:
+            cached = self._load_file(key, namespace)
+        if cached is _MISSING:
+            cached = compute()
+            if cacheable is None or cacheable(cached):
+                self.set(key, cached, ttl, namespace)
+        return cached
+    
+    def set(self, key: str, value: Any, ttl: int = 300, namespace: str = 'default', persist: bool = True):
+        """
+        Stocke une valeur dans le cache
+        
+        Le fichier est écrit à côté puis renommé : un lecteur concurrent voit
+        l'ancienne entrée ou la nouvelle, jamais un fichier partiel. Une valeur
+        que le format de cache ne sait pas représenter reste en mémoire seulement.
+        
+        Args:
+            persist: Si False, la valeur reste en mémoire seulement (valeurs
+                sans intérêt après un redémarrage, ex: propres à une session)
+        """
+        now = time.time()
+        expires = now + ttl
         
         # Cache mémoire
-        self.memory_cache[key] = cached_data
+        self.memory_cache.set(key, value, ttl, namespace)
+        if not persist:
+            return
         
         # Cache fichier
         try:
-            file_path = self._get_file_path(key)
-            with open(file_path, 'wb') as f:
-                pickle.dump(cached_data, f)
-        except Exception as e:
+            chunks = encode_entry(value, {'key': key, 'namespace': namespace, 'created': now, 'expires': expires})
+        except TypeError as e:
+            print(f"Valeur non persistée ({key}): {e}")
+            return
+        
+        file_path = self._get_file_path(key)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.writelines(chunks)
+            # Date d'accès = dernier usage, date de modification = expiration
+            os.utime(tmp_path, (now, expires))
+            os.replace(tmp_path, file_path)
+        except OSError as e:
             print(f"Erreur sauvegarde cache: {e}")
+            if tmp_path is not None:
+                _discard(tmp_path)
     
     def clear(self):
         """Vide tous les caches"""
         self.memory_cache.clear()
-        for file in os.listdir(self.cache_dir):
-            os.remove(os.path.join(self.cache_dir, file))
+        for root, _, files in os.walk(self.cache_dir):
+            for file in files:
+                _discard(os.path.join(root, file))
+    
+    def stats(self) -> dict:
+        """Statistiques du cache (disque au dernier balayage, niveau mémoire sous 'memory')"""
+        return dict(self.directory.stats(), memory=self.memory_cache.stats(), computations=self.flights.stats())
+
+# Instance globale, créée au premier usage
+_cache_manager: Optional[CacheManager] = None
+_cache_manager_lock = threading.Lock()
 
-# Instance globale
-_cache_manager = CacheManager()
+def get_cache_manager() -> CacheManager:
+    """Retourne le gestionnaire de cache partagé par tout le processus"""
+    global _cache_manager
+    if _cache_manager is None:
+        with _cache_manager_lock:
+            if _cache_manager is None:
+                _cache_manager = CacheManager()
+    return _cache_manager
 
-def cache(ttl: int = 300):
+def cache(
+    ttl: Union[int, str] = 300,
+    version: Optional[str] = None,
+    stale_ttl: int = 0,
+    cacheable: Optional[Callable[[Any], bool]] = None
+):
     """
     Décorateur pour mettre en cache les résultats des fonctions
     
+    La clé est l'empreinte du contenu des arguments (tampons des DataFrames
+    et tableaux compris) et de l'identité de la fonction : elle reste valable
+    après un redémarrage et change dès que le code ou `version` change.
+    Les appels dont un argument n'a pas d'empreinte stable ne sont pas mis en cache.
+    
+    Les résultats sont partagés par toutes les sessions du processus et ne
+    doivent pas être modifiés par les appelants.
+    
     Args:
-        ttl: Durée de vie en secondes
+        ttl: Durée de vie en secondes, ou catégorie de CACHE_TTL (ex: 'market_data')
+            dont la durée suit la phase du marché (voir get_cache_ttl)
+        version: Version des résultats, à incrémenter pour les invalider
+        stale_ttl: Si non nul, durée pendant laquelle un résultat expiré est encore
+            servi immédiatement, pendant son recalcul en arrière-plan
+        cacheable: Si fourni, les résultats pour lesquels il retourne False ne sont
+            pas mis en cache (ex: résultat partiel après une erreur réseau)
     """
     def decorator(func: Callable):
+        identity = function_identity(func, version)
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Vérifier d'abord le cache session Streamlit
-            cache_key = f"{func.__name__}_{hash(str(args))}_{hash(str(kwargs))}"
-            
-            if cache_key in st.session_state.get('data_cache', {}):
-                cached = st.session_state.data_cache[cache_key]
-                age = (datetime.now() - cached['timestamp']).total_seconds()
-                if age < ttl:
-                    return cached['value']
-            
-            # Exécuter la fonction
-            result = func(*args, **kwargs)
-            
-            # Stocker dans le cache session
-            if 'data_cache' not in st.session_state:
-                st.session_state.data_cache = {}
-            
-            st.session_state.data_cache[cache_key] = {
-                'value': result,
-                'timestamp': datetime.now()
-            }
+            try:
+                cache_key = fingerprint(identity, args, kwargs)
+            except TypeError:
+                return func(*args, **kwargs)
             
-            return result
+            # Cache partagé par toutes les sessions du processus
+            manager = get_cache_manager()
+            seconds = get_cache_ttl(ttl) if isinstance(ttl, str) else ttl
+            if stale_ttl:
+                return manager.get_or_revalidate(
+                    cache_key, lambda: func(*args, **kwargs), seconds, stale_ttl,
+                    namespace=func.__qualname__, cacheable=cacheable
+                )
+            return manager.get_or_compute(
+                cache_key, lambda: func(*args, **kwargs), seconds, namespace=func.__qualname__, cacheable=cacheable
+            )
         return wrapper
     return decorator
\ No newline at end of file
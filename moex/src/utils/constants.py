@@ -27,6 +27,12 @@ RUSSIAN_HOLIDAYS_2024 = [
     '2024-12-31',
 ]
 
+# Watchlist par défaut
+DEFAULT_WATCHLIST = [
+    'SBER', 'GAZP', 'LKOH', 'ROSN', 'GMKN',
+    'YNDX', 'MTSS', 'NVTK', 'MGNT', 'TATN'
+]
+
 # Mapping des secteurs
 SECTOR_MAPPING = {
     'energy': 'Énergie',
@@ -47,6 +53,25 @@ CACHE_TTL = {
     'indices': 60         # 1 minute
 }
 
+# Séance : TTL réduits près de l'ouverture et de la clôture, plancher des TTL réduits (secondes)
+MARKET_EDGE_WINDOW = 15 * 60
+MARKET_EDGE_TTL_FACTOR = 0.5
+MIN_CACHE_TTL = 5
+
+# Budgets disque des répertoires de cache (octets) et période de balayage (secondes)
+CACHE_DISK_LIMITS = {
+    'cache': 512 * 1024 ** 2,
+    'history': 256 * 1024 ** 2,
+    'legacy': 64 * 1024 ** 2
+}
+CACHE_SWEEP_INTERVAL = 300
+
+# Limites du cache mémoire (nombre d'entrées et octets estimés)
+CACHE_MEMORY_LIMITS = {
+    'entries': 512,
+    'bytes': 256 * 1024 ** 2
+}
+
 # Configuration email
 EMAIL_CONFIG = {
     'smtp_server': 'smtp.gmail.com',
@@ -0,0 +1,161 @@
+"""
+Empreintes de contenu stables (identiques d'un processus à l'autre)
+"""
+import hashlib
+import struct
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+DIGEST_SIZE = 16
+
+
+class _Hasher:
+    """Encodage canonique, préfixé par type, des valeurs vers un blake2b"""
+
+    def __init__(self):
+        self._hash = hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+    def _tag(self, tag: bytes, payload: bytes = b''):
+        # Longueur explicite : deux séquences différentes ne peuvent pas s'encoder pareil
+        self._hash.update(tag + struct.pack('<Q', len(payload)) + payload)
+
+    def _text(self, tag: bytes, text: str):
+        self._tag(tag, text.encode('utf-8', 'surrogatepass'))
+
+    def _array(self, values: np.ndarray):
+        if values.dtype.kind == 'O':
+            self._tag(b'aO', struct.pack('<Q', values.size))
+            for item in values.ravel(order='C'):
+                self.update(item)
+            return
+        self._text(b'ad', values.dtype.str + repr(values.shape))
+        self._tag(b'ab', np.ascontiguousarray(values).tobytes())
+
+    def _index(self, index: pd.Index):
+        if isinstance(index, pd.MultiIndex):
+            self._tag(b'im', struct.pack('<Q', index.nlevels))
+            for level in range(index.nlevels):
+                self._index(index.get_level_values(level))
+            return
+        if isinstance(index, pd.DatetimeIndex):
+            self._text(b'it', str(index.tz))
+            self._array(index.as_unit('ns').asi8)
+            return
+        self._tag(b'ix')
+        self._array(np.asarray(index))
+
+    def _items(self, tag: bytes, items):
+        # Ordre indépendant de l'insertion : tri par empreinte de chaque élément
+        self._text(tag, ''.join(sorted(items)))
+
+    def update(self, value: Any):
+        if value is None:
+            self._tag(b'N')
+        elif value is pd.NA or value is Ellipsis:
+            self._text(b'n', repr(value))
+        elif isinstance(value, bool):
+            self._tag(b'b', b'\x01' if value else b'\x00')
+        elif isinstance(value, Enum):
+            self._text(b'e', f"{type(value).__module__}.{type(value).__qualname__}.{value.name}")
+        elif isinstance(value, int):
+            self._text(b'i', str(value))
+        elif isinstance(value, float):
+            self._text(b'f', float.hex(value))
+        elif isinstance(value, complex):
+            self._text(b'c', f"{float.hex(value.real)},{float.hex(value.imag)}")
+        elif isinstance(value, str):
+            self._text(b's', value)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            self._tag(b'y', bytes(value))
+        elif isinstance(value, np.ndarray):
+            self._array(value)
+        elif isinstance(value, np.generic):
+            self._array(np.asarray(value))
+        elif isinstance(value, pd.DataFrame):
+            self._tag(b'D', struct.pack('<Q', value.shape[1]))
+            self._index(value.columns)
+            self._index(value.index)
+            for _, column in value.items():
+                self._text(b'dt', str(column.dtype))
+                self._array(column.to_numpy())
+        elif isinstance(value, pd.Series):
+            self._tag(b'S')
+            self.update(value.name)
+            self._index(value.index)
+            self._text(b'dt', str(value.dtype))
+            self._array(value.to_numpy())
+        elif isinstance(value, pd.Index):
+            self._index(value)
+        elif isinstance(value, pd.Timestamp):
+            self._text(b'T', f"{value.as_unit('ns').value}|{value.tz}")
+        elif isinstance(value, (datetime, date, time)):
+            self._text(b't', value.isoformat())
+        elif isinstance(value, (timedelta, pd.Timedelta)):
+            self._text(b'd', str(pd.Timedelta(value).as_unit('ns').value))
+        elif isinstance(value, Decimal):
+            self._text(b'm', str(value))
+        elif isinstance(value, (list, tuple)):
+            self._tag(b'l' if isinstance(value, list) else b'u', struct.pack('<Q', len(value)))
+            for item in value:
+                self.update(item)
+        elif isinstance(value, dict):
+            self._items(b'M', (fingerprint(k) + fingerprint(v) for k, v in value.items()))
+        elif isinstance(value, (set, frozenset)):
+            self._items(b'E', (fingerprint(item) for item in value))
+        elif hasattr(value, '__fingerprint__'):
+            self._text(b'o', f"{type(value).__module__}.{type(value).__qualname__}")
+            self.update(value.__fingerprint__())
+        else:
+            raise TypeError(f"Impossible de calculer l'empreinte d'un objet {type(value).__name__}")
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def fingerprint(*values: Any) -> str:
+    """
+    Empreinte blake2b du contenu des valeurs
+
+    Les tableaux numpy, DataFrames et séries sont hachés par leurs tampons
+    (avec dtype, forme, colonnes et index) ; l'empreinte ne dépend ni de
+    l'adresse des objets ni de la graine de hash() du processus.
+
+    Args:
+        *values: Valeurs à hacher (scalaires, conteneurs, numpy, pandas, ou
+            objets exposant __fingerprint__())
+
+    Returns:
+        str: Empreinte hexadécimale
+
+    Raises:
+        TypeError: Si une valeur n'a pas de représentation stable
+    """
+    hasher = _Hasher()
+    hasher.update(values)
+    return hasher.hexdigest()
+
+
+def _code_parts(code) -> tuple:
+    """Bytecode et constantes d'un objet code (fonctions imbriquées comprises)"""
+    return code.co_code, tuple(
+        _code_parts(const) if hasattr(const, 'co_code') else const for const in code.co_consts
+    )
+
+
+def function_identity(func: Callable, version: Optional[str] = None) -> str:
+    """
+    Identité d'une fonction : module, nom qualifié, version et bytecode
+
+    Modifier le corps de la fonction, ou incrémenter `version`, change
+    l'identité et invalide donc les résultats mémorisés.
+    """
+    func = getattr(func, '__wrapped__', func)
+    code = getattr(func, '__code__', None)
+    body = fingerprint(_code_parts(code)) if code is not None else ''
+    return f"{func.__module__}.{func.__qualname__}:{version or ''}:{body}"
+
@@ -23,3 +23,29 @@ def format_percentage(value: float, decimals: int = 2) -> str:
         return "N/A"
     sign = "+" if value > 0 else ""
     return f"{sign}{value:.{decimals}f}%"
+
+def format_large_number(value: float) -> str:
+    """Formate un grand nombre (volumes, capitalisations)"""
+    if value is None:
+        return "N/A"
+    
+    if abs(value) >= 1e9:
+        return f"{value/1e9:.2f} млрд"
+    elif abs(value) >= 1e6:
+        return f"{value/1e6:.2f} млн"
+    elif abs(value) >= 1e3:
+        return f"{value/1e3:.1f} тыс"
+    else:
+        return f"{value:,.0f}"
+
+def format_age(seconds: float) -> str:
+    """Formate l'âge d'une donnée (ex: "45 s", "12 min", "3 h", "2 j")"""
+    if seconds is None or seconds != seconds or seconds == float('inf'):
+        return "N/A"
+    if seconds < 60:
+        return f"{seconds:.0f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 86400:
+        return f"{seconds / 3600:.0f} h"
+    return f"{seconds / 86400:.0f} j"
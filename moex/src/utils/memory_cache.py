@@ -0,0 +1,167 @@
+"""
+Cache mémoire borné (LRU + TTL par entrée) avec compteurs par espace de noms
+"""
+import sys
+import threading
+import time
+from typing import Any, Dict, Hashable
+
+import numpy as np
+import pandas as pd
+from cachetools import TLRUCache
+
+from .constants import CACHE_MEMORY_LIMITS
+
+# Coût estimé d'un objet Python référencé par une colonne ou un tableau d'objets
+OBJECT_OVERHEAD = 64
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Estime l'empreinte mémoire d'une valeur en octets
+
+    Les DataFrames, séries et tableaux numpy sont mesurés par leurs tampons
+    (plus un coût forfaitaire par objet pour les colonnes de texte), sans
+    parcourir les valeurs ; les conteneurs sont mesurés récursivement.
+    """
+    if isinstance(value, np.ndarray):
+        size = value.nbytes
+        if value.dtype.kind == 'O':
+            size += OBJECT_OVERHEAD * value.size
+        return size
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = int(value.memory_usage(index=True, deep=False).sum())
+        dtypes = value.dtypes if isinstance(value, pd.DataFrame) else [value.dtype]
+        objects = sum(1 for dtype in dtypes if dtype == object)
+        return size + OBJECT_OVERHEAD * objects * len(value)
+    if isinstance(value, pd.Index):
+        return value.memory_usage(deep=False)
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if _depth < 4:
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(
+                estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items()
+            )
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return sys.getsizeof(value) + sum(estimate_size(v, _depth + 1) for v in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ('value', 'expires', 'size', 'namespace')
+
+    def __init__(self, value: Any, expires: float, size: int, namespace: str):
+        self.value = value
+        self.expires = expires
+        self.size = size
+        self.namespace = namespace
+
+
+class _BoundedTLRUCache(TLRUCache):
+    """TLRUCache borné en octets, qui compte ses évictions LRU"""
+
+    def __init__(self, maxsize: int, timer):
+        super().__init__(maxsize, ttu=lambda key, entry, now: entry.expires, timer=timer,
+                         getsizeof=lambda entry: entry.size)
+        self.evictions = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+
+class MemoryCache:
+    """
+    Cache mémoire borné en nombre d'entrées et en octets estimés
+
+    Les entrées expirent à leur TTL propre ; au-delà des limites, les moins
+    récemment utilisées sont évincées. Une valeur plus grosse que le budget
+    entier n'est pas conservée.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MEMORY_LIMITS['entries'],
+        max_bytes: int = CACHE_MEMORY_LIMITS['bytes'],
+        timer=time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timer = timer
+        self._cache = _BoundedTLRUCache(max_bytes, timer)
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, Dict[str, int]] = {}
+        self._rejected = 0
+
+    def _count(self, namespace: str, counter: str):
+        counters = self._namespaces.setdefault(namespace, {'hits': 0, 'misses': 0})
+        counters[counter] += 1
+
+    def get(self, key: Hashable, default: Any = None, namespace: str = 'default') -> Any:
+        """Récupère une valeur non expirée (default sinon)"""
+        with self._lock:
+            entry = self._cache.get(key)
+            self._count(namespace, 'misses' if entry is None else 'hits')
+        return default if entry is None else entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: float, namespace: str = 'default') -> bool:
+        """
+        Stocke une valeur pour ttl secondes
+
+        Returns:
+            bool: False si la valeur dépasse le budget mémoire et n'a pas été conservée
+        """
+        size = estimate_size(value)
+        with self._lock:
+            if size > self.max_bytes:
+                self._cache.pop(key, None)
+                self._rejected += 1
+                return False
+            self._cache[key] = _Entry(value, self.timer() + ttl, size, namespace)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem()
+        return True
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Comme get(), sans compter l'accès"""
+        with self._lock:
+            entry = self._cache.get(key)
+        return default if entry is None else entry.value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._cache.pop(key, None)
+        return default if entry is None else entry.value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._cache
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._cache.expire()
+            return len(self._cache)
+
+    def stats(self) -> dict:
+        """Entrées, octets estimés, évictions et succès/échecs par espace de noms"""
+        with self._lock:
+            self._cache.expire()
+            namespaces = {}
+            for namespace, counters in self._namespaces.items():
+                lookups = counters['hits'] + counters['misses']
+                namespaces[namespace] = dict(counters, hit_rate=counters['hits'] / lookups if lookups else 0.0)
+            return {
+                'entries': len(self._cache),
+                'bytes': self._cache.currsize,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'evictions': self._cache.evictions,
+                'rejected': self._rejected,
+                'namespaces': namespaces
+            }
@@ -0,0 +1,84 @@
+"""
+Rafraîchissement en arrière-plan des données servies périmées (stale-while-revalidate)
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+REVALIDATION_WORKERS = 4
+
+
+class Revalidator:
+    """
+    Exécute les rafraîchissements en arrière-plan, un seul à la fois par clé
+
+    Un appelant qui sert une valeur périmée planifie son rafraîchissement et
+    retourne immédiatement ; les demandes suivantes pour la même clé, tant
+    que le rafraîchissement est en cours, sont ignorées.
+    """
+
+    def __init__(self, max_workers: int = REVALIDATION_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='revalidate')
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, Future] = {}
+        self._counters = {'scheduled': 0, 'deduplicated': 0, 'completed': 0, 'failed': 0}
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Planifie fn(*args, **kwargs) si aucun rafraîchissement n'est en cours pour la clé
+
+        Returns:
+            Future: Rafraîchissement planifié, ou celui déjà en cours
+        """
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                self._counters['deduplicated'] += 1
+                return future
+            self._counters['scheduled'] += 1
+            future = self._executor.submit(self._run, key, fn, args, kwargs)
+            self._pending[key] = future
+            return future
+
+    def _run(self, key: Hashable, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"Rafraîchissement {key!r} échoué: {e}")
+            with self._lock:
+                self._counters['failed'] += 1
+            raise
+        else:
+            with self._lock:
+                self._counters['completed'] += 1
+            return result
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def is_pending(self, key: Hashable) -> bool:
+        """Indique si un rafraîchissement est en cours pour la clé"""
+        with self._lock:
+            return key in self._pending
+
+    def stats(self) -> dict:
+        """Compteurs de rafraîchissements planifiés, mutualisés, terminés et échoués"""
+        with self._lock:
+            return dict(self._counters, pending=len(self._pending))
+
+
+_revalidator: Optional[Revalidator] = None
+_revalidator_lock = threading.Lock()
+
+
+def get_revalidator() -> Revalidator:
+    """Retourne le planificateur de rafraîchissements partagé par tout le processus"""
+    global _revalidator
+    if _revalidator is None:
+        with _revalidator_lock:
+            if _revalidator is None:
+                _revalidator = Revalidator()
+    return _revalidator
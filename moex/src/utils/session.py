@@ -1,8 +1,13 @@
 """
 Gestion de l'état de session Streamlit
 """
+import uuid
+
 import streamlit as st
-from datetime import datetime
+from src.api.rate_limiter import get_rate_limiter
+from src.utils.cache_manager import get_cache_manager
+from src.utils.fingerprint import fingerprint
+from src.utils.constants import DEFAULT_WATCHLIST
 from src.utils.time_utils import get_utc4_time
 
 def init_session_state():
@@ -18,12 +23,9 @@ def init_session_state():
     
     # Watchlist par défaut
     if 'watchlist' not in st.session_state:
-        st.session_state.watchlist = [
-            'SBER', 'GAZP', 'LKOH', 'ROSN', 'GMKN',
-            'YNDX', 'MTSS', 'NVTK', 'MGNT', 'TATN'
-        ]
+        st.session_state.watchlist = list(DEFAULT_WATCHLIST)
     
-    # Cache des données
+    # Cache des données de la session (clés dans le cache du processus)
     if 'data_cache' not in st.session_state:
         st.session_state.data_cache = {}
     
@@ -58,28 +60,51 @@ def init_session_state():
             'last_request_time': None
         }
 
+def sync_api_stats():
+    """Recopie les compteurs du limiteur ISS partagé dans les statistiques de session"""
+    stats = get_rate_limiter().stats()
+    st.session_state.api_stats = {
+        'total_requests': stats['total_requests'],
+        'rate_limit_hits': stats['rate_limit_hits'],
+        'last_request_time': stats['last_request_time']
+    }
+    return stats
+
 def update_last_update():
     """Met à jour le timestamp de dernière mise à jour"""
     st.session_state.last_update = get_utc4_time().strftime('%H:%M:%S')
 
+def session_id() -> str:
+    """Identifiant propre à la session Streamlit courante"""
+    if 'cache_session_id' not in st.session_state:
+        st.session_state.cache_session_id = uuid.uuid4().hex
+    return st.session_state.cache_session_id
+
+def _shared_key(key: str) -> str:
+    # Valeurs propres à l'utilisateur : la clé du cache du processus inclut la session
+    return fingerprint('session', session_id(), key)
+
 def add_to_cache(key: str, value, ttl: int = 300):
     """
-    Ajoute une valeur au cache session
+    Ajoute une valeur au cache mémoire du processus et la référence dans la session
+    
+    La valeur reste propre à la session : une autre session utilisant la
+    même clé ne la voit pas. Elle n'est pas écrite sur disque, où elle ne
+    serait plus retrouvée après un redémarrage. Les données de marché communes passent par
+    le décorateur cache (cache_manager), partagé par toutes les sessions.
     
     Args:
         key: Clé du cache
         value: Valeur à stocker
         ttl: Durée de vie en secondes
     """
-    st.session_state.data_cache[key] = {
-        'value': value,
-        'timestamp': datetime.now(),
-        'ttl': ttl
-    }
+    shared_key = _shared_key(key)
+    get_cache_manager().set(shared_key, value, ttl, namespace='session', persist=False)
+    st.session_state.data_cache[key] = shared_key
 
 def get_from_cache(key: str):
     """
-    Récupère une valeur du cache si non expirée
+    Récupère une valeur de la session si non expirée
     
     Args:
         key: Clé du cache
@@ -87,11 +112,10 @@ def get_from_cache(key: str):
     Returns:
         Valeur ou None si expirée/non trouvée
     """
-    if key in st.session_state.data_cache:
-        cached = st.session_state.data_cache[key]
-        age = (datetime.now() - cached['timestamp']).total_seconds()
-        if age < cached['ttl']:
-            return cached['value']
-        else:
-            del st.session_state.data_cache[key]
-    return None
\ No newline at end of file
+    shared_key = _shared_key(key)
+    value = get_cache_manager().get(shared_key, namespace='session')
+    if value is None:
+        st.session_state.data_cache.pop(key, None)
+    else:
+        st.session_state.data_cache[key] = shared_key
+    return value
\ No newline at end of file
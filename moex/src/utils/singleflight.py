@@ -0,0 +1,122 @@
+"""
+Mutualisation des requêtes identiques simultanées (single-flight)
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Exécute une seule fois les appels concurrents partageant la même clé
+
+    Le premier appelant exécute la fonction ; ceux qui arrivent pendant
+    l'exécution attendent son résultat (ou son exception). Le résultat est
+    partagé tel quel : il ne doit pas être modifié par les appelants, sauf
+    si `private` fournit à chacun sa propre copie.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._joined: Dict[Hashable, int] = {}
+        self._counters = {'executed': 0, 'shared': 0}
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[..., Any],
+        *args,
+        timeout: Optional[float] = None,
+        private: Optional[Callable[[Any], Any]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Exécute fn(*args, **kwargs) ou attend l'exécution en cours pour la même clé
+
+        Args:
+            key: Clé identifiant la requête
+            fn: Fonction à exécuter
+            timeout: Attente maximale d'un appelant qui rejoint un appel en cours
+            private: Si fourni et que l'appel a été partagé, chaque appelant reçoit
+                private(résultat) ; le résultat d'origine n'est remis à aucun appelant.
+                Un appel non partagé retourne le résultat sans copie.
+
+        Raises:
+            concurrent.futures.TimeoutError: Si l'appel en cours dépasse timeout
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._joined[key] = 0
+                self._counters['executed'] += 1
+            else:
+                self._joined[key] += 1
+                self._counters['shared'] += 1
+
+        if not leader:
+            result = future.result(timeout=timeout)
+            return private(result) if private is not None else result
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            # Plus aucun appelant ne peut rejoindre : le nombre d'appelants en attente est définitif
+            with self._lock:
+                self._calls.pop(key, None)
+                joined = self._joined.pop(key, 0)
+            future.set_result(result)
+            return private(result) if private is not None and joined else result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                self._joined.pop(key, None)
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Équivalent asynchrone de do : fn est une coroutine
+
+        Les appelants qui rejoignent un appel en cours l'attendent sans bloquer
+        leur boucle, y compris depuis une autre boucle (un autre thread).
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._counters['executed'] += 1
+            else:
+                self._counters['shared'] += 1
+
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Nombre d'appels en cours"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        """Compteurs d'appels exécutés et partagés"""
+        with self._lock:
+            return dict(self._counters, in_flight=len(self._calls))
@@ -1,10 +1,13 @@
 """
 Utilitaires de gestion du temps
 """
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 import pytz
-from typing import Tuple
-from .constants import MOSCOW_TZ, UTC4_OFFSET, MOEX_OPEN_TIME, MOEX_CLOSE_TIME, RUSSIAN_HOLIDAYS_2024
+from typing import Optional, Tuple, Union
+from .constants import (
+    MOSCOW_TZ, UTC4_OFFSET, MOEX_OPEN_TIME, MOEX_CLOSE_TIME, RUSSIAN_HOLIDAYS_2024,
+    CACHE_TTL, MARKET_EDGE_WINDOW, MARKET_EDGE_TTL_FACTOR, MIN_CACHE_TTL
+)
 
 # Fuseaux horaires
 MOSCOW_TZ = pytz.timezone(MOSCOW_TZ)
@@ -24,14 +27,29 @@ def convert_to_utc4(dt: datetime) -> datetime:
         dt = pytz.UTC.localize(dt)
     return dt.astimezone(UTC4_TZ)
 
-def get_market_status() -> Tuple[str, str]:
+def _to_moscow(now: Optional[datetime]) -> datetime:
+    """Heure de Moscou (maintenant par défaut ; une date naïve est supposée en heure de Moscou)"""
+    if now is None:
+        return get_moscow_time()
+    if now.tzinfo is None:
+        return MOSCOW_TZ.localize(now)
+    return now.astimezone(MOSCOW_TZ)
+
+def is_trading_day(day) -> bool:
+    """Vérifie si une date est un jour de séance (hors weekend et jours fériés)"""
+    return day.weekday() < 5 and day.strftime('%Y-%m-%d') not in RUSSIAN_HOLIDAYS_2024
+
+def get_market_status(now: Optional[datetime] = None) -> Tuple[str, str]:
     """
     Détermine le statut du marché MOEX
     
+    Args:
+        now: Instant considéré (maintenant par défaut)
+    
     Returns:
         Tuple[str, str]: (statut, emoji)
     """
-    moscow_now = get_moscow_time()
+    moscow_now = _to_moscow(now)
     moscow_date = moscow_now.strftime('%Y-%m-%d')
     moscow_weekday = moscow_now.weekday()
     current_time = moscow_now.time()
@@ -50,34 +68,59 @@ def get_market_status() -> Tuple[str, str]:
     else:
         return "Fermé", "🔴"
 
-def is_market_open() -> bool:
+def is_market_open(now: Optional[datetime] = None) -> bool:
     """Vérifie si le marché est ouvert"""
-    status, _ = get_market_status()
+    status, _ = get_market_status(now)
     return status == "Ouvert"
 
+def get_next_open(now: Optional[datetime] = None) -> datetime:
+    """Prochaine ouverture de séance (heure de Moscou), jours fériés exclus"""
+    moscow_now = _to_moscow(now)
+    day = moscow_now.date()
+    if moscow_now.time() >= MOEX_OPEN_TIME:
+        day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return MOSCOW_TZ.localize(datetime.combine(day, MOEX_OPEN_TIME))
+
+def get_cache_ttl(base: Union[str, float], now: Optional[datetime] = None) -> float:
+    """
+    Durée de validité d'une donnée obtenue à `now`, selon la phase du marché
+    
+    Marché fermé : la donnée reste valable jusqu'à la prochaine ouverture.
+    Près de l'ouverture ou de la clôture, le TTL de base est réduit ; le reste
+    de la séance, il s'applique tel quel.
+    
+    Args:
+        base: TTL de base en secondes, ou catégorie de CACHE_TTL (ex: 'market_data')
+        now: Instant d'obtention de la donnée (maintenant par défaut)
+    
+    Returns:
+        float: TTL en secondes
+    """
+    ttl = float(CACHE_TTL[base] if isinstance(base, str) else base)
+    moscow_now = _to_moscow(now)
+    
+    if not is_market_open(moscow_now):
+        return max(ttl, (get_next_open(moscow_now) - moscow_now).total_seconds())
+    
+    session_open = moscow_now.replace(hour=MOEX_OPEN_TIME.hour, minute=MOEX_OPEN_TIME.minute, second=0, microsecond=0)
+    session_close = moscow_now.replace(hour=MOEX_CLOSE_TIME.hour, minute=MOEX_CLOSE_TIME.minute, second=0, microsecond=0)
+    to_close = (session_close - moscow_now).total_seconds()
+    if (moscow_now - session_open).total_seconds() < MARKET_EDGE_WINDOW or to_close < MARKET_EDGE_WINDOW:
+        ttl = max(float(MIN_CACHE_TTL), ttl * MARKET_EDGE_TTL_FACTOR)
+    # Une donnée obtenue en séance expire au plus tard à la clôture (dernier cours)
+    return max(float(MIN_CACHE_TTL), min(ttl, to_close)) if to_close > 0 else ttl
+
 def get_time_until_open() -> str:
     """Calcule le temps restant avant l'ouverture"""
     if is_market_open():
         return "Marché ouvert"
     
     now = get_moscow_time()
-    next_open = now.replace(
-        hour=MOEX_OPEN_TIME.hour,
-        minute=MOEX_OPEN_TIME.minute,
-        second=0,
-        microsecond=0
-    )
-    
-    if now.time() > MOEX_CLOSE_TIME:
-        next_open += timedelta(days=1)
-    
-    # Skip les weekends
-    while next_open.weekday() >= 5:
-        next_open += timedelta(days=1)
-    
-    time_until = next_open - now
-    hours = time_until.seconds // 3600
-    minutes = (time_until.seconds % 3600) // 60
+    seconds = int((get_next_open(now) - now).total_seconds())
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
     
     return f"Ouverture dans {hours}h {minutes}min"
 
@@ -1,9 +1,11 @@
 """
 Calcul des indicateurs techniques
+
+Fonctions historiques par indicateur, adossées au moteur de src.indicators.
 """
 import pandas as pd
-import numpy as np
-from typing import Optional, Tuple
+
+from ..indicators import ALL_INDICATORS, with_indicators
 
 def add_moving_averages(df: pd.DataFrame, windows: list = [20, 50, 200]) -> pd.DataFrame:
     """
@@ -16,13 +18,7 @@ def add_moving_averages(df: pd.DataFrame, windows: list = [20, 50, 200]) -> pd.D
     Returns:
         pd.DataFrame: DataFrame avec MA
     """
-    result = df.copy()
-    
-    for window in windows:
-        if len(df) >= window:
-            result[f'MA{window}'] = df['Close'].rolling(window=window).mean()
-    
-    return result
+    return with_indicators(df, [('ma', {'windows': [w for w in windows if len(df) >= w]})])
 
 def add_rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     """
@@ -35,15 +31,7 @@ def add_rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame avec RSI
     """
-    result = df.copy()
-    
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    result['RSI'] = 100 - (100 / (1 + rs))
-    
-    return result
+    return with_indicators(df, [('rsi', {'period': period})])
 
 def add_bollinger_bands(df: pd.DataFrame, period: int = 20, std: int = 2) -> pd.DataFrame:
     """
@@ -57,14 +45,7 @@ def add_bollinger_bands(df: pd.DataFrame, period: int = 20, std: int = 2) -> pd.
     Returns:
         pd.DataFrame: DataFrame avec bandes
     """
-    result = df.copy()
-    
-    result['BB_Middle'] = df['Close'].rolling(window=period).mean()
-    bb_std = df['Close'].rolling(window=period).std()
-    result['BB_Upper'] = result['BB_Middle'] + (bb_std * std)
-    result['BB_Lower'] = result['BB_Middle'] - (bb_std * std)
-    
-    return result
+    return with_indicators(df, [('bollinger', {'period': period, 'std': std})])
 
 def add_macd(
     df: pd.DataFrame,
@@ -84,15 +65,7 @@ def add_macd(
     Returns:
         pd.DataFrame: DataFrame avec MACD
     """
-    result = df.copy()
-    
-    exp1 = df['Close'].ewm(span=fast, adjust=False).mean()
-    exp2 = df['Close'].ewm(span=slow, adjust=False).mean()
-    result['MACD'] = exp1 - exp2
-    result['MACD_Signal'] = result['MACD'].ewm(span=signal, adjust=False).mean()
-    result['MACD_Histogram'] = result['MACD'] - result['MACD_Signal']
-    
-    return result
+    return with_indicators(df, [('macd', {'fast': fast, 'slow': slow, 'signal': signal})])
 
 def add_volume_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -104,22 +77,9 @@ def add_volume_indicators(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame avec indicateurs de volume
     """
-    result = df.copy()
-    
-    if 'Volume' in df.columns:
-        # Moyenne mobile du volume
-        result['Volume_MA20'] = df['Volume'].rolling(window=20).mean()
-        
-        # Volume relatif
-        result['Volume_Ratio'] = df['Volume'] / result['Volume_MA20']
-        
-        # Accumulation/Distribution
-        if all(col in df.columns for col in ['Close', 'Low', 'High']):
-            clv = ((df['Close'] - df['Low']) - (df['High'] - df['Close'])) / (df['High'] - df['Low'])
-            result['AD'] = clv * df['Volume']
-            result['AD_MA'] = result['AD'].rolling(window=20).mean()
-    
-    return result
+    if 'Volume' not in df.columns:
+        return df.copy()
+    return with_indicators(df, ['volume_ma', 'volume_ratio', 'ad'])
 
 def add_volatility(df: pd.DataFrame, window: int = 20) -> pd.DataFrame:
     """
@@ -132,34 +92,22 @@ def add_volatility(df: pd.DataFrame, window: int = 20) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame avec volatilité
     """
-    result = df.copy()
-    
-    # Rendements journaliers
-    returns = df['Close'].pct_change()
-    
-    # Volatilité historique (annualisée)
-    result['Volatility'] = returns.rolling(window=window).std() * np.sqrt(252)
-    
-    return result
+    return with_indicators(df, [('volatility', {'window': window})])
 
-def add_support_resistance(df: pd.DataFrame, window: int = 20) -> pd.DataFrame:
+def add_support_resistance(df: pd.DataFrame, window: int = 20, causal: bool = True) -> pd.DataFrame:
     """
     Identifie les niveaux de support et résistance
     
     Args:
         df: DataFrame avec colonnes 'High' et 'Low'
         window: Fenêtre de recherche
+        causal: Fenêtre des seules barres passées (utilisable en direct et en backtest) ;
+            False pour une fenêtre centrée, qui lit des barres futures
         
     Returns:
         pd.DataFrame: DataFrame avec niveaux
     """
-    result = df.copy()
-    
-    # Plus hauts et plus bas sur la période
-    result['Resistance'] = df['High'].rolling(window=window, center=True).max()
-    result['Support'] = df['Low'].rolling(window=window, center=True).min()
-    
-    return result
+    return with_indicators(df, [('support_resistance', {'window': window, 'causal': causal})])
 
 def get_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -171,14 +119,6 @@ def get_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame avec tous les indicateurs
     """
-    result = df.copy()
-    
-    result = add_moving_averages(result)
-    result = add_rsi(result)
-    result = add_bollinger_bands(result)
-    result = add_macd(result)
-    result = add_volume_indicators(result)
-    result = add_volatility(result)
-    result = add_support_resistance(result)
-    
-    return result
\ No newline at end of file
+    # Un seul passage : la moyenne 20 (MA20, BB_Middle) et les variations sont partagées
+    windows = [w for w in (20, 50, 200) if len(df) >= w]
+    return with_indicators(df, [('ma', {'windows': windows}), *ALL_INDICATORS[1:]])
\ No newline at end of file